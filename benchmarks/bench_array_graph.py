@@ -0,0 +1,78 @@
+"""Memory per edge and operations per second: ArrayGraph versus the networkx-backed Graph.
+
+Run from the repository root with ``python -m benchmarks.bench_array_graph``.
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+from src.array_graph import ArrayGraph
+from src.graph_logic import Graph
+
+
+def build(factory, names, edges):
+    graph = factory()
+    for name in names:
+        graph.add_node(name, 'circle')
+    for node1, node2, directed in edges:
+        graph.add_edge_to_graph(node1, node2, directed)
+    return graph
+
+
+def measure_memory(factory, names, edges):
+    """Returns the graph and the bytes traced while building it"""
+    tracemalloc.start()
+    graph = build(factory, names, edges)
+    if isinstance(graph, ArrayGraph):
+        graph.compact()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return graph, size
+
+
+def ops_per_second(function, arguments):
+    start = time.perf_counter()
+    for args in arguments:
+        function(*args)
+    return len(arguments) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--edge-factor", type=int, default=8, help="edges per node")
+    parser.add_argument("--ops", type=int, default=20000, help="operations per timing")
+    args = parser.parse_args()
+
+    build(Graph, ["warm-up"], [])  # Pay one-time import costs (e.g. the plotting backend) outside the traces
+
+    print(f"{'nodes':>7} {'edges':>8} {'backend':>9} {'B/edge':>8} {'add/s':>9} {'has/s':>9} "
+          f"{'data/s':>9} {'remove/s':>9} {'rename/s':>9}")
+    for size in args.sizes:
+        rng = random.Random(size)
+        names = [str(i) for i in range(size)]
+        edges = [(rng.choice(names), rng.choice(names), rng.random() < 0.5) for _ in range(size * args.edge_factor)]
+        queries = [(rng.choice(names), rng.choice(names)) for _ in range(args.ops)]
+        extra = [(rng.choice(names), rng.choice(names), rng.random() < 0.5) for _ in range(args.ops)]
+
+        for backend, factory in (("networkx", Graph), ("array", ArrayGraph)):
+            graph, memory = measure_memory(factory, names, edges)
+            add_rate = ops_per_second(graph.add_edge_to_graph, extra)
+            has_rate = ops_per_second(graph.has_edge, queries)
+            existing = [(u, v) for u, v, _ in extra][:args.ops // 2]
+            data_rate = ops_per_second(graph.get_edge_data, existing)
+            removable = []
+            for node1, node2 in existing:
+                if graph.has_edge(node1, node2, directed=True) and (node1, node2) not in removable:
+                    removable.append((node1, node2))
+            remove_rate = ops_per_second(
+                lambda u, v: graph.has_edge(u, v, directed=True) and graph.remove_edge(u, v), removable)
+            renames = [(name, name + "_renamed") for name in names[:min(size, 2000)]]
+            rename_rate = ops_per_second(graph.rename_node, renames)
+            print(f"{size:>7} {len(edges):>8} {backend:>9} {memory / len(edges):>8.1f} {add_rate:>9.0f} "
+                  f"{has_rate:>9.0f} {data_rate:>9.0f} {remove_rate:>9.0f} {rename_rate:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
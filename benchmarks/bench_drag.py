@@ -0,0 +1,56 @@
+"""Frame time per drag event: full canvas redraw versus the retained-mode renderer.
+
+Run from the repository root with ``python -m benchmarks.bench_drag`` (needs a display).
+"""
+import argparse
+import random
+import time
+import tkinter as tk
+
+from benchmarks.generators import random_graph
+from src.canvas_renderer import CanvasRenderer
+
+
+def time_drag(root, renderer, graph, node, events, incremental):
+    """Returns the mean time in milliseconds spent handling one drag event"""
+    rng = random.Random(1)
+    attributes = graph.get_nodes()[node]
+    start = time.perf_counter()
+    for _ in range(events):
+        attributes['pos'] = [rng.random() * 800, rng.random() * 600]
+        if incremental:
+            renderer.move_node(graph, node)
+        else:
+            renderer.rebuild(graph)
+        root.update_idletasks()  # Let Tk process the pending canvas changes
+    return (time.perf_counter() - start) * 1000 / events
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 500, 1000, 2000, 5000])
+    parser.add_argument("--events", type=int, default=50, help="drag events per measurement")
+    args = parser.parse_args()
+
+    root = tk.Tk()
+    root.withdraw()
+    canvas = tk.Canvas(root, width=800, height=600)
+    canvas.pack()
+    renderer = CanvasRenderer(canvas)
+
+    print(f"{'nodes':>8} {'edges':>8} {'full redraw ms':>15} {'incremental ms':>15}")
+    for size in args.sizes:
+        graph = random_graph(size, size * 2)
+        renderer.rebuild(graph)
+        # Drag the node with the most incident edges, the worst case for the incremental path
+        node = max(graph.get_nodes(), key=lambda n: len(renderer.incident_edges.get(n, ())))
+        full = time_drag(root, renderer, graph, node, args.events, incremental=False)
+        renderer.rebuild(graph)
+        incremental = time_drag(root, renderer, graph, node, args.events, incremental=True)
+        print(f"{size:>8} {len(graph.get_edges()):>8} {full:>15.3f} {incremental:>15.3f}")
+
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Redraw time of Graph.draw: the previous clf + nx.draw path versus the persistent, blitted figure.
+
+Runs on the Agg backend, so no display is needed. The previous path is timed without its
+fixed 0.1 s pause. Run from the repository root with ``python -m benchmarks.bench_draw``.
+"""
+import argparse
+import time
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt  # noqa: E402
+import networkx as nx  # noqa: E402
+
+from benchmarks.generators import random_graph  # noqa: E402
+
+NX_DRAW_LIMIT = 5_000  # Skip the nx.draw baseline above this many nodes
+
+
+def nx_draw(graph):
+    """The previous Graph.draw, minus plt.pause"""
+    plt.clf()
+    pos = {node: data['pos'] for node, data in graph.get_nodes().items()}
+    colors = [graph.node_colors.get(node, 'lightblue') for node in graph.get_nodes()]
+    nx.draw(graph.graph, pos, with_labels=True, node_color=colors, node_size=500, font_size=10,
+            font_color="black", font_weight="bold", arrows=True)
+    plt.gcf().canvas.draw()
+
+
+def mean_ms(function, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        function()
+    return (time.perf_counter() - start) * 1000 / repeats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 300, 1_000, 5_000, 20_000])
+    parser.add_argument("--repeats", type=int, default=5, help="redraws per measurement")
+    args = parser.parse_args()
+
+    print(f"{'nodes':>7} {'edges':>8} {'nx.draw ms':>11} {'first ms':>9} {'redraw ms':>10} {'no LOD ms':>10}")
+    for size in args.sizes:
+        graph = random_graph(size, size * 2, seed=size)
+        baseline = "-"
+        if size <= NX_DRAW_LIMIT:
+            baseline = f"{mean_ms(lambda: nx_draw(graph), args.repeats):.1f}"
+            plt.close("all")
+
+        first = mean_ms(graph.draw, 1)
+        redraw = mean_ms(graph.draw, args.repeats)
+        graph.draw(level_of_detail=False)
+        full = mean_ms(lambda: graph.draw(level_of_detail=False), args.repeats)
+        plt.close("all")
+        print(f"{size:>7} {len(graph.get_edges()):>8} {baseline:>11} {first:>9.1f} {redraw:>10.1f} {full:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""Hamiltonian cycle search time on seeded random graphs of growing size.
+
+Run from the repository root with ``python -m benchmarks.bench_hamiltonian``.
+"""
+import argparse
+import time
+
+from benchmarks.generators import random_graph
+from src.hamiltonian import SearchBudgetExceeded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 15, 20, 30, 50, 100])
+    parser.add_argument("--edge-factor", type=int, default=3, help="edges per node")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    args = parser.parse_args()
+
+    print(f"{'nodes':>6} {'edges':>7} {'found':>7} {'ms':>10}")
+    for size in args.sizes:
+        graph = random_graph(size, size * args.edge_factor, seed=size, directed_ratio=0.2)
+        start = time.perf_counter()
+        try:
+            found = "yes" if graph.find_hamiltonian_cycles(timeout=args.timeout) else "no"
+        except SearchBudgetExceeded:
+            found = "timeout"
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{size:>6} {len(graph.get_edges()):>7} {found:>7} {elapsed:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
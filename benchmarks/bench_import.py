@@ -0,0 +1,60 @@
+"""Cold import time of the core Graph class, checked against a budget.
+
+Each run starts a fresh interpreter with ``python -X importtime`` and reads the cumulative
+time of ``src.graph_logic``. Exits with status 1 if the median goes over the budget or if
+the import pulls in any of the heavy modules that must stay lazy.
+
+Run from the repository root with ``python -m benchmarks.bench_import``.
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+MODULE = "src.graph_logic"
+DEFAULT_BUDGET_MS = 300.0  # networkx alone accounts for most of this
+LAZY_MODULES = ("matplotlib", "tkinter", "numpy", "scipy")
+
+
+def import_time_ms(module):
+    """Returns the cumulative import time of module in a fresh interpreter, and the lazy modules it loaded"""
+    check = f"import sys, {module}; print(' '.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", check],
+                            capture_output=True, text=True, check=True)
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == module:
+            return int(fields[1]) / 1000, result.stdout.split()
+    raise RuntimeError(f"{module} not found in -X importtime output")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    args = parser.parse_args()
+
+    times, loaded = [], set()
+    for _ in range(args.runs):
+        milliseconds, modules = import_time_ms(MODULE)
+        times.append(milliseconds)
+        loaded.update(modules)
+
+    median = statistics.median(times)
+    print(f"{MODULE}: median {median:.1f} ms, min {min(times):.1f} ms, max {max(times):.1f} ms "
+          f"over {args.runs} runs (budget {args.budget_ms:.0f} ms)")
+    failed = False
+    if median > args.budget_ms:
+        print("FAIL: import time is over budget")
+        failed = True
+    if loaded:
+        print(f"FAIL: importing {MODULE} loaded {', '.join(sorted(loaded))}")
+        failed = True
+    if not failed:
+        print("OK")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Save time after a few edits: rewriting the whole file versus appending to its journal.
+
+Run from the repository root with ``python -m benchmarks.bench_journal``.
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+from benchmarks.generators import random_graph
+from src.graph_logic import Graph
+
+
+def timed(function):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):  # Graph.save/load report progress with print()
+        function()
+    return time.perf_counter() - start
+
+
+def edit(graph, count):
+    """Moves count nodes and adds count edges, as an editing session would"""
+    nodes = list(graph.graph.nodes)
+    for i in range(count):
+        graph.set_node_attributes({nodes[i]: [i, i]}, 'pos')
+        graph.add_edge_to_graph(nodes[i], nodes[-1 - i])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--edits", type=int, default=20, help="edits between two saves")
+    args = parser.parse_args()
+
+    print(f"{'nodes':>8} {'edges':>9} {'full save ms':>13} {'journal save ms':>16} {'load ms':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            graph = random_graph(size, size * 4)
+            full_file = os.path.join(directory, "full.bin")
+            journal_file = os.path.join(directory, "journal.bin")
+            timed(lambda: graph.save(journal_file, journal=True))  # Initial snapshot
+
+            edit(graph, args.edits)
+            full = timed(lambda: graph.save(full_file))
+            journal = timed(lambda: graph.save(journal_file))
+            load = timed(lambda: Graph.load(journal_file))  # Snapshot plus journal replay
+            print(f"{size:>8} {len(graph.get_edges()):>9} {full * 1000:>13.1f} {journal * 1000:>16.2f} "
+                  f"{load * 1000:>9.1f}")
+            graph.journal.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Full layout time: networkx spring_layout versus the grid-approximated ForceLayout.
+
+Run from the repository root with ``python -m benchmarks.bench_layout``.
+"""
+import argparse
+import time
+
+import networkx as nx
+
+from benchmarks.generators import random_graph
+
+SPRING_LAYOUT_LIMIT = 5_000  # Skip the O(n^2) networkx baseline above this many nodes
+
+
+def timed(function):
+    start = time.perf_counter()
+    function()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1_000, 5_000, 20_000, 50_000])
+    parser.add_argument("--iterations", type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"{'nodes':>7} {'edges':>8} {'spring_layout ms':>17} {'layout ms':>10} {'step ms':>8} "
+          f"{'incremental ms':>15}")
+    for size in args.sizes:
+        graph = random_graph(size, size * 2, seed=size)
+        baseline = "-"
+        if size <= SPRING_LAYOUT_LIMIT:
+            undirected = graph.graph.to_undirected(as_view=True)
+            baseline = f"{timed(lambda: nx.spring_layout(undirected, iterations=args.iterations, seed=0)):.1f}"
+        full = timed(lambda: graph.layout(iterations=args.iterations))
+        # Ten new nodes, each attached to two existing ones
+        with graph.batch():
+            for i in range(10):
+                graph.add_node(f"new{i}", "circle")
+                graph.add_edge_to_graph(f"new{i}", str(i))
+                graph.add_edge_to_graph(f"new{i}", str(i + 10))
+        incremental = timed(lambda: graph.layout([f"new{i}" for i in range(10)]))
+        print(f"{size:>7} {len(graph.get_edges()):>8} {baseline:>17} {full:>10.1f} {full / args.iterations:>8.2f} "
+              f"{incremental:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Tensor and Cartesian product time: sparse Kronecker engine against the per-edge-pair loop.
+
+Run from the repository root with ``python -m benchmarks.bench_products``.
+"""
+import argparse
+import itertools
+import time
+
+import networkx as nx
+
+from benchmarks.generators import random_graph
+
+LOOP_EDGE_LIMIT = 2_000_000  # Skip the nested loop above this many edge pairs
+
+
+def loop_tensor_product(first, second):
+    """The previous implementation: one networkx add_edge per pair of edges"""
+    result_graph = nx.DiGraph()
+    result_graph.add_nodes_from(itertools.product(first.graph.nodes(), second.graph.nodes()))
+    for (v1, u1) in first.graph.edges():
+        for (v2, u2) in second.graph.edges():
+            result_graph.add_edge((v1, v2), (u1, u2))
+    return result_graph
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 100, 200, 400, 800])
+    parser.add_argument("--second-size", type=int, default=100)
+    parser.add_argument("--edge-factor", type=int, default=3, help="edges per node")
+    args = parser.parse_args()
+
+    second = random_graph(args.second_size, args.second_size * args.edge_factor, seed=1)
+    print(f"{'nodes':>6} {'product edges':>14} {'tensor ms':>10} {'cartesian ms':>13} {'loop ms':>10}")
+    for size in args.sizes:
+        first = random_graph(size, size * args.edge_factor, seed=size)
+
+        start = time.perf_counter()
+        tensor = first.tensor_product(second).materialise()
+        tensor_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        first.cartesian_product(second).materialise()
+        cartesian_ms = (time.perf_counter() - start) * 1000
+
+        loop = "-"
+        if len(first.get_edges()) * len(second.get_edges()) <= LOOP_EDGE_LIMIT:
+            start = time.perf_counter()
+            loop_tensor_product(first, second)
+            loop = f"{(time.perf_counter() - start) * 1000:.2f}"
+        print(f"{size:>6} {tensor.number_of_edges():>14} {tensor_ms:>10.2f} {cartesian_ms:>13.2f} {loop:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Bulk relabelling time: full-edge-scan rename, per-node rename_node and batch rename_nodes.
+
+Run from the repository root with ``python -m benchmarks.bench_rename``.
+"""
+import argparse
+import time
+
+from benchmarks.generators import random_graph
+
+SCAN_RENAME_LIMIT = 2_000  # Skip the O(N * E) edge-scan rename above this many nodes
+
+
+def scan_rename(graph, old_name, new_name):
+    """The previous rename_node: copy the node, then walk every edge of the graph"""
+    node_data = graph.graph.nodes[old_name]
+    graph.graph.add_node(new_name, **node_data)
+    graph.graph.remove_node(old_name)
+    for n1, n2 in list(graph.graph.edges):
+        if n1 == old_name:
+            graph.graph.remove_edge(n1, n2)
+            graph.graph.add_edge(new_name, n2)
+        elif n2 == old_name:
+            graph.graph.remove_edge(n1, n2)
+            graph.graph.add_edge(n1, new_name)
+
+
+def timed(function):
+    start = time.perf_counter()
+    function()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 2_000, 10_000, 50_000])
+    parser.add_argument("--edge-factor", type=int, default=4, help="edges per node")
+    args = parser.parse_args()
+
+    print(f"{'nodes':>7} {'edges':>8} {'scan ms':>10} {'rename_node ms':>15} {'rename_nodes ms':>16}")
+    for size in args.sizes:
+        mapping = {str(i): f"n{i}" for i in range(size)}
+
+        scan = "-"
+        if size <= SCAN_RENAME_LIMIT:
+            graph = random_graph(size, size * args.edge_factor, seed=size)
+            scan = f"{timed(lambda: [scan_rename(graph, old, new) for old, new in mapping.items()]):.2f}"
+
+        graph = random_graph(size, size * args.edge_factor, seed=size)
+        per_node = timed(lambda: [graph.rename_node(old, new) for old, new in mapping.items()])
+
+        graph = random_graph(size, size * args.edge_factor, seed=size)
+        batch = timed(lambda: graph.rename_nodes(mapping))
+        print(f"{size:>7} {len(graph.get_edges()):>8} {scan:>10} {per_node:>15.2f} {batch:>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Save/load throughput of the columnar graph format versus pickling the whole Graph.
+
+Run from the repository root with ``python -m benchmarks.bench_save_load``.
+"""
+import argparse
+import contextlib
+import io
+import os
+import pickle
+import tempfile
+import time
+
+from benchmarks.generators import random_graph
+from src.graph_format import read_graph
+from src.graph_logic import Graph
+
+
+def timed(function):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):  # Graph.save/load report progress with print()
+        function()
+    return time.perf_counter() - start
+
+
+def pickle_save(graph, filename):
+    with open(filename, "wb") as file:
+        pickle.dump(graph, file)
+
+
+def pickle_load(filename):
+    with open(filename, "rb") as file:
+        return pickle.load(file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--edge-factor", type=int, default=4, help="edges per node")
+    args = parser.parse_args()
+
+    print(f"{'nodes':>8} {'edges':>9} {'format':>9} {'size KiB':>9} {'save ms':>9} {'load ms':>9} {'edges/s load':>13}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            graph = random_graph(size, size * args.edge_factor)
+            edges = len(graph.get_edges())
+            pickle_file = os.path.join(directory, "graph.pickle")
+            columnar_file = os.path.join(directory, "graph.bin")
+
+            rows = [
+                ("pickle", pickle_file, lambda: pickle_save(graph, pickle_file), lambda: pickle_load(pickle_file)),
+                ("columnar", columnar_file, lambda: graph.save(columnar_file), lambda: Graph.load(columnar_file)),
+                # Reading only the NumPy views, without building the networkx graph
+                ("arrays", columnar_file, lambda: None, lambda: read_graph(columnar_file)),
+            ]
+            for name, filename, save, load in rows:
+                save_time = timed(save)
+                load_time = timed(load)
+                size_kib = os.path.getsize(filename) / 1024
+                print(f"{size:>8} {edges:>9} {name:>9} {size_kib:>9.1f} {save_time * 1000:>9.1f} "
+                      f"{load_time * 1000:>9.1f} {edges / load_time:>13.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import math
+import random
+
+import networkx as nx
+
+from src.graph_logic import Graph
+
+
+def random_graph(num_nodes, num_edges, seed=0, directed_ratio=0.5, canvas_width=800, canvas_height=600):
+    """Builds a seeded random Graph with string node names and random canvas positions"""
+    rng = random.Random(seed)
+    graph = Graph(canvas_width, canvas_height)
+    names = [str(i) for i in range(num_nodes)]
+    for name in names:
+        graph.add_node(name, shape=rng.choice(['circle', 'square']))
+        attributes = graph.get_nodes()[name]
+        attributes['pos'] = [rng.random() * canvas_width, rng.random() * canvas_height]
+        attributes['color'] = 'blue'
+
+    for _ in range(num_edges):
+        node1, node2 = rng.choice(names), rng.choice(names)
+        graph.add_edge_to_graph(node1, node2, directed=rng.random() < directed_ratio)
+    return graph
+
+
+def _build(names, edges, positions, canvas_width, canvas_height):
+    """Builds a Graph from node names, (node1, node2, directed) edges and {node: [x, y]} positions"""
+    graph = Graph(canvas_width, canvas_height)
+    graph.add_nodes_from(names, shape='circle')
+    graph.set_node_attributes(positions, 'pos')
+    graph.set_node_attributes({name: 'blue' for name in names}, 'color')
+    graph.add_edges_from(edges)
+    graph.history.clear()  # Generated graphs start without undo entries
+    return graph
+
+
+def grid_graph(num_nodes, seed=0, canvas_width=800, canvas_height=600):
+    """Builds a square lattice of about num_nodes nodes with undirected edges between neighbours"""
+    side = max(1, math.isqrt(num_nodes))
+    names = [f"{row},{column}" for row in range(side) for column in range(side)]
+    positions = {f"{row},{column}": [(column + 0.5) * canvas_width / side, (row + 0.5) * canvas_height / side]
+                 for row in range(side) for column in range(side)}
+    edges = [(f"{row},{column}", f"{row + d_row},{column + d_column}", False)
+             for row in range(side) for column in range(side)
+             for d_row, d_column in ((0, 1), (1, 0)) if row + d_row < side and column + d_column < side]
+    return _build(names, edges, positions, canvas_width, canvas_height)
+
+
+def scale_free_graph(num_nodes, seed=0, edges_per_node=2, directed_ratio=0.5, canvas_width=800,
+                     canvas_height=600):
+    """Builds a seeded Barabasi-Albert graph: a few hubs with very high degree, as in real networks"""
+    rng = random.Random(seed)
+    barabasi_albert = nx.barabasi_albert_graph(num_nodes, min(edges_per_node, max(num_nodes - 1, 1)), seed=seed)
+    names = [str(node) for node in barabasi_albert.nodes]
+    positions = {name: [rng.random() * canvas_width, rng.random() * canvas_height] for name in names}
+    edges = [(str(node1), str(node2), rng.random() < directed_ratio) for node1, node2 in barabasi_albert.edges]
+    return _build(names, edges, positions, canvas_width, canvas_height)
+
+
+def product_graph(num_nodes, seed=0, cycle_length=10, canvas_width=800, canvas_height=600):
+    """Builds the Cartesian product of a random graph and a cycle, about num_nodes nodes in total"""
+    factor = random_graph(max(1, num_nodes // cycle_length), 2 * max(1, num_nodes // cycle_length), seed=seed)
+    cycle = Graph()
+    cycle.add_nodes_from([f"c{i}" for i in range(cycle_length)], shape='circle')
+    cycle.add_edges_from([(f"c{i}", f"c{(i + 1) % cycle_length}") for i in range(cycle_length)])
+    product = factor.cartesian_product(cycle).materialise()
+
+    def name(pair):
+        return f"{pair[0]}x{pair[1]}"
+
+    rng = random.Random(seed)
+    names = [name(pair) for pair in product.nodes()]
+    positions = {node: [rng.random() * canvas_width, rng.random() * canvas_height] for node in names}
+    pairs = {(name(source), name(target)) for source, target in product.edges()}
+    # Pairs stored both ways are one undirected edge, as in the factors
+    edges = [(source, target, (target, source) not in pairs) for source, target in sorted(pairs)]
+    return _build(names, edges, positions, canvas_width, canvas_height)
+
+
+# Generator name -> function(num_nodes, seed) returning a Graph with positions
+GENERATORS = {
+    "random": lambda num_nodes, seed=0: random_graph(num_nodes, 2 * num_nodes, seed=seed),
+    "grid": grid_graph,
+    "scale_free": scale_free_graph,
+    "product": product_graph,
+}
@@ -0,0 +1,405 @@
+"""Benchmark suite: the Graph API, save/load, products, Hamiltonian search and headless GUI redraws.
+
+Every case runs on the seeded graphs of benchmarks.generators at several sizes and records
+the best and median time of a few repeats. Results are written as JSON; with --compare the
+run is checked against a stored baseline and cases slower than the threshold are reported
+as regressions (exit status 1).
+
+Run from the repository root, e.g.::
+
+    python -m benchmarks.suite --output baseline.json
+    python -m benchmarks.suite --compare baseline.json --output current.json
+
+The GUI cases drive GraphEditorGUI with a stand-in canvas and root window, so no display
+(or Xvfb) is needed; they measure the Python side of a redraw, not Tk's rendering.
+"""
+import os
+
+os.environ.setdefault("MPLBACKEND", "Agg")  # Graph.draw without a display
+
+import argparse
+import contextlib
+import datetime
+import inspect
+import io
+import itertools
+import json
+import platform
+import random
+import re
+import statistics
+import sys
+import tempfile
+import time
+import types
+
+from benchmarks.generators import GENERATORS, random_graph
+from src.graph_logic import Graph
+from src.hamiltonian import SearchBudgetExceeded
+
+DEFAULT_SIZES = [100, 1_000, 10_000]
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = 0.25  # Relative slow-down reported as a regression
+NOISE_FLOOR = 0.002  # Seconds; cases faster than this in the baseline are too noisy to compare
+HAMILTONIAN_EXPANSIONS = 10_000  # Search budget, so the case is bounded on graphs without a cycle
+
+# Public Graph members that have no case, and why
+NOT_BENCHMARKED = {
+    "graph": "property",
+    "is_mapped": "property",
+    "gui_color_node": "opens a Tk dialog",
+}
+
+
+class Case:
+    def __init__(self, name, run, setup=None, fresh=True, max_size=None, covers=None):
+        self.name = name
+        self.run = run  # run(graph, prepared) is what gets timed
+        self.setup = setup  # setup(graph, directory) -> prepared, not timed
+        self.fresh = fresh  # Run on a copy with an empty analysis cache, so mutations and caches do not leak
+        self.max_size = max_size  # Skipped on bigger graphs (quadratic cases)
+        self.covers = covers or (name,)  # Graph members the case exercises
+
+
+def sample_nodes(graph, count, seed=0):
+    nodes = list(graph.get_nodes())
+    return random.Random(seed).sample(nodes, min(count, len(nodes)))
+
+
+def sample_edges(graph, count, seed=0):
+    """Returns (node1, node2) pairs naming distinct edges, each undirected edge once"""
+    records = graph.edge_records()
+    return [(record.node1, record.node2) for record in random.Random(seed).sample(records, min(count, len(records)))]
+
+
+def node_pairs(graph, count):
+    return list(zip(sample_nodes(graph, count, seed=1), sample_nodes(graph, count, seed=2)))
+
+
+def path_in(directory, name):
+    return os.path.join(directory, name)
+
+
+def saved(graph, directory, journal=False):
+    filename = path_in(directory, "graph.bin")
+    graph.save(filename, journal=journal)
+    return filename
+
+
+def edited(graph, count):
+    """Adds count nodes, each joined to an existing node, as recorded (undoable) changes"""
+    anchors = sample_nodes(graph, count)
+    for i, anchor in enumerate(anchors):
+        graph.add_node(f"edit{i}", "circle")
+        graph.add_edge_to_graph(f"edit{i}", anchor)
+    return graph
+
+
+def batched(graph, names):
+    with graph.batch("Add nodes"):
+        for name in names:
+            graph.add_node(name, "circle")
+
+
+def undone(graph, count):
+    edited(graph, count)
+    while graph.undo() is not None:
+        pass
+    return graph
+
+
+def hamiltonian(graph):
+    try:
+        return graph.find_hamiltonian_cycles(max_expansions=HAMILTONIAN_EXPANSIONS)
+    except SearchBudgetExceeded:
+        return None
+
+
+class FakeCanvas:
+    """Stands in for tk.Canvas: keeps every item's coordinates and options, draws nothing"""
+
+    def __init__(self):
+        self.items = {}
+        self._ids = itertools.count(1)
+
+    def _create(self, *coordinates, **options):
+        item = next(self._ids)
+        self.items[item] = [coordinates, options]
+        return item
+
+    create_line = create_oval = create_rectangle = create_text = _create
+
+    def coords(self, item, *coordinates):
+        self.items[item][0] = coordinates
+
+    def itemconfig(self, item, **options):
+        self.items[item][1].update(options)
+
+    def delete(self, item):
+        if item == "all":
+            self.items.clear()
+        else:
+            self.items.pop(item, None)
+
+
+class FakeRoot:
+    """Stands in for tk.Tk: scheduled callbacks are only queued"""
+
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, delay, callback, *args):
+        self.scheduled.append((callback, args))
+
+    def after_idle(self, callback, *args):
+        self.scheduled.append((callback, args))
+
+
+def headless_editor(graph):
+    """Returns a GraphEditorGUI on graph with a FakeCanvas, built without Tk"""
+    from src.canvas_renderer import CanvasRenderer
+    from src.gui import HIT_THRESHOLD, GraphEditorGUI
+    from src.jobs import JobScheduler
+    from src.spatial_index import SpatialIndex
+    editor = GraphEditorGUI.__new__(GraphEditorGUI)  # __init__ needs a display
+    editor.root, editor.canvas = FakeRoot(), FakeCanvas()
+    editor.renderer = CanvasRenderer(editor.canvas)
+    editor.jobs = JobScheduler(editor.root)
+    editor.spatial_index = SpatialIndex(cell_size=2 * HIT_THRESHOLD)
+    editor.spatial_index.rebuild(graph.get_nodes())
+    editor.graph = graph
+    editor.redraw_pending = False
+    editor.selected_nodes = set()
+    editor.dragging_node = editor.initial_coordinates = None
+    editor.selection_start = editor.selection_rect = None
+    editor.layout_graph = editor.layout_engine = None
+    editor.queued_layouts = []
+    return editor
+
+
+def drag_setup(graph, directory):
+    editor = headless_editor(graph)
+    editor.draw_graph()
+    node = max(graph.get_nodes(), key=lambda node: len(graph.edge_records([node])))  # The busiest node
+    return editor, graph.get_nodes()[node]['pos']
+
+
+def drag(editor, start, events=100):
+    x, y = start
+    editor.on_mouse_press(types.SimpleNamespace(x=x, y=y))
+    for i in range(events):
+        editor.on_mouse_drag(types.SimpleNamespace(x=x + i, y=y + i % 7))
+    editor.on_mouse_release(types.SimpleNamespace(x=x + events, y=y))
+
+
+def product_factor(graph, directory):
+    return random_graph(20, 40, seed=1)
+
+
+def all_nodes(graph):
+    return list(graph.get_nodes())
+
+
+CASES = [
+    # Mutations
+    Case("add_node", lambda g, names: [g.add_node(name, "circle") for name in names],
+         setup=lambda g, d: [f"new{i}" for i in range(1000)]),
+    Case("add_nodes_from", lambda g, names: g.add_nodes_from(names, "circle"),
+         setup=lambda g, d: [f"new{i}" for i in range(len(g.get_nodes()))]),
+    Case("add_edge_to_graph", lambda g, pairs: [g.add_edge_to_graph(*pair) for pair in pairs],
+         setup=lambda g, d: node_pairs(g, 1000)),
+    Case("add_edges_from", lambda g, pairs: g.add_edges_from(pairs), setup=lambda g, d: node_pairs(g, len(g.get_nodes()))),
+    Case("remove_node", lambda g, names: [g.remove_node(name) for name in names],
+         setup=lambda g, d: sample_nodes(g, 100)),
+    Case("remove_nodes_from", lambda g, names: g.remove_nodes_from(names),
+         setup=lambda g, d: sample_nodes(g, len(g.get_nodes()) // 10)),
+    Case("remove_edge", lambda g, edges: [g.remove_edge(*edge) for edge in edges],
+         setup=lambda g, d: sample_edges(g, 100)),
+    Case("remove_edges_from", lambda g, edges: g.remove_edges_from(edges),
+         setup=lambda g, d: sample_edges(g, len(g.edge_records()) // 10)),
+    Case("rename_node", lambda g, names: [g.rename_node(name, f"{name}'") for name in names],
+         setup=lambda g, d: sample_nodes(g, 100)),
+    Case("rename_nodes", lambda g, mapping: g.rename_nodes(mapping),
+         setup=lambda g, d: {name: f"{name}'" for name in g.get_nodes()}),
+    Case("set_node_color", lambda g, names: [g.set_node_color(name, "red") for name in names],
+         setup=lambda g, d: sample_nodes(g, 1000)),
+    Case("set_edge_color", lambda g, edges: [g.set_edge_color(*edge, "red") for edge in edges],
+         setup=lambda g, d: sample_edges(g, 100)),
+    Case("set_node_attributes", lambda g, positions: g.set_node_attributes(positions, 'pos'),
+         setup=lambda g, d: {name: [1.0, 2.0] for name in g.get_nodes()}),
+    Case("drag_coalesced", lambda g, name: [g.set_node_attributes({name: [i, i]}, 'pos', coalesce="drag")
+                                            for i in range(1000)],
+         setup=lambda g, d: sample_nodes(g, 1)[0], covers=("set_node_attributes",)),
+    Case("batch", lambda g, names: batched(g, names),
+         setup=lambda g, d: [f"new{i}" for i in range(1000)]),
+    Case("change_listeners", lambda g, names: [g.add_node(name, "circle") for name in names],
+         setup=lambda g, d: (g.add_change_listener(lambda graph: None), [f"new{i}" for i in range(1000)])[1],
+         covers=("add_change_listener",)),
+    Case("remove_change_listener", lambda g, listeners: [g.remove_change_listener(listener) for listener in listeners],
+         setup=lambda g, d: [g.add_change_listener(listener) or listener
+                             for listener in [(lambda graph: None) for _ in range(100)]]),
+    Case("make_connected", lambda g, _: g.make_connected()),
+    Case("undo", lambda g, _: [g.undo() for _ in range(100)], setup=lambda g, d: edited(g, 50)),
+    Case("redo", lambda g, _: [g.redo() for _ in range(100)], setup=lambda g, d: undone(g, 50)),
+    # Queries
+    Case("get_nodes", lambda g, _: sum(1 for _ in g.get_nodes().items()), fresh=False),
+    Case("get_edges", lambda g, _: sum(1 for _ in g.get_edges()), fresh=False),
+    Case("has_edge", lambda g, pairs: [g.has_edge(*pair) for pair in pairs], setup=lambda g, d: node_pairs(g, 10_000),
+         fresh=False),
+    Case("get_edge_data", lambda g, edges: [g.get_edge_data(*edge) for edge in edges],
+         setup=lambda g, d: sample_edges(g, 10_000), fresh=False),
+    Case("get_node_color", lambda g, names: [g.get_node_color(name) for name in names],
+         setup=lambda g, d: sample_nodes(g, 1000), fresh=False),
+    Case("edge_records", lambda g, _: g.edge_records()),
+    Case("edge_records_incident", lambda g, names: g.edge_records(names), setup=lambda g, d: sample_nodes(g, 100),
+         covers=("edge_records",)),
+    Case("adjacency_matrix", lambda g, _: g.adjacency_matrix(), max_size=2_000),
+    Case("sparse_adjacency_matrix", lambda g, _: g.sparse_adjacency_matrix()),
+    Case("copy", lambda g, _: g.copy(), fresh=False),
+    # Analyses, from a cold cache
+    Case("is_connected", lambda g, _: g.is_connected()),
+    Case("is_strongly_connected", lambda g, _: g.is_strongly_connected()),
+    Case("check_connectivity", lambda g, _: g.check_connectivity()),
+    Case("eccentricities", lambda g, _: g.eccentricities()),
+    Case("radius_and_diameter", lambda g, _: g.radius_and_diameter()),
+    Case("center", lambda g, _: g.center()),
+    Case("shortest_path", lambda g, pairs: [g.shortest_path(*pair) for pair in pairs],
+         setup=lambda g, d: node_pairs(g, 100)),
+    Case("distance", lambda g, pairs: [g.distance(*pair) for pair in pairs], setup=lambda g, d: node_pairs(g, 100)),
+    Case("distance_matrix", lambda g, _: g.distance_matrix(workers=1), max_size=2_000),
+    Case("distance_matrix_parallel", lambda g, _: g.distance_matrix(), max_size=10_000, covers=("distance_matrix",)),
+    Case("find_hamiltonian_cycles", lambda g, _: hamiltonian(g), max_size=1_000),  # Pruning is O(n) per expansion
+    Case("layout_engine", lambda g, _: g.layout_engine()),
+    Case("layout", lambda g, _: g.layout(iterations=20)),
+    Case("layout_incremental", lambda g, names: g.layout(names, iterations=20), setup=lambda g, d: sample_nodes(g, 10),
+         covers=("layout",)),
+    Case("apply_layout", lambda g, engine: g.apply_layout(engine),
+         setup=lambda g, d: g.layout_engine(iterations=1)),
+    # Products, with a 20-node random factor
+    Case("tensor_product", lambda g, factor: g.tensor_product(factor).materialise(), setup=product_factor),
+    Case("cartesian_product", lambda g, factor: g.cartesian_product(factor).materialise(), setup=product_factor),
+    # Files
+    Case("save", lambda g, directory: g.save(path_in(directory, "graph.bin")), setup=lambda g, d: d),
+    Case("save_journal", lambda g, _: g.save(), setup=lambda g, d: edited(saved(g, d, journal=True) and g, 20),
+         covers=("save",)),
+    Case("load", lambda g, filename: Graph.load(filename), setup=saved, fresh=False),
+    Case("load_journal", lambda g, filename: Graph.load(filename),
+         setup=lambda g, d: (saved(g, d, journal=True), edited(g, 100).save())[0], covers=("load",)),
+    Case("open_mapped", lambda g, filename: Graph.open_mapped(filename).edge_records(), setup=saved, fresh=False),
+    Case("export_adjacency", lambda g, directory: g.export_adjacency(path_in(directory, "adjacency.npz")),
+         setup=lambda g, d: d),
+    # Drawing
+    Case("draw", lambda g, _: g.draw(), fresh=False),
+    Case("draw_graph", lambda g, editor: editor.draw_graph(), setup=lambda g, d: headless_editor(g), covers=()),
+    Case("gui_drag", lambda g, prepared: drag(*prepared), setup=drag_setup, covers=()),
+]
+
+
+def fresh_copy(graph):
+    copy = graph.copy()
+    copy._analysis_cache = {}  # The copy would otherwise share the original's cached analyses
+    return copy
+
+
+def run_case(case, graph, repeat, directory):
+    """Returns the timings in seconds of `repeat` runs of a case"""
+    timings = []
+    for _ in range(repeat):
+        target = fresh_copy(graph) if case.fresh else graph
+        with contextlib.redirect_stdout(io.StringIO()):  # Graph.save/load and the GUI report with print()
+            prepared = case.setup(target, directory) if case.setup else None
+            start = time.perf_counter()
+            case.run(target, prepared)
+            timings.append(time.perf_counter() - start)
+        if target.journal is not None:
+            target.journal.close()
+            target.journal = None
+    return timings
+
+
+def run_suite(generators, sizes, repeat, pattern=None, progress=print):
+    """Runs the selected cases on every generator and size; returns {key: result}"""
+    results = {}
+    cases = [case for case in CASES if pattern is None or re.search(pattern, case.name)]
+    for generator in generators:
+        for size in sizes:
+            graph = GENERATORS[generator](size, seed=0)
+            for case in cases:
+                if case.max_size is not None and size > case.max_size:
+                    continue
+                with tempfile.TemporaryDirectory() as directory:
+                    timings = run_case(case, graph, repeat, directory)
+                key = f"{generator}/{size}/{case.name}"
+                results[key] = {"generator": generator, "size": size, "case": case.name,
+                                "best": min(timings), "median": statistics.median(timings), "runs": timings}
+                progress(f"{key:<45} {min(timings) * 1000:>10.2f} ms")
+    return results
+
+
+def uncovered_members():
+    """Public Graph members that no case exercises, so new API does not go unmeasured"""
+    covered = {member for case in CASES for member in case.covers}
+    public = {name for name, _ in inspect.getmembers(Graph) if not name.startswith("_")}
+    return sorted(public - covered - set(NOT_BENCHMARKED))
+
+
+def compare(results, baseline, threshold):
+    """Returns (regressions, improvements) as lists of (key, baseline seconds, current seconds)"""
+    regressions, improvements = [], []
+    for key, result in results.items():
+        previous = baseline.get(key)
+        if previous is None or previous["best"] < NOISE_FLOOR:
+            continue
+        ratio = result["best"] / previous["best"]
+        if ratio > 1 + threshold:
+            regressions.append((key, previous["best"], result["best"]))
+        elif ratio < 1 / (1 + threshold):
+            improvements.append((key, previous["best"], result["best"]))
+    return regressions, improvements
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--generators", nargs="+", choices=sorted(GENERATORS), default=sorted(GENERATORS))
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--cases", help="only run cases whose name matches this regular expression")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file to check the results against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="relative slow-down reported as a regression (default %(default)s)")
+    args = parser.parse_args()
+
+    missing = uncovered_members()
+    if missing:
+        print(f"Warning: no benchmark case for Graph.{', Graph.'.join(missing)}", file=sys.stderr)
+
+    results = run_suite(args.generators, args.sizes, args.repeat, args.cases)
+    report = {
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=1)
+        print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)["results"]
+        regressions, improvements = compare(results, baseline, args.threshold)
+        for title, rows in (("Improvements", improvements), ("Regressions", regressions)):
+            if rows:
+                print(f"\n{title} (best time, threshold {args.threshold:.0%}):")
+                for key, before, after in rows:
+                    print(f"  {key:<45} {before * 1000:>10.2f} ms -> {after * 1000:>10.2f} ms ({after / before:.2f}x)")
+        if regressions:
+            sys.exit(1)
+        print("\nNo regressions.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,9 @@
 #!/usr/bin/env python3
 
+from src import instrumentation
 from src.gui import GraphEditorGUI
 
 if __name__ == "__main__":
+    instrumentation.configure_from_environment()
     app = GraphEditorGUI()
     app.run()
@@ -0,0 +1,290 @@
+"""Array-backed graph storage engine with the same method surface as Graph.
+
+Nodes are interned to integer ids. Edges live in a CSR structure of NumPy arrays plus
+a small delta buffer holding recent edits; every edge is a single record with a
+directed flag, so an undirected edge is not mirrored. The delta buffer is merged into
+the CSR arrays once it grows past a threshold.
+"""
+import bisect
+
+import numpy as np
+from scipy import sparse
+
+COMPACT_MIN_EDITS = 1024  # Never compact for fewer pending edits than this
+
+
+class ArrayGraph:
+    def __init__(self, canvas_width=800, canvas_height=600):
+        """Initializes an empty store with the canvas dimensions for node placement"""
+        self.canvas_width = canvas_width
+        self.canvas_height = canvas_height
+
+        # Intern table: node ids are never reused, removed ids keep a None name
+        self.names = []  # id -> name
+        self.ids = {}  # name -> id
+
+        # Node attribute columns, grown by doubling
+        self.pos = np.zeros((16, 2), dtype=np.float32)
+        self.shape_codes = np.zeros(16, dtype=np.int32)
+        self.color_codes = np.full(16, -1, dtype=np.int32)
+        self.strings = []  # Interned attribute strings (shapes and colours)
+        self.string_codes = {}
+
+        # Compacted edges in CSR form, one record per edge
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.indices = np.zeros(0, dtype=np.int32)
+        self.directed = np.zeros(0, dtype=bool)
+        self.alive = np.zeros(0, dtype=bool)  # False for records removed since the last compaction
+        self.removed = 0
+
+        # Recent edits not yet merged into the CSR arrays: (source id, target id) -> directed
+        self.delta = {}
+
+    # --- node helpers -------------------------------------------------------
+
+    def _intern(self, value):
+        code = self.string_codes.get(value)
+        if code is None:
+            code = self.string_codes[value] = len(self.strings)
+            self.strings.append(value)
+        return code
+
+    def _grow_nodes(self):
+        capacity = len(self.names)
+        if capacity < len(self.shape_codes):
+            return
+        new_capacity = 2 * len(self.shape_codes)
+        self.pos = np.resize(self.pos, (new_capacity, 2))
+        self.shape_codes = np.resize(self.shape_codes, new_capacity)
+        color_codes = np.full(new_capacity, -1, dtype=np.int32)
+        color_codes[:capacity] = self.color_codes[:capacity]
+        self.color_codes = color_codes
+
+    def __contains__(self, name):
+        return name in self.ids
+
+    def __len__(self):
+        return len(self.ids)
+
+    def get_nodes(self):
+        return list(self.ids)
+
+    def number_of_edges(self):
+        return int(self.alive.sum()) + len(self.delta)
+
+    def node_attributes(self, name):
+        """Returns the attributes of a node as the dict a networkx node would carry"""
+        node_id = self.ids[name]
+        attributes = {'pos': self.pos[node_id].tolist(), 'shape': self.strings[self.shape_codes[node_id]]}
+        if self.color_codes[node_id] >= 0:
+            attributes['color'] = self.strings[self.color_codes[node_id]]
+        return attributes
+
+    def set_node_color(self, name, color):
+        if name not in self.ids:
+            raise ValueError("Node does not exist")
+        self.color_codes[self.ids[name]] = self._intern(color)
+
+    # --- edge records -------------------------------------------------------
+
+    def _find(self, i, j):
+        """Returns the directed flag of the record stored as i -> j, or None"""
+        directed = self.delta.get((i, j))
+        if directed is not None:
+            return directed
+        if i + 1 < len(self.indptr):
+            # bisect on the array avoids the per-call overhead of np.searchsorted on short rows
+            end = int(self.indptr[i + 1])
+            position = bisect.bisect_left(self.indices, j, int(self.indptr[i]), end)
+            if position < end and self.indices[position] == j and self.alive[position]:
+                return bool(self.directed[position])
+        return None
+
+    def _record_for(self, i, j):
+        """Returns the stored (source, target) of the record providing the edge i -> j, or None"""
+        if self._find(i, j) is not None:
+            return i, j
+        if self._find(j, i) is False:  # Undirected records work in both directions
+            return j, i
+        return None
+
+    def _discard(self, i, j):
+        """Removes the record stored as i -> j"""
+        if self.delta.pop((i, j), None) is not None:
+            return
+        position = bisect.bisect_left(self.indices, j, int(self.indptr[i]), int(self.indptr[i + 1]))
+        self.alive[position] = False
+        self.removed += 1
+        self._maybe_compact()
+
+    def _insert(self, i, j, directed):
+        self.delta[(i, j)] = directed
+        self._maybe_compact()
+
+    def _maybe_compact(self):
+        pending = len(self.delta) + self.removed
+        if pending > max(COMPACT_MIN_EDITS, len(self.indices) // 4):
+            self.compact()
+
+    def compact(self):
+        """Merges the delta buffer into the CSR arrays and drops removed records"""
+        keep = self.alive
+        sources = np.repeat(np.arange(len(self.indptr) - 1, dtype=np.int32), np.diff(self.indptr))[keep]
+        targets = self.indices[keep]
+        directed = self.directed[keep]
+        if self.delta:
+            delta = np.array([(i, j, d) for (i, j), d in self.delta.items()], dtype=np.int64).reshape(-1, 3)
+            sources = np.concatenate([sources, delta[:, 0].astype(np.int32)])
+            targets = np.concatenate([targets, delta[:, 1].astype(np.int32)])
+            directed = np.concatenate([directed, delta[:, 2].astype(bool)])
+
+        order = np.lexsort((targets, sources))
+        self.indices = targets[order]
+        self.directed = directed[order]
+        self.alive = np.ones(len(order), dtype=bool)
+        self.indptr = np.zeros(len(self.names) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=len(self.names)), out=self.indptr[1:])
+        self.delta = {}
+        self.removed = 0
+
+    def _records(self):
+        """Yields (source id, target id, directed) for every live record"""
+        sources = np.repeat(np.arange(len(self.indptr) - 1), np.diff(self.indptr))[self.alive]
+        yield from zip(sources.tolist(), self.indices[self.alive].tolist(), self.directed[self.alive].tolist())
+        for (i, j), directed in self.delta.items():
+            yield i, j, directed
+
+    def edges(self):
+        """Yields (node1, node2, directed) once per edge; undirected edges are not repeated"""
+        names = self.names
+        for i, j, directed in self._records():
+            yield names[i], names[j], directed
+
+    # --- Graph method surface -----------------------------------------------
+
+    def add_node(self, name, shape):
+        """Add a node with attributes at the center of the canvas"""
+        node_id = self.ids.get(name)
+        if node_id is None:
+            self._grow_nodes()
+            node_id = self.ids[name] = len(self.names)
+            self.names.append(name)
+        self.pos[node_id] = (self.canvas_width / 2, self.canvas_height / 2)
+        self.shape_codes[node_id] = self._intern(shape)
+
+    def add_edge_to_graph(self, node1, node2, directed=False):
+        """Adds an edge to the graph (directed or undirected); an undirected edge replaces directed ones"""
+        if node1 not in self.ids or node2 not in self.ids:
+            raise ValueError(f"Nodes {node1} and/or {node2} do not exist in the graph.")
+        i, j = self.ids[node1], self.ids[node2]
+
+        if directed:
+            if self._record_for(i, j) is None:
+                self._insert(i, j, True)
+            return
+
+        if self._find(i, j) is False or self._find(j, i) is False:
+            return  # Already undirected
+        for a, b in ((i, j), (j, i)):
+            if self._find(a, b):
+                self._discard(a, b)
+        self._insert(i, j, False)
+
+    def has_edge(self, node1, node2, directed=False):
+        """Checks if there is an edge between node1 and node2 (directed or undirected)."""
+        i, j = self.ids.get(node1), self.ids.get(node2)
+        if i is None or j is None:
+            return False
+        if directed:
+            return self._record_for(i, j) is not None
+        return self._find(i, j) is not None or self._find(j, i) is not None
+
+    def remove_node(self, node_name):
+        """Removes a node and all its associated edges from the graph"""
+        if node_name not in self.ids:
+            raise ValueError(f"Node {node_name} does not exist.")
+        node_id = self.ids.pop(node_name)
+        self.names[node_id] = None
+
+        # Vectorised scan for records pointing at the node, then drop its own row
+        incoming = self.alive & (self.indices == node_id)
+        if node_id + 1 < len(self.indptr):
+            incoming[self.indptr[node_id]:self.indptr[node_id + 1]] = self.alive[
+                self.indptr[node_id]:self.indptr[node_id + 1]]
+        self.removed += int(incoming.sum())
+        self.alive &= ~incoming
+        self.delta = {key: d for key, d in self.delta.items() if node_id not in key}
+        self._maybe_compact()
+
+    def remove_edge(self, node1, node2):
+        """Removes an edge between two nodes (an undirected edge is removed in both directions)"""
+        i, j = self.ids.get(node1), self.ids.get(node2)
+        record = self._record_for(i, j) if i is not None and j is not None else None
+        if record is None:
+            raise ValueError(f"Edge between {node1} and {node2} does not exist.")
+        self._discard(*record)
+
+    def rename_node(self, old_name, new_name):
+        """Renames a node from old_name to new_name; only the intern table changes."""
+        if old_name not in self.ids:
+            return False, f"Node '{old_name}' does not exist."
+        if new_name in self.ids:
+            return False, f"Node '{new_name}' already exists."
+        node_id = self.ids.pop(old_name)
+        self.ids[new_name] = node_id
+        self.names[node_id] = new_name
+        return True, f"Node '{old_name}' renamed to '{new_name}'."
+
+    def get_edge_data(self, node1, node2):
+        """Returns edge data between two nodes, checking for edges in both directions and determining 'directed' attribute."""
+        i, j = self.ids.get(node1), self.ids.get(node2)
+        forward = self._record_for(i, j) if i is not None and j is not None else None
+        reverse = self._record_for(j, i) if i is not None and j is not None else None
+        if forward is None and reverse is None:
+            raise ValueError(f"No edge exists between {node1} and {node2}")
+        if forward is None or reverse is not None:
+            return {'directed': False}
+        return {'directed': self._find(*forward)}
+
+    # --- conversion ---------------------------------------------------------
+
+    def adjacency(self):
+        """Returns (node names, scipy CSR matrix) with undirected records in both directions"""
+        alive_ids = np.array([node_id for node_id, name in enumerate(self.names) if name is not None],
+                             dtype=np.int64)
+        position = np.full(len(self.names), -1, dtype=np.int64)
+        position[alive_ids] = np.arange(len(alive_ids))
+        records = np.array(list(self._records()), dtype=np.int64).reshape(-1, 3)
+        undirected = records[:, 2] == 0
+        rows = np.concatenate([records[:, 0], records[undirected, 1]])
+        columns = np.concatenate([records[:, 1], records[undirected, 0]])
+        n = len(alive_ids)
+        matrix = sparse.csr_array((np.ones(len(rows), dtype=np.int8), (position[rows], position[columns])),
+                                  shape=(n, n))
+        matrix.data[:] = 1  # Duplicates from undirected self-loops count once
+        return [self.names[i] for i in alive_ids.tolist()], matrix
+
+    @staticmethod
+    def from_graph(graph):
+        """Builds an ArrayGraph holding the nodes and edges of a networkx-backed Graph"""
+        store = ArrayGraph(graph.canvas_width, graph.canvas_height)
+        for node, attributes in graph.get_nodes().items():
+            store.add_node(node, attributes.get('shape', 'circle'))
+            if 'pos' in attributes:
+                store.pos[store.ids[node]] = attributes['pos']
+            if 'color' in attributes:
+                store.set_node_color(node, attributes['color'])
+        for node1, node2, directed in graph.graph.edges(data='directed', default=False):
+            store.add_edge_to_graph(node1, node2, directed)
+        store.compact()
+        return store
+
+    def to_graph(self):
+        """Builds a networkx-backed Graph with the same nodes and edges"""
+        from src.graph_logic import Graph
+
+        graph = Graph(self.canvas_width, self.canvas_height)
+        graph.graph.add_nodes_from((name, self.node_attributes(name)) for name in self.ids)
+        for node1, node2, directed in self.edges():
+            graph.add_edge_to_graph(node1, node2, directed)
+        return graph
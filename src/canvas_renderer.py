@@ -0,0 +1,92 @@
+import tkinter as tk
+
+NODE_RADIUS = 10  # Default size for circle and square
+LABEL_OFFSET = 10  # Distance between the top of a node and its label
+SELECTION_COLOR = "red"  # Outline of nodes picked with the rubber band
+
+
+class CanvasRenderer:
+    """Retained-mode renderer that remembers the canvas items created for every node and edge.
+
+    A full rebuild is only needed when the graph structure changes; moving a node only
+    updates the coordinates of the node's own items and of its incident edges.
+    """
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.node_items = {}  # node -> (shape item id, label item id)
+        self.edge_items = {}  # (node1, node2) -> line item id
+        self.incident_edges = {}  # node -> list of (node1, node2) keys touching the node
+
+    def clear(self):
+        """Remove every item from the canvas and forget the item mapping"""
+        self.canvas.delete("all")
+        self.node_items.clear()
+        self.edge_items.clear()
+        self.incident_edges.clear()
+
+    def rebuild(self, graph):
+        """Recreate all canvas items for the graph (used after structural changes)"""
+        self.clear()
+        nodes = graph.get_nodes()
+
+        # Edges first so that nodes are stacked on top of them; one line per undirected edge
+        for node1, node2, directed, color in graph.edge_records():
+            key = (node1, node2)
+            self.edge_items[key] = self._create_edge(nodes[node1]['pos'], nodes[node2]['pos'], directed, color)
+            self.incident_edges.setdefault(node1, []).append(key)
+            if node2 != node1:
+                self.incident_edges.setdefault(node2, []).append(key)
+
+        for node, attributes in nodes.items():
+            self.node_items[node] = self._create_node(node, attributes)
+
+    def move_node(self, graph, node):
+        """Move a single node and its incident edges to the node's current 'pos'"""
+        nodes = graph.get_nodes()
+        x, y = nodes[node]['pos']
+        shape_item, label_item = self.node_items[node]
+        self.canvas.coords(shape_item, x - NODE_RADIUS, y - NODE_RADIUS, x + NODE_RADIUS, y + NODE_RADIUS)
+        self.canvas.coords(label_item, x, y - NODE_RADIUS - LABEL_OFFSET)
+
+        for node1, node2 in self.incident_edges.get(node, ()):
+            pos1, pos2 = nodes[node1]['pos'], nodes[node2]['pos']
+            self.canvas.coords(self.edge_items[(node1, node2)], pos1[0], pos1[1], pos2[0], pos2[1])
+
+    def update_node_style(self, graph, node):
+        """Apply the node's current colour without touching any other item"""
+        shape_item, _ = self.node_items[node]
+        self.canvas.itemconfig(shape_item, fill=graph.get_nodes()[node]['color'])
+
+    def set_selected(self, node, selected):
+        """Highlight a node's outline when it is part of the current selection"""
+        shape_item, _ = self.node_items[node]
+        if selected:
+            self.canvas.itemconfig(shape_item, outline=SELECTION_COLOR, width=3)
+        else:
+            self.canvas.itemconfig(shape_item, outline="black", width=1)
+
+    def _create_edge(self, pos1, pos2, directed, edge_color):
+        if directed:
+            # Draw the arrow from node1 to node2 for directed edges
+            return self.canvas.create_line(pos1[0], pos1[1], pos2[0], pos2[1],
+                                           fill=edge_color, arrow=tk.LAST, width=5,
+                                           arrowshape=(10, 20, 10))
+        # Draw undirected edge as a line
+        return self.canvas.create_line(pos1[0], pos1[1], pos2[0], pos2[1],
+                                       fill=edge_color, width=3)
+
+    def _create_node(self, node, attributes):
+        x, y = attributes['pos']
+        color = attributes['color']
+        # Draw node shape (square, anything else falls back to a circle)
+        if attributes['shape'] == 'square':
+            shape_item = self.canvas.create_rectangle(x - NODE_RADIUS, y - NODE_RADIUS,
+                                                      x + NODE_RADIUS, y + NODE_RADIUS, fill=color)
+        else:
+            shape_item = self.canvas.create_oval(x - NODE_RADIUS, y - NODE_RADIUS,
+                                                 x + NODE_RADIUS, y + NODE_RADIUS, fill=color)
+
+        # Draw the node label slightly above the node, with black text
+        label_item = self.canvas.create_text(x, y - NODE_RADIUS - LABEL_OFFSET, text=str(node), fill="black")
+        return shape_item, label_item
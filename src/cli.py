@@ -0,0 +1,131 @@
+"""Headless batch runner: analyses many graph files on a process pool without Tk or matplotlib.
+
+One JSON object per file is written to stdout as soon as that file is done, and a
+per-analysis timing summary goes to stderr at the end, so stdout stays valid JSON lines.
+"""
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from src.graph_format import is_graph_file
+from src.graph_logic import Graph
+from src.hamiltonian import SearchBudgetExceeded
+
+GRAPH_PATTERN = "*.bin"  # Files picked up from a directory argument
+
+
+def _connectivity(graph, options):
+    return graph.check_connectivity()
+
+
+def _radius_and_diameter(graph, options):
+    radius, diameter = graph.radius_and_diameter()
+    return {"radius": radius, "diameter": diameter}
+
+
+def _center(graph, options):
+    return graph.center()
+
+
+def _hamiltonian(graph, options):
+    try:
+        cycles = graph.find_hamiltonian_cycles(timeout=options["timeout"], max_expansions=options["max_expansions"])
+    except SearchBudgetExceeded as e:
+        return {"cycle": None, "budget_exceeded": True, "expansions": e.expansions}
+    return {"cycle": cycles[0] if cycles else None, "budget_exceeded": False}
+
+
+ANALYSES = {
+    "connectivity": _connectivity,
+    "radius_diameter": _radius_and_diameter,
+    "center": _center,
+    "hamiltonian": _hamiltonian,
+}
+
+
+def expand_paths(arguments):
+    """Turns directories, glob patterns and file names into a sorted, de-duplicated list of files"""
+    files = set()
+    for argument in arguments:
+        if os.path.isdir(argument):
+            files.update(glob.glob(os.path.join(argument, GRAPH_PATTERN)))
+        elif glob.has_magic(argument):
+            files.update(path for path in glob.glob(argument, recursive=True) if os.path.isfile(path))
+        else:
+            files.add(argument)
+    return sorted(files)
+
+
+def analyze_file(path, analyses, options):
+    """Loads one graph file and runs the requested analyses; runs inside a worker process"""
+    record = {"file": path, "nodes": None, "edges": None, "results": {}, "timings": {}}
+    # Graph and its helpers report through print; keep that off the JSON lines on stdout
+    log = sys.stderr if options["verbose"] else io.StringIO()
+    with contextlib.redirect_stdout(log):
+        try:
+            start = time.perf_counter()
+            graph = Graph.open_mapped(path) if is_graph_file(path) else Graph.load(path)
+            record["timings"]["load"] = time.perf_counter() - start
+            record["nodes"] = len(graph.get_nodes())
+            record["edges"] = len(graph.get_edges())
+            for name in analyses:
+                start = time.perf_counter()
+                record["results"][name] = ANALYSES[name](graph, options)
+                record["timings"][name] = time.perf_counter() - start
+        except Exception as e:
+            record["error"] = f"{type(e).__name__}: {e}"
+    return record
+
+
+def print_summary(timings, files, errors, elapsed, stream):
+    """Writes count, total, mean and max time per analysis"""
+    print(f"{len(files)} files, {errors} errors, {elapsed:.2f} s wall time", file=stream)
+    print(f"{'analysis':<16} {'count':>6} {'total s':>10} {'mean ms':>10} {'max ms':>10}", file=stream)
+    for name, values in timings.items():
+        print(f"{name:<16} {len(values):>6} {sum(values):>10.3f} {sum(values) / len(values) * 1000:>10.2f} "
+              f"{max(values) * 1000:>10.2f}", file=stream)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run graph analyses over many graph files without the GUI.")
+    parser.add_argument("paths", nargs="+", help="graph files, directories (*.bin) or glob patterns")
+    parser.add_argument("-a", "--analyses", nargs="+", choices=list(ANALYSES), default=list(ANALYSES))
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--timeout", type=float, default=10.0, help="Hamiltonian search budget per file, seconds")
+    parser.add_argument("--max-expansions", type=int, default=None, help="Hamiltonian search step budget per file")
+    parser.add_argument("-o", "--output", help="write the JSON lines to this file instead of stdout")
+    parser.add_argument("-v", "--verbose", action="store_true", help="pass the graph library's messages to stderr")
+    args = parser.parse_args(argv)
+
+    files = expand_paths(args.paths)
+    if not files:
+        parser.error("no graph files found")
+    options = {"timeout": args.timeout, "max_expansions": args.max_expansions, "verbose": args.verbose}
+
+    output = open(args.output, "w") if args.output else sys.stdout
+    timings = {name: [] for name in ["load"] + args.analyses}
+    errors = 0
+    start = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+            futures = [pool.submit(analyze_file, path, args.analyses, options) for path in files]
+            for future in as_completed(futures):
+                record = future.result()
+                errors += "error" in record
+                for name, seconds in record["timings"].items():
+                    timings[name].append(seconds)
+                output.write(json.dumps(record, default=str) + "\n")
+                output.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    print_summary({name: values for name, values in timings.items() if values}, files, errors,
+                  time.perf_counter() - start, sys.stderr)
+    return 1 if errors else 0
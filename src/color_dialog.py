@@ -0,0 +1,37 @@
+"""Small Tk window for colouring a node by name; imported on the first Graph.gui_color_node() call."""
+import tkinter as tk
+
+
+def color_node_dialog(graph):
+    """GUI for selecting node and color"""
+    def on_color_change():
+        node_name = node_name_entry.get()
+        color = color_entry.get()
+        try:
+            graph.set_node_color(node_name, color)
+        except ValueError as e:
+            error_label.config(text=str(e))
+
+    # Create a simple Tkinter window for color selection
+    gui_window = tk.Tk()
+    gui_window.title("Color Node")
+
+    # Entry for node name
+    tk.Label(gui_window, text="Enter Node Name:").pack()
+    node_name_entry = tk.Entry(gui_window)
+    node_name_entry.pack()
+
+    # Entry for color
+    tk.Label(gui_window, text="Enter Color:").pack()
+    color_entry = tk.Entry(gui_window)
+    color_entry.pack()
+
+    # Button to change color
+    color_button = tk.Button(gui_window, text="Change Color", command=on_color_change)
+    color_button.pack()
+
+    # Label for error messages
+    error_label = tk.Label(gui_window, text="", fg="red")
+    error_label.pack()
+
+    gui_window.mainloop()
@@ -0,0 +1,70 @@
+class ConnectivityIndex:
+    """Union-find over weakly connected components, maintained as nodes and edges are added.
+
+    Insertions are applied incrementally. Deletions cannot be undone in a union-find, so
+    they only mark the index dirty; it is rebuilt from the graph on the next query.
+    """
+
+    def __init__(self):
+        self.parent = {}  # node -> parent node, roots point to themselves
+        self.size = {}  # root -> number of nodes in its component
+        self.order = {}  # root -> position of the component's first node, keeps representatives stable
+        self.count = 0
+        self.dirty = False
+
+    def invalidate(self):
+        self.dirty = True
+
+    def add_node(self, node):
+        if self.dirty or node in self.parent:
+            return
+        self.parent[node] = node
+        self.size[node] = 1
+        self.order[node] = len(self.parent)
+        self.count += 1
+
+    def find(self, node):
+        parent = self.parent
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]  # Path halving
+            node = parent[node]
+        return node
+
+    def union(self, node1, node2):
+        if self.dirty:
+            return
+        root1, root2 = self.find(node1), self.find(node2)
+        if root1 == root2:
+            return
+        if self.size[root1] < self.size[root2]:
+            root1, root2 = root2, root1
+        self.parent[root2] = root1
+        self.size[root1] += self.size.pop(root2)
+        self.order[root1] = min(self.order[root1], self.order.pop(root2))
+        self.count -= 1
+
+    def rebuild(self, nodes, adjacency):
+        """Recomputes the components from a node list and its sparse adjacency matrix"""
+        from scipy.sparse import csgraph  # Loaded on the first rebuild, not with Graph
+        self.parent, self.size, self.order = {}, {}, {}
+        self.dirty = False
+        if not nodes:
+            self.count = 0
+            return
+        self.count, labels = csgraph.connected_components(adjacency, directed=True, connection="weak")
+        roots = [None] * self.count
+        for position, (node, label) in enumerate(zip(nodes, labels.tolist())):
+            root = roots[label]
+            if root is None:
+                root = roots[label] = node
+                self.size[root] = 0
+                self.order[root] = position
+            self.parent[node] = root
+            self.size[root] += 1
+
+    def component_count(self):
+        return self.count
+
+    def representatives(self):
+        """Returns one node per weakly connected component, in order of first appearance"""
+        return sorted(self.size, key=self.order.get)
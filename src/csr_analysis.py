@@ -0,0 +1,47 @@
+"""Connectivity and distance analyses on a scipy CSR adjacency matrix.
+
+These helpers never build per-node Python objects, so they work the same on a matrix
+built from a networkx graph and on one viewing the arrays of a memory-mapped file.
+"""
+import numpy as np
+from scipy.sparse import csgraph
+
+ECCENTRICITY_CHUNK = 256  # BFS sources per shortest_path call, bounds the n x chunk distance block
+
+
+def component_count(adjacency, strong=False):
+    """Returns the number of weakly (or strongly) connected components"""
+    if adjacency.shape[0] == 0:
+        return 0
+    count, _ = csgraph.connected_components(adjacency, directed=True,
+                                            connection="strong" if strong else "weak")
+    return count
+
+
+def is_weakly_connected(adjacency):
+    return component_count(adjacency) == 1
+
+
+def is_strongly_connected(adjacency):
+    return component_count(adjacency, strong=True) == 1
+
+
+def eccentricities(adjacency, chunk_size=ECCENTRICITY_CHUNK, progress=None):
+    """Returns the out-eccentricity of every node, or None when some node cannot reach another.
+
+    Distances come from the C breadth-first search in scipy, run for a block of sources at
+    a time so that memory stays at O(n * chunk_size). `progress(done, total)` is called
+    after every block.
+    """
+    n = adjacency.shape[0]
+    result = np.empty(n, dtype=np.int64)
+    for start in range(0, n, chunk_size):
+        sources = np.arange(start, min(start + chunk_size, n))
+        distances = csgraph.shortest_path(adjacency, directed=True, unweighted=True, indices=sources)
+        farthest = distances.max(axis=1)
+        if np.isinf(farthest).any():
+            return None
+        result[start:start + len(sources)] = farthest
+        if progress is not None:
+            progress(start + len(sources), n)
+    return result
@@ -0,0 +1,315 @@
+"""Versioned columnar file format for graphs.
+
+Layout (little endian, every section 8-byte aligned)::
+
+    header     magic, version, journal generation, section count, node/edge/string counts, canvas size
+    sections   (offset, nbytes) pairs, one per entry of SECTIONS
+    data       the section arrays themselves
+
+Node names, shapes and colours are interned in one string table and referenced by
+int32 codes (-1 means "not set"). Edges are stored in CSR form with every undirected
+edge kept once and a packed bitmap marking which edges are directed. All sections can
+be viewed with ``numpy.frombuffer`` straight from the file bytes or from an mmap.
+
+The generation tags a snapshot written for a journal (src/journal.py); plain saves use 0.
+"""
+import contextlib
+import mmap
+import os
+import pickle
+import struct
+
+import networkx as nx
+import numpy as np
+
+MAGIC = b"GEDGRAPH"
+FORMAT_VERSION = 1
+NO_CODE = -1  # Code used for attributes that are not set
+
+_HEADER = struct.Struct("<8sHHIqqqdd")  # magic, version, generation, sections, nodes, edges, strings, width, height
+_SECTION_ENTRY = struct.Struct("<qq")  # offset, nbytes
+
+# Section name and element dtype, in file order
+SECTIONS = (
+    ("string_offsets", np.int64),  # n_strings + 1 byte offsets into string_data
+    ("string_data", np.uint8),  # utf-8 bytes of every interned string
+    ("node_name", np.int32),  # string code of every node name
+    ("node_pos", np.float32),  # n_nodes x 2 positions, NaN when a node has no position
+    ("node_shape", np.int32),  # string code of the 'shape' attribute
+    ("node_color", np.int32),  # string code of the 'color' attribute used by the editor
+    ("plot_color", np.int32),  # string code of Graph.node_colors used by Graph.draw
+    ("edge_indptr", np.int64),  # n_nodes + 1 CSR row pointers
+    ("edge_indices", np.int32),  # target node of every edge, sorted within a row
+    ("edge_directed", np.uint8),  # packed bitmap, bit set when the edge is directed
+    ("edge_color", np.int32),  # string code of the edge 'color' attribute
+)
+
+
+def is_graph_file(filename):
+    """Checks whether a file starts with the columnar format magic"""
+    with open(filename, "rb") as file:
+        return file.read(len(MAGIC)) == MAGIC
+
+
+class GraphArrays:
+    """Read-only NumPy views over the sections of a graph file"""
+
+    def __init__(self, buffer):
+        header = _HEADER.unpack_from(buffer, 0)
+        magic, version, generation, section_count, n_nodes, n_edges, n_strings, width, height = header
+        if magic != MAGIC:
+            raise ValueError("Not a graph file: bad magic")
+        if version > FORMAT_VERSION:
+            raise ValueError(f"Unsupported graph file version {version}")
+
+        self.buffer = buffer
+        self.version = version
+        self.generation = generation
+        self.n_nodes = n_nodes
+        self.n_edges = n_edges
+        self.n_strings = n_strings
+        self.canvas_width = width
+        self.canvas_height = height
+
+        for index in range(section_count):
+            name, dtype = SECTIONS[index]
+            offset, nbytes = _SECTION_ENTRY.unpack_from(buffer, _HEADER.size + index * _SECTION_ENTRY.size)
+            array = np.frombuffer(buffer, dtype=dtype, count=nbytes // np.dtype(dtype).itemsize, offset=offset)
+            setattr(self, name, array)
+        self.node_pos = self.node_pos.reshape(n_nodes, 2)
+        self._strings = None
+
+    def string(self, code):
+        """Decodes a single interned string"""
+        start, end = self.string_offsets[code], self.string_offsets[code + 1]
+        return self.string_data[start:end].tobytes().decode("utf-8")
+
+    def strings(self):
+        """Decodes the whole string table once and caches it"""
+        if self._strings is None:
+            data = self.string_data.tobytes()
+            offsets = self.string_offsets.tolist()
+            self._strings = [data[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(self.n_strings)]
+        return self._strings
+
+    def node_names(self):
+        strings = self.strings()
+        return [strings[code] for code in self.node_name.tolist()]
+
+    def directed_mask(self):
+        """Returns a boolean array telling which edges are directed"""
+        return np.unpackbits(self.edge_directed, count=self.n_edges).astype(bool)
+
+    def edge_sources(self):
+        """Expands the CSR row pointers into the source node of every edge"""
+        return np.repeat(np.arange(self.n_nodes, dtype=np.int32), np.diff(self.edge_indptr))
+
+    def fill(self, graph):
+        """Populates an empty Graph with the nodes, edges and colours stored in the file"""
+        strings = self.strings()
+        names = self.node_names()
+
+        def attribute(codes):
+            return [strings[code] if code != NO_CODE else None for code in codes.tolist()]
+
+        nodes = []
+        for name, pos, shape, color in zip(names, self.node_pos.tolist(), attribute(self.node_shape),
+                                           attribute(self.node_color)):
+            attributes = {}
+            if pos[0] == pos[0]:  # NaN marks a missing position
+                attributes['pos'] = pos
+            if shape is not None:
+                attributes['shape'] = shape
+            if color is not None:
+                attributes['color'] = color
+            nodes.append((name, attributes))
+        graph.graph.add_nodes_from(nodes)
+
+        for name, plot_color in zip(names, attribute(self.plot_color)):
+            if plot_color is not None:
+                graph.node_colors[name] = plot_color
+
+        # Add edges in bulk per kind; undirected edges live in both directions in the DiGraph
+        name_array = np.empty(len(names), dtype=object)
+        name_array[:] = names
+        sources, targets = name_array[self.edge_sources()], name_array[self.edge_indices]
+        directed = self.directed_mask()
+        graph.graph.add_edges_from(zip(sources[directed], targets[directed]), directed=True)
+        undirected = ~directed
+        graph.graph.add_edges_from(zip(sources[undirected], targets[undirected]), directed=False)
+        graph.graph.add_edges_from(zip(targets[undirected], sources[undirected]), directed=False)
+
+        for i in np.flatnonzero(self.edge_color != NO_CODE).tolist():
+            color = strings[self.edge_color[i]]
+            graph.graph[sources[i]][targets[i]]['color'] = color
+            if not directed[i]:
+                graph.graph[targets[i]][sources[i]]['color'] = color
+        return graph
+
+
+def read_graph(filename):
+    """Reads a graph file into memory and returns its GraphArrays"""
+    with open(filename, "rb") as file:
+        return GraphArrays(file.read())
+
+
+def map_graph(filename):
+    """Memory-maps a graph file read-only and returns its GraphArrays"""
+    with open(filename, "rb") as file:
+        return GraphArrays(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+@contextlib.contextmanager
+def atomic_open(filename):
+    """Opens a temporary file for writing that replaces filename once it is complete and synced to disk.
+
+    If writing fails, the temporary file is removed and filename is left untouched.
+    """
+    temporary = f"{filename}.tmp"
+    try:
+        with open(temporary, "wb") as file:
+            yield file
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, filename)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(temporary)
+        raise
+
+
+def write_graph(graph, filename, generation=0):
+    """Writes a Graph in the columnar format, atomically (see atomic_open)"""
+    digraph = graph.graph
+    nodes = list(digraph.nodes)
+    index = {node: i for i, node in enumerate(nodes)}
+
+    strings = {}  # string -> code
+
+    def intern(value):
+        if value is None:
+            return NO_CODE
+        if not isinstance(value, str):
+            raise TypeError(f"Only string names and attributes can be saved, got {value!r}")
+        code = strings.get(value)
+        if code is None:
+            code = strings[value] = len(strings)
+        return code
+
+    node_name = np.empty(len(nodes), dtype=np.int32)
+    node_pos = np.full((len(nodes), 2), np.nan, dtype=np.float32)
+    node_shape = np.empty(len(nodes), dtype=np.int32)
+    node_color = np.empty(len(nodes), dtype=np.int32)
+    plot_color = np.empty(len(nodes), dtype=np.int32)
+    for i, (node, attributes) in enumerate(digraph.nodes.items()):
+        node_name[i] = intern(node)
+        if 'pos' in attributes:
+            node_pos[i] = attributes['pos']
+        node_shape[i] = intern(attributes.get('shape'))
+        node_color[i] = intern(attributes.get('color'))
+        plot_color[i] = intern(graph.node_colors.get(node))
+
+    # Collect edges row by row. An undirected record stands for both directions, so only a pair
+    # stored both ways as undirected becomes one (kept once); every other edge is a directed record
+    sources, targets, directed_flags, edge_colors = [], [], [], []
+    succ = digraph.succ
+    for node1 in nodes:
+        for node2, data in succ[node1].items():
+            reverse = succ[node2].get(node1)
+            directed = (bool(data.get('directed', False)) or reverse is None
+                        or bool(reverse.get('directed', False)))
+            if not directed and index[node2] < index[node1]:
+                continue  # Already stored from node2's row
+            sources.append(index[node1])
+            targets.append(index[node2])
+            directed_flags.append(directed)
+            edge_colors.append(intern(data.get('color')))
+
+    sources = np.asarray(sources, dtype=np.int32)
+    targets = np.asarray(targets, dtype=np.int32)
+    order = np.lexsort((targets, sources))  # Sort targets within every row
+    edge_indices = targets[order]
+    edge_directed = np.packbits(np.asarray(directed_flags, dtype=bool)[order])
+    edge_color = np.asarray(edge_colors, dtype=np.int32)[order]
+    edge_indptr = np.zeros(len(nodes) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=len(nodes)), out=edge_indptr[1:])
+
+    encoded = [value.encode("utf-8") for value in strings]
+    string_offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in encoded], out=string_offsets[1:])
+    string_data = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+    arrays = {
+        "string_offsets": string_offsets, "string_data": string_data, "node_name": node_name,
+        "node_pos": node_pos, "node_shape": node_shape, "node_color": node_color, "plot_color": plot_color,
+        "edge_indptr": edge_indptr, "edge_indices": edge_indices, "edge_directed": edge_directed,
+        "edge_color": edge_color,
+    }
+
+    # Lay the sections out after the header and section table, aligned to 8 bytes
+    offset = _HEADER.size + len(SECTIONS) * _SECTION_ENTRY.size
+    table = []
+    for name, dtype in SECTIONS:
+        offset = (offset + 7) & ~7
+        nbytes = arrays[name].astype(dtype, copy=False).nbytes
+        table.append((offset, nbytes))
+        offset += nbytes
+
+    with atomic_open(filename) as file:
+        file.write(_HEADER.pack(MAGIC, FORMAT_VERSION, generation, len(SECTIONS), len(nodes), len(edge_indices),
+                                len(encoded), graph.canvas_width, graph.canvas_height))
+        for entry in table:
+            file.write(_SECTION_ENTRY.pack(*entry))
+        for (name, dtype), (section_offset, _) in zip(SECTIONS, table):
+            file.write(b"\0" * (section_offset - file.tell()))
+            file.write(arrays[name].astype(dtype, copy=False).tobytes())
+
+
+class _LegacyGraph:
+    """Stand-in for the pickled Graph class so old files load without the real module"""
+
+
+class _LegacyUnpickler(pickle.Unpickler):
+    def find_class(self, module, name):
+        if name == "Graph" and module.endswith("graph_logic"):
+            return _LegacyGraph
+        return super().find_class(module, name)
+
+
+def import_legacy_pickle(filename, graph):
+    """Fills an empty Graph from a file written by the old pickle-based Graph.save"""
+    with open(filename, "rb") as file:
+        legacy = _LegacyUnpickler(file).load()
+    state = legacy.__dict__ if isinstance(legacy, _LegacyGraph) else None
+    if state is None or not isinstance(state.get('graph'), nx.DiGraph):
+        raise ValueError(f"{filename} does not contain a pickled graph")
+
+    graph.graph = state['graph']
+    graph.canvas_width = state.get('canvas_width', graph.canvas_width)
+    graph.canvas_height = state.get('canvas_height', graph.canvas_height)
+    graph.node_colors = dict(state.get('node_colors', {}))
+    return graph
+
+
+def write_matrix_market(filename, nodes, matrix, block_rows=65536):
+    """Streams a sparse adjacency matrix to a Matrix Market coordinate file, one row block at a time.
+
+    The node order is recorded in '% node <index> <name>' comment lines after the banner.
+    """
+    matrix = matrix.tocsr()
+    n = matrix.shape[0]
+    with open(filename, "w", encoding="utf-8") as file:
+        file.write("%%MatrixMarket matrix coordinate pattern general\n")
+        for index, node in enumerate(nodes, start=1):
+            file.write(f"% node {index} {node}\n")
+        file.write(f"{n} {matrix.shape[1]} {matrix.nnz}\n")
+        for start in range(0, n, block_rows):
+            block = matrix[start:start + block_rows].tocoo()
+            np.savetxt(file, np.column_stack((block.row + start + 1, block.col + 1)), fmt="%d")
+
+
+def write_adjacency_npz(filename, nodes, matrix):
+    """Writes the CSR arrays and node order of a sparse adjacency matrix to a NumPy .npz file"""
+    matrix = matrix.tocsr()
+    np.savez(filename, indptr=matrix.indptr, indices=matrix.indices, shape=np.array(matrix.shape),
+             nodes=np.array([str(node) for node in nodes]))
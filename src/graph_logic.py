@@ -1,24 +1,184 @@
 import networkx as nx
-import pickle
-import matplotlib.pyplot as plt
-import tkinter as tk
+import collections
+import contextlib
 import itertools
 
+from src.connectivity import ConnectivityIndex
+from src.hamiltonian import HamiltonianSearch
+from src.history import MISSING, History
+
+# NumPy/SciPy-backed modules (csr_analysis, graph_format, mapped_graph, products) and the plotting
+# and Tk helpers are imported inside the methods that use them, so importing Graph stays cheap.
+
+_versions = itertools.count()  # Source of structural versions, unique across all Graph instances
+
+DEFAULT_EDGE_COLOR = "black"
+
+# One drawable edge: undirected edges (stored in both directions) appear once, attributes resolved
+EdgeRecord = collections.namedtuple("EdgeRecord", "node1 node2 directed color")
+
+_EDGE_DATA = {True: {'directed': True}, False: {'directed': False}}  # Shared by the history steps of new edges
+
+
+def _edge_addition_step(pairs, directed):
+    """History step for adding the stored (source, target) pairs, given with their directed flags"""
+    return ("add_edges", pairs, [_EDGE_DATA[flag] for flag in directed]), ("remove_edges", pairs)
+
+
 class Graph:
     def __init__(self, canvas_width=800, canvas_height=600):
         """Initializes the graph with the canvas dimensions for node placement"""
-        self.graph = nx.DiGraph()
+        self._graph = nx.DiGraph()
+        self._mapped = None  # MappedAdjacency while the graph is opened read-only from a mapped file
+        self._version = next(_versions)  # Structural version, changes on every node/edge mutation
+        self._analysis_cache = {}  # analysis name -> (version, result)
+        self._colors_version = next(_versions)  # Changes on every edge colour change, which is not structural
+        self._connectivity = ConnectivityIndex()  # Weak components, updated as nodes and edges are added
+        self._listeners = []  # Called with the graph after every structural change (once per batch)
+        self._batch_depth = 0
+        self._batch_dirty = False  # A change happened inside the open batch
+        self.history = History()  # Undo/redo log of the mutations made through this class
+        self.journal = None  # Journal that saves append the mutations to, see save(journal=True)
         self.canvas_width = canvas_width
         self.canvas_height = canvas_height
         self.node_colors = {}
-        plt.ion()  # Enable interactive mode
+
+    @staticmethod
+    def open_mapped(filename: str):
+        """Opens a graph file read-only through a memory map.
+
+        Queries and analyses read the mapped arrays directly; the networkx graph is only
+        built the first time something accesses `graph`, e.g. a mutating call or replaying
+        the file's journal when it has unsaved-to-snapshot changes.
+        """
+        from src.graph_format import map_graph
+        from src.journal import replay_journals
+        from src.mapped_graph import MappedAdjacency
+        arrays = map_graph(filename)
+        graph = Graph(arrays.canvas_width, arrays.canvas_height)
+        graph._graph = None
+        graph._mapped = MappedAdjacency(arrays)
+        graph._connectivity.invalidate()
+        replay_journals(graph, filename, arrays.generation)
+        return graph
+
+    @property
+    def is_mapped(self):
+        return self._mapped is not None
+
+    @property
+    def graph(self):
+        """The networkx DiGraph, built from the mapped file on first access"""
+        if self._graph is None:
+            arrays = self._mapped.arrays
+            self._graph = nx.DiGraph()
+            self._mapped = None
+            arrays.fill(self)
+        return self._graph
+
+    @graph.setter
+    def graph(self, value):
+        self._graph = value
+        self._mapped = None
+        self._connectivity.invalidate()
+        self._structure_changed()
+
+    def copy(self):
+        """Returns an independent snapshot of the graph, e.g. for analysis on a worker thread"""
+        snapshot = Graph(self.canvas_width, self.canvas_height)
+        if self._mapped is not None:
+            snapshot._graph = None
+            snapshot._mapped = self._mapped  # Read-only, safe to share
+            snapshot._connectivity.invalidate()
+        else:
+            snapshot.graph = self.graph.copy()
+        snapshot.node_colors = dict(self.node_colors)
+        # Versions are unique across graphs, so the snapshot can share (and fill) the analysis cache,
+        # except in the middle of a batch, where the version does not describe the graph yet
+        if not self._batch_dirty:
+            snapshot._version = self._version
+            snapshot._colors_version = self._colors_version
+            snapshot._analysis_cache = self._analysis_cache
+        return snapshot
 
     def get_nodes(self):
+        if self._mapped is not None:
+            from src.mapped_graph import MappedNodeView
+            return MappedNodeView(self._mapped)
         return self.graph.nodes
 
     def get_edges(self):
+        if self._mapped is not None:
+            from src.mapped_graph import MappedEdgeView
+            return MappedEdgeView(self._mapped)
         return self.graph.edges
 
+    def edge_records(self, nodes=None):
+        """Returns the drawable edges as EdgeRecords, each undirected edge once.
+
+        The two stored directions of an undirected edge, and two opposite directed edges, make
+        one record with directed=False, as get_edge_data reports them. The full list is cached
+        until the next structural change or set_edge_color; with nodes, only the edges touching
+        those nodes are returned, in O(their degree).
+        """
+        if nodes is not None:
+            return self._incident_edge_records(nodes)
+        if self._mapped is not None:
+            return self._cached("edge_records", lambda: list(self._mapped.edge_records(DEFAULT_EDGE_COLOR)),
+                                colors=True)
+
+        def build():
+            succ = self.graph._succ
+            order = {node: i for i, node in enumerate(succ)}
+            records = []
+            for node1, neighbours in succ.items():
+                position = order[node1]
+                for node2, data in neighbours.items():
+                    mutual = node1 in succ[node2]
+                    if mutual and order[node2] < position:
+                        continue  # Recorded from node2
+                    records.append(EdgeRecord(node1, node2, not mutual and data.get('directed', False),
+                                              data.get('color', DEFAULT_EDGE_COLOR)))
+            return records
+
+        return self._cached("edge_records", build, colors=True)
+
+    def _incident_edge_records(self, nodes):
+        if self._mapped is not None:
+            wanted = set(nodes)
+            return [record for record in self.edge_records() if record.node1 in wanted or record.node2 in wanted]
+        succ, pred = self.graph._succ, self.graph._pred
+        records, seen = [], set()
+        for node in nodes:
+            if node not in succ:
+                continue
+            # Outgoing edges, then incoming ones that are not the mirror of an outgoing edge
+            pairs = [(node, other, data) for other, data in succ[node].items()]
+            pairs += [(other, node, data) for other, data in pred[node].items() if other not in succ[node]]
+            for node1, node2, data in pairs:
+                mutual = node1 in succ[node2]
+                key = frozenset((node1, node2)) if mutual else (node1, node2)
+                if key not in seen:
+                    seen.add(key)
+                    records.append(EdgeRecord(node1, node2, not mutual and data.get('directed', False),
+                                              data.get('color', DEFAULT_EDGE_COLOR)))
+        return records
+
+    def set_edge_color(self, node1, node2, color):
+        """Sets the colour of an edge, in both stored directions"""
+        graph = self.graph
+        if not self.has_edge(node1, node2):
+            raise ValueError(f"No edge exists between {node1} and {node2}")
+        steps = []
+        for source, target in ((node1, node2), (node2, node1)):
+            data = graph[source].get(target)
+            if data is not None and data.get('color', MISSING) != color:
+                steps.append((("edge_attribute", source, target, 'color', color),
+                              ("edge_attribute", source, target, 'color', data.get('color', MISSING))))
+                data['color'] = color
+        self._colors_version = next(_versions)  # Colours are not structural, so only edge_records is stale
+        self._record("Color edge", steps)
+
     def add_node(self, name, shape):
         """Add a node with attributes at the center of the canvas"""
         # Calculate the center of the canvas
@@ -26,27 +186,177 @@ class Graph:
         y = self.canvas_height / 2
 
         # Add the node with center position and specified shape
+        self._record("Add node", self._node_addition_steps([name], {'pos': (x, y), 'shape': shape}))
         self.graph.add_node(name, pos=(x, y), shape=shape)
+        self._connectivity.add_node(name)
+        self._structure_changed()
+
+    def _node_addition_steps(self, names, attributes):
+        """Undo steps for adding names with attributes; nodes that already exist only get new attribute values"""
+        nodes, steps, new = self.graph.nodes, [], []
+        for name in dict.fromkeys(names):
+            if name in nodes:
+                steps += self._attribute_steps(name, attributes)
+            else:
+                new.append(name)
+        if new:
+            steps.append((("add_nodes", new, [dict(attributes)] * len(new)), ("remove_nodes", new)))
+        return steps
+
+    def _attribute_steps(self, node, attributes):
+        """Undo steps for setting node attributes, skipping the values that do not change"""
+        current = self.graph.nodes[node]
+        return [(("node_attribute", node, key, value), ("node_attribute", node, key, current.get(key, MISSING)))
+                for key, value in attributes.items() if current.get(key, MISSING) != value]
 
     def add_edge_to_graph(self, node1, node2, directed=False):
         """Adds an edge to the graph (directed or undirected)."""
         if node1 not in self.graph or node2 not in self.graph:
             raise ValueError(f"Nodes {node1} and/or {node2} do not exist in the graph.")
 
+        self._connectivity.union(node1, node2)
+        added = []
         if directed:
             # Add directed edge from node1 to node2 (only one direction)
             if not self.graph.has_edge(node1, node2):  # Check if edge already exists in the same direction
                 self.graph.add_edge(node1, node2, directed=True)
+                added.append((node1, node2))
         else:
             # Add undirected edge by setting directed attribute to False
             if not self.graph.has_edge(node1, node2):
                 self.graph.add_edge(node1, node2, directed=False)
+                added.append((node1, node2))
             if not self.graph.has_edge(node2, node1):
                 self.graph.add_edge(node2, node1, directed=False)
+                added.append((node2, node1))
+        if added:
+            self._record("Add edge", [_edge_addition_step(added, [directed] * len(added))])
+        self._structure_changed()
+
+    @contextlib.contextmanager
+    def batch(self, label=None):
+        """Groups mutations: listeners are notified and the structural version bumped once, when the batch ends.
+
+        Batches nest; only the outermost one commits. Changes made before an exception are kept.
+        The whole batch is one undo entry, named label (by default after its first change).
+        """
+        self._batch_depth += 1
+        self.history.begin_group(label)
+        try:
+            yield self
+        finally:
+            self.history.end_group()
+            self._batch_depth -= 1
+            if self._batch_depth == 0 and self._batch_dirty:
+                self._batch_dirty = False
+                self._structure_changed()
+
+    def add_change_listener(self, listener):
+        """Registers listener(graph), called after every structural change or committed batch"""
+        self._listeners.append(listener)
+
+    def remove_change_listener(self, listener):
+        self._listeners.remove(listener)
+
+    def add_nodes_from(self, names, shape):
+        """Adds many nodes at the center of the canvas with one structural change"""
+        names = list(names)
+        attributes = {'pos': (self.canvas_width / 2, self.canvas_height / 2), 'shape': shape}
+        self._record("Add nodes", self._node_addition_steps(names, attributes))
+        self.graph.add_nodes_from(names, **attributes)
+        for name in names:
+            self._connectivity.add_node(name)
+        self._structure_changed()
+
+    def add_edges_from(self, edges, directed=False):
+        """Adds many edges given as (node1, node2) or (node1, node2, directed) with one structural change.
+
+        Every endpoint is checked before anything is added. Edges follow the same rules as
+        add_edge_to_graph: an existing edge in a direction is never overwritten, so the first
+        edge given for a direction wins.
+        """
+        edges = [edge if len(edge) == 3 else (edge[0], edge[1], directed) for edge in edges]
+        graph = self.graph
+        missing = {node for edge in edges for node in edge[:2] if node not in graph}
+        if missing:
+            raise ValueError(f"Nodes {', '.join(map(str, sorted(missing, key=str)[:10]))} do not exist in the graph.")
+
+        # Insert straight into the adjacency dicts; succ and pred share one attribute dict per edge, as in networkx
+        succ, pred = graph._succ, graph._pred
+        added, added_directed = [], []  # Stored pairs actually inserted, for the undo log
+        for node1, node2, edge_directed in edges:
+            directions = [(node1, node2)] if edge_directed else [(node1, node2), (node2, node1)]
+            for source, target in directions:
+                if target not in succ[source]:
+                    data = {'directed': bool(edge_directed)}
+                    succ[source][target] = data
+                    pred[target][source] = data
+                    added.append((source, target))
+                    added_directed.append(bool(edge_directed))
+
+        for node1, node2, _ in edges:
+            self._connectivity.union(node1, node2)
+        if added:
+            self._record("Add edges", [_edge_addition_step(added, added_directed)])
+        self._structure_changed()
+
+    def remove_nodes_from(self, names):
+        """Removes many nodes and their edges with one structural change; all must exist"""
+        names = list(names)
+        missing = [name for name in names if name not in self.graph]
+        if missing:
+            raise ValueError(f"Nodes {', '.join(map(str, missing[:10]))} do not exist.")
+        self._record("Remove nodes", self._node_removal_steps(names))
+        self.graph.remove_nodes_from(names)
+        for name in names:
+            self.node_colors.pop(name, None)
+        self._connectivity.invalidate()
+        self._structure_changed()
+
+    def remove_edges_from(self, edges):
+        """Removes many (node1, node2) edges with one structural change; all must exist.
+
+        As with remove_edge, undirected edges are removed in both directions.
+        """
+        edges = list(edges)
+        pairs = [self._stored_pairs(node1, node2) for node1, node2 in edges]
+        missing = [edge for edge, stored in zip(edges, pairs) if not stored]
+        if missing:
+            raise ValueError(f"Edges {', '.join(f'{node1}-{node2}' for node1, node2 in missing[:10])} do not exist.")
+        pairs = list(dict.fromkeys(pair for stored in pairs for pair in stored))
+        self._record("Remove edges", self._edge_removal_steps(pairs))
+        self.graph.remove_edges_from(pairs)
+        self._connectivity.invalidate()
+        self._structure_changed()
+
+    def _edge_removal_steps(self, pairs):
+        """Undo steps for removing the stored (source, target) pairs, keeping a copy of their attributes"""
+        if not pairs:
+            return []
+        succ = self.graph._succ
+        return [(("remove_edges", pairs), ("add_edges", pairs, [dict(succ[source][target]) for source, target in pairs]))]
+
+    def _node_removal_steps(self, names):
+        """Undo steps for removing nodes: their edges first, each once, then the nodes and their plot colours"""
+        graph = self.graph
+        names = list(dict.fromkeys(names))
+        pairs = {}
+        for name in names:
+            pairs.update(((name, target), None) for target in graph._succ[name])
+            pairs.update(((source, name), None) for source in graph._pred[name])
+        nodes = graph.nodes
+        steps = self._edge_removal_steps(list(pairs))
+        steps.append((("remove_nodes", names), ("add_nodes", names, [dict(nodes[name]) for name in names])))
+        steps += [(("node_color", name, MISSING), ("node_color", name, self.node_colors[name]))
+                  for name in names if name in self.node_colors]
+        return steps
 
 
     def has_edge(self, node1, node2, directed=False):
         """Checks if there is an edge between node1 and node2 (directed or undirected)."""
+        if self._mapped is not None:
+            return self._mapped.has_edge(node1, node2, directed)
+
         # Check if nodes exist in the graph
         if node1 not in self.graph or node2 not in self.graph:
             return False
@@ -60,228 +370,542 @@ class Graph:
 
 
     def is_connected(self):
-        """Checks if the graph is connected"""
-        return nx.is_connected(self.graph)
-
-    def radius_and_diameter(self):
+        """Checks if the graph is (weakly) connected"""
+        return self._weak_components().component_count() == 1
+
+    def is_strongly_connected(self):
+        """Checks if every node reaches every other node; the SCC count is cached per structural version"""
+        def count():
+            nodes, matrix = self.sparse_adjacency_matrix()
+            from src import csr_analysis
+            return csr_analysis.component_count(matrix, strong=True)
+
+        return self._cached("strong_components", count) == 1
+
+    def _weak_components(self):
+        """Returns the connectivity index, rebuilding it first if a deletion invalidated it"""
+        if self._connectivity.dirty:
+            nodes, matrix = self.sparse_adjacency_matrix()
+            self._connectivity.rebuild(nodes, matrix)
+        return self._connectivity
+
+    def radius_and_diameter(self, progress=None):
         """Returns the radius and diameter of a weakly connected graph"""
-        if not nx.is_weakly_connected(self.graph):
+        if not self.is_connected():
             # The graph is not weakly connected, return None and do not calculate radius and diameter
             return None, None
 
-        try:
-            # Try to calculate the radius and diameter of the graph
-            radius = nx.radius(self.graph)
-            diameter = nx.diameter(self.graph)
-            return radius, diameter
-        except nx.NetworkXError as e:
-            # Handle any errors that occur during radius and diameter calculation
-            print(f"Error calculating radius and diameter: {e}")
+        eccentricities = self.eccentricities(progress)
+        if eccentricities is None:
+            print("Error calculating radius and diameter: the digraph is not strongly connected")
             return None, None
+        values = eccentricities.values()
+        return min(values), max(values)
 
-    def center(self):
+    def center(self, progress=None):
         """Returns the center of the graph"""
-        if nx.is_strongly_connected(self.graph):
-            return nx.center(self.graph)
-        return None
+        if not self.is_strongly_connected():
+            return None
+        eccentricities = self.eccentricities(progress)
+        if not eccentricities:
+            return None
+        radius = min(eccentricities.values())
+        return [node for node, eccentricity in eccentricities.items() if eccentricity == radius]
+
+    def eccentricities(self, progress=None):
+        """Returns {node: eccentricity}, or None unless every node reaches every other node.
+
+        All-pairs BFS runs once per structural version of the graph; radius, diameter and
+        center all read the cached result. `progress` is called as progress(done, total).
+        """
+        def compute():
+            nodes, matrix = self.sparse_adjacency_matrix()
+            from src import csr_analysis
+            values = csr_analysis.eccentricities(matrix, progress=progress)
+            if values is None:
+                return None
+            return dict(zip(nodes, values.tolist()))
+
+        return self._cached("eccentricities", compute)
+
+    def shortest_path(self, source, target):
+        """Returns the nodes of a shortest (fewest edges) path from source to target, or None if there is none.
+
+        Edge directions are followed. The search is a bidirectional BFS on the cached CSR
+        matrix and its transpose, so it touches only the nodes near the two ends.
+        """
+        index = self._existing_nodes_index(source, target)
+        nodes, matrix = self.sparse_adjacency_matrix()
+        reverse = self._cached("reverse_adjacency", lambda: matrix.transpose().tocsr())
+        from src import shortest_paths
+        path = shortest_paths.bidirectional_bfs(matrix, reverse, index[source], index[target])
+        return None if path is None else [nodes[i] for i in path]
+
+    def distance(self, source, target):
+        """Returns the number of edges on a shortest path from source to target, or None if there is none"""
+        self._existing_nodes_index(source, target)  # The same ValueError with or without a cached matrix
+        entry = self._analysis_cache.get("distances")
+        if entry is not None and entry[0] == self._version and not self._batch_dirty:
+            return entry[1].distance(source, target)  # An all-pairs result is already there
+        path = self.shortest_path(source, target)
+        return None if path is None else len(path) - 1
+
+    def distance_matrix(self, filename=None, workers=None, progress=None):
+        """Returns the all-pairs hop distances as a shortest_paths.DistanceMatrix (int32, -1 where unreachable).
+
+        Source blocks are spread over `workers` processes (default: one per CPU). The
+        result is cached per structural version. With a filename the matrix is written
+        there as .npy instead, with the node names in <filename>.nodes.json, and is not
+        cached. Matrices too large for memory always stream to disk and come back as a
+        memory map. `progress` is called as progress(done, total).
+        """
+        def compute():
+            nodes, matrix = self.sparse_adjacency_matrix()
+            from src import shortest_paths
+            return shortest_paths.all_pairs(matrix, nodes, filename, workers, progress)
+
+        if filename is not None:
+            return compute()
+        return self._cached("distances", compute)
+
+    def _node_index(self):
+        """Node -> row of the sparse adjacency matrix, cached per structural version"""
+        return self._cached("node_index", lambda: {node: i for i, node in
+                                                   enumerate(self.sparse_adjacency_matrix()[0])})
+
+    def _existing_nodes_index(self, *nodes):
+        """Returns _node_index(), raising ValueError if one of nodes does not exist"""
+        index = self._node_index()
+        for node in nodes:
+            if node not in index:
+                raise ValueError(f"Node '{node}' does not exist")
+        return index
+
+    def _cached(self, key, compute, colors=False):
+        """Returns compute() from the analysis cache, recomputing it after structural changes.
+
+        With colors the entry also depends on the edge colours, which snapshots sharing the
+        cache may hold older values of.
+        """
+        if self._batch_dirty:
+            return compute()  # The version is only bumped when the batch ends
+        version = (self._version, self._colors_version) if colors else self._version
+        entry = self._analysis_cache.get(key)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        value = compute()
+        self._analysis_cache[key] = (version, value)
+        return value
+
+    def _structure_changed(self):
+        """Must be called by every method that changes nodes or edges; invalidates cached analyses"""
+        if self._batch_depth:
+            self._batch_dirty = True
+            return
+        self._version = next(_versions)
+        for listener in list(self._listeners):
+            listener(self)
 
     def remove_node(self, node_name):
         """Removes a node and all its associated edges from the graph"""
         if node_name in self.graph:
+            self._record("Remove node", self._node_removal_steps([node_name]))
             self.graph.remove_node(node_name)
+            self.node_colors.pop(node_name, None)
+            self._connectivity.invalidate()
+            self._structure_changed()
         else:
             raise ValueError(f"Node {node_name} does not exist.")
 
     def remove_edge(self, node1, node2):
-        """Removes an edge between two nodes"""
-        if self.graph.has_edge(node1, node2):
-            self.graph.remove_edge(node1, node2)
-        else:
+        """Removes an edge between two nodes; an undirected edge is removed in both directions"""
+        pairs = self._stored_pairs(node1, node2)
+        if not pairs:
             raise ValueError(f"Edge between {node1} and {node2} does not exist.")
+        self._record("Remove edge", self._edge_removal_steps(pairs))
+        self.graph.remove_edges_from(pairs)
+        self._connectivity.invalidate()
+        self._structure_changed()
+
+    def _stored_pairs(self, node1, node2):
+        """Returns the stored (source, target) pairs that make up the edge node1 - node2.
+
+        That is node1 -> node2 if it exists, plus its mirror when the edge is undirected. An
+        undirected edge may also be named in the opposite order.
+        """
+        succ = self.graph._succ
+        data = succ[node1].get(node2) if node1 in succ else None
+        reverse = succ[node2].get(node1) if node2 in succ else None
+        pairs = []
+        if data is not None:
+            pairs.append((node1, node2))
+        if reverse is not None and node1 != node2 and not reverse.get('directed', False) \
+                and (data is None or not data.get('directed', False)):
+            pairs.append((node2, node1))
+        return pairs
 
     def get_edge_data(self, node1, node2):
         """Returns edge data between two nodes, checking for edges in both directions and determining 'directed' attribute."""
-        edge_data = self.graph.get_edge_data(node1, node2)
-
-        if edge_data is None:
-            # Check if the reverse edge exists for undirected edges
-            reverse_edge_data = self.graph.get_edge_data(node2, node1)
-            if reverse_edge_data is not None:
-                # If reverse edge exists, mark the edge as undirected
+        if self._mapped is not None:
+            record = self._mapped.edge_record(node1, node2)
+            if record < 0:
+                record = self._mapped.edge_record(node2, node1)
+                if record < 0:
+                    raise ValueError(f"No edge exists between {node1} and {node2}")
                 return {'directed': False}
-            else:
-                raise ValueError(f"No edge exists between {node1} and {node2}")
-
-        # Ensure edge_data is a dictionary before calling setdefault
-        if isinstance(edge_data, dict):
-            edge_data.setdefault('directed', False)  # Default directed to False if not provided
-        else:
-            edge_data = {'directed': False}  # Default to directed = False if edge data isn't a dictionary
-
-        # If both edges exist, mark the edge as undirected
-        reverse_edge_data = self.graph.get_edge_data(node2, node1)
-        if reverse_edge_data is not None:
-            edge_data['directed'] = False  # Set to undirected if reverse edge exists
-
-        return edge_data
+            edge_data = self._mapped.edge_data(record)
+            if self._mapped.edge_record(node2, node1) >= 0:
+                edge_data['directed'] = False  # Set to undirected if reverse edge exists
+            return edge_data
+
+        # One lookup per direction; the stored attributes are never modified
+        succ = self.graph._succ
+        edge_data = succ[node1].get(node2) if node1 in succ else None
+        reverse = node2 in succ and node1 in succ[node2]
+        if edge_data is None:
+            if reverse:
+                return {'directed': False}  # Only the reverse edge exists: undirected
+            raise ValueError(f"No edge exists between {node1} and {node2}")
+        directed = bool(edge_data.get('directed', False)) and not reverse  # An edge stored both ways is undirected
+        if edge_data.get('directed') is directed:
+            return edge_data
+        return {**edge_data, 'directed': directed}
 
     def rename_node(self, old_name, new_name):
-        """Renames a node from old_name to new_name."""
+        """Renames a node from old_name to new_name in O(degree), keeping node and edge attributes."""
         nodes = self.get_nodes()  # Get nodes once
         if old_name not in nodes:
             return False, f"Node '{old_name}' does not exist."
         if new_name in nodes:
             return False, f"Node '{new_name}' already exists."
 
-        # Rename the node in the dictionary (using NetworkX methods)
-        node_data = self.graph.nodes[old_name]
-        self.graph.add_node(new_name, **node_data)
-        self.graph.remove_node(old_name)
-
-        # Update the edges: rename any edge that includes the old node name
-        for n1, n2 in list(self.graph.edges):
-            if n1 == old_name:
-                self.graph.remove_edge(n1, n2)
-                self.graph.add_edge(new_name, n2)
-            elif n2 == old_name:
-                self.graph.remove_edge(n1, n2)
-                self.graph.add_edge(n1, new_name)
-
+        # Re-create only the node's own in- and out-edges, keeping their attributes
+        graph = self.graph
+        graph.add_node(new_name, **graph.nodes[old_name])
+        graph.add_edges_from([(new_name, new_name if target == old_name else target, data)
+                              for target, data in graph.succ[old_name].items()])
+        graph.add_edges_from([(source, new_name, data)
+                              for source, data in graph.pred[old_name].items() if source != old_name])
+        graph.remove_node(old_name)
+        if old_name in self.node_colors:
+            self.node_colors[new_name] = self.node_colors.pop(old_name)
+
+        self._connectivity.invalidate()
+        self._record("Rename node", [(("rename", {old_name: new_name}), ("rename", {new_name: old_name}))])
+        self._structure_changed()
         return True, f"Node '{old_name}' renamed to '{new_name}'."
 
+    def rename_nodes(self, mapping):
+        """Renames many nodes at once ({old_name: new_name}) in a single pass over the graph."""
+        if not mapping:
+            return True, "No nodes renamed."  # Nothing to undo either
+        nodes = self.get_nodes()
+        missing = [old_name for old_name in mapping if old_name not in nodes]
+        if missing:
+            return False, f"Nodes do not exist: {', '.join(map(str, missing[:10]))}"
+        targets = set(mapping.values())
+        if len(targets) != len(mapping):
+            return False, "Several nodes would get the same name."
+        taken = [new_name for new_name in targets if new_name in nodes and new_name not in mapping]
+        if taken:
+            return False, f"Nodes already exist: {', '.join(map(str, taken[:10]))}"
+
+        # Rebuild the adjacency dicts directly; unlike nx.relabel_nodes this reuses the edge attribute dicts,
+        # which succ and pred share, instead of copying them through add_edges_from
+        old_graph, relabel = self.graph, mapping.get
+        graph = nx.DiGraph(**old_graph.graph)
+        graph._node = {relabel(node, node): attributes for node, attributes in old_graph._node.items()}
+        graph._succ = graph._adj = {relabel(source, source): {relabel(target, target): data
+                                                              for target, data in targets.items()}
+                                    for source, targets in old_graph._succ.items()}
+        graph._pred = {relabel(target, target): {relabel(source, source): data for source, data in sources.items()}
+                       for target, sources in old_graph._pred.items()}
+        self.node_colors = {mapping.get(node, node): color for node, color in self.node_colors.items()}
+        self._record("Rename nodes", [(("rename", dict(mapping)),
+                                              ("rename", {new_name: old_name for old_name, new_name in mapping.items()}))])
+        self.graph = graph  # The setter invalidates connectivity and cached analyses
+        return True, f"{len(mapping)} nodes renamed."
+
     def adjacency_matrix(self):
-        """Returns the adjacency matrix of the graph"""
+        """Returns the dense adjacency matrix of the graph as nested lists (small graphs only)"""
+        if self._mapped is not None:
+            return self._mapped.matrix().toarray().tolist()
         adj_matrix = nx.adjacency_matrix(self.graph)
         return adj_matrix.toarray().tolist()
 
-    def save(self, filename: str):
-        """Saves the graph object to a file using pickle"""
-        if not filename:
-            print("Error: Invalid filename provided.")
-            return
-        try:
-            with open(filename, "wb") as file:
-                pickle.dump(self, file)
-                print(f"Graph successfully saved to {filename}")
-        except PermissionError:
-            print(f"Error: Permission denied when saving to {filename}")
-        except Exception as e:
-            print(f"Error saving graph: {e}")
+    def sparse_adjacency_matrix(self, format="csr"):
+        """Returns (nodes, matrix): the scipy sparse adjacency matrix and the node order of its rows.
+
+        Rows and columns follow the order in which nodes were added. `format` is any scipy
+        sparse format name, e.g. 'csr' or 'coo' for the NumPy (row, col, data) triple.
+        """
+        def build():
+            if self._mapped is not None:
+                return self._mapped.arrays.node_names(), self._mapped.matrix()
+            nodes = list(self.graph.nodes)
+            import numpy as np
+            return nodes, nx.to_scipy_sparse_array(self.graph, nodelist=nodes, dtype=np.int8, weight=None,
+                                                   format="csr")
+
+        nodes, matrix = self._cached("adjacency", build)
+        return nodes, matrix.asformat(format)
+
+    def export_adjacency(self, filename: str):
+        """Streams the sparse adjacency matrix to disk: .npz as CSR arrays, anything else as Matrix Market"""
+        nodes, matrix = self.sparse_adjacency_matrix()
+        if filename.endswith(".npz"):
+            from src.graph_format import write_adjacency_npz
+            write_adjacency_npz(filename, nodes, matrix)
+        else:
+            from src.graph_format import write_matrix_market
+            write_matrix_market(filename, nodes, matrix)
+
+    def save(self, filename: str = None, journal=False):
+        """Saves the graph in the columnar graph format; raises on failure.
+
+        The file is written to a temporary file and renamed into place, so a crash never leaves
+        it half written. With journal=True, later saves to the same file (or save() without a
+        filename) only append the changes made since the previous save; see src/journal.py.
+        """
+        if self.journal is not None and filename in (None, self.journal.path):
+            self.journal.save()
+            filename = self.journal.path
+        elif not filename:
+            raise ValueError("Invalid filename provided.")
+        elif journal:
+            from src.journal import Journal
+            if self.journal is not None:
+                self.journal.close()
+            self.journal = Journal(self, filename)
+            self.journal.save()  # A new journal starts with a full snapshot
+        else:
+            from src.graph_format import write_graph
+            write_graph(self, filename)
+        print(f"Graph successfully saved to {filename}")
 
     @staticmethod
-    def load(filename: str):
-        """Loads the graph from a pickle file"""
+    def load(filename: str, journal=False):
+        """Loads a graph file with its journal, importing files written by the old pickle-based save as well.
+
+        With journal=True the graph keeps a journal of that file, so save() appends to it.
+        """
         try:
-            with open(filename, "rb") as file:
-                graph_data = pickle.load(file)
-                print(f"Graph loaded from {filename}")
-                return graph_data
+            from src.graph_format import import_legacy_pickle, is_graph_file, read_graph
+            from src.journal import Journal, replay_journals
+            generation = journal_bytes = None
+            if is_graph_file(filename):
+                arrays = read_graph(filename)
+                graph = arrays.fill(Graph(arrays.canvas_width, arrays.canvas_height))
+                graph._connectivity.invalidate()  # fill adds to the networkx graph directly
+                generation = arrays.generation
+                journal_bytes = replay_journals(graph, filename, generation)
+            else:
+                graph = import_legacy_pickle(filename, Graph())
+            if journal:
+                graph.journal = Journal(graph, filename, generation, journal_bytes)
+            print(f"Graph loaded from {filename}")
+            return graph
         except Exception as e:
             print(f"Error loading graph: {e}")
             raise
 
     def make_connected(self):
         """Makes the graph connected by adding edges"""
-        if not nx.is_weakly_connected(self.graph):
-            connected_components = list(nx.weakly_connected_components(self.graph))
-            for i in range(len(connected_components) - 1):
-                node1 = list(connected_components[i])[0]
-                node2 = list(connected_components[i + 1])[0]
-                self.add_edge_to_graph(node1, node2)
+        representatives = self._weak_components().representatives()
+        if len(representatives) > 1:
+            # Chain one node of every component to one node of the next
+            self.add_edges_from(zip(representatives, representatives[1:]))
             print("Graph has been made weakly connected.")
 
-
-    def _find_hamiltonian_cycle_util(self, path, pos):
-        # If all vertices are included in the path
-        if pos == len(self.graph.nodes):
-            # Check if the last node is connected to the first node to form a cycle
-            if self.graph.has_edge(path[pos - 1], path[0]):
-                return True
-            return False
-
-        for node in self.graph.nodes:
-            if node not in path:  # Ensure node has not been visited
-                # Check if there is an edge between the last node and the current node
-                if self.graph.has_edge(path[pos - 1], node):
-                    path[pos] = node
-                    if self._find_hamiltonian_cycle_util(path, pos + 1):
-                        return True
-                    path[pos] = -1  # Backtrack
-        return False
-
-    def find_hamiltonian_cycles(self):
-        # Start from the first node
-        path = [-1] * len(self.graph.nodes)
-        path[0] = list(self.graph.nodes)[0]
-
-        # Try to find a Hamiltonian cycle using backtracking
-        if self._find_hamiltonian_cycle_util(path, 1):
-            # If a cycle is found, return the cycle (start to end and back to start)
-            return [path + [path[0]]]
-        return []  # No Hamiltonian cycle found
+    def layout_engine(self, nodes=None, iterations=None, seed=0, amend=False):
+        """Returns a ForceLayout over the current positions, ready to be stepped (e.g. on a worker thread).
+
+        Without nodes, every node is placed from scratch. With nodes, only they and their
+        neighbours move; the given nodes restart next to their neighbours, and nodes without
+        a position are added to them. With amend, the positions apply_layout writes join the
+        latest undo entry (e.g. the node addition that needs the layout) instead of a new one.
+        """
+        from src.layout import ForceLayout
+        import numpy as np
+        graph = self.graph  # Positions are written back, so a mapped graph is built here
+        if len(graph):
+            node_list, matrix = self.sparse_adjacency_matrix("coo")
+        else:
+            from scipy import sparse
+            node_list, matrix = [], sparse.coo_array((0, 0), dtype=np.int8)
+        positions = np.array([graph.nodes[node].get('pos', (np.nan, np.nan)) for node in node_list],
+                             dtype=float).reshape(-1, 2)
+        movable = None
+        if nodes is None:
+            positions[:] = np.nan
+        else:
+            index = {node: i for i, node in enumerate(node_list)}
+            moving = [index[node] for node in nodes if node in index]
+            positions[moving] = np.nan
+            restart = np.isnan(positions).any(axis=1)
+            movable = restart.copy()
+            # Neighbours in either direction follow the restarted nodes
+            movable[matrix.col[restart[matrix.row]]] = True
+            movable[matrix.row[restart[matrix.col]]] = True
+        engine = ForceLayout(positions, matrix.row, matrix.col, self.canvas_width, self.canvas_height,
+                             movable=movable, iterations=iterations, seed=seed, nodes=node_list)
+        if amend:
+            self.history.adopt(("layout", engine.run_id))
+        return engine
+
+    def apply_layout(self, engine, positions=None):
+        """Writes the positions of the nodes an engine moves (its latest frame by default); returns them"""
+        positions = engine.frame if positions is None else positions
+        nodes = self.graph.nodes
+        moved = {node: row for node, row, movable in zip(engine.nodes, positions.tolist(), engine.movable.tolist())
+                 if movable and node in nodes}  # Nodes removed while the layout was running are skipped
+        # Every frame of one run is a single undo entry, sealed when the run finishes or is cancelled
+        self.set_node_attributes(moved, 'pos', coalesce=("layout", engine.run_id), label="Layout")
+        if engine.done:
+            self.history.seal()
+        return list(moved)
+
+    def layout(self, nodes=None, iterations=None, progress=None):
+        """Places the nodes with the force-directed layout (see layout_engine); returns the moved nodes"""
+        engine = self.layout_engine(nodes, iterations)
+        engine.run(progress)
+        return self.apply_layout(engine)
+
+
+    def find_hamiltonian_cycles(self, limit=1, timeout=None, max_expansions=None, progress=None):
+        """Returns up to `limit` Hamiltonian cycles (None enumerates all of them).
+
+        The search stops with SearchBudgetExceeded, carrying the cycles found so far, once
+        `timeout` seconds or `max_expansions` search steps are used up. `progress` is called
+        periodically with the number of expansions so far.
+        """
+        search = HamiltonianSearch.from_digraph(self.graph, timeout=timeout, max_expansions=max_expansions,
+                                                progress=progress)
+        return search.find(limit)
 
     def tensor_product(self, second_graph):
-            """Compute the tensor product of two graphs and ensure the result is a DiGraph."""
-            result_graph = nx.DiGraph()  # Ensure the result is a DiGraph
-
-            # Get nodes of both graphs
-            nodes_1 = list(self.graph.nodes())
-            nodes_2 = list(second_graph.graph.nodes())
-
-            # Iterate over all pairs of nodes from both graphs
-            for (v1, v2) in itertools.product(nodes_1, nodes_2):
-                # Add the combined node to the result graph
-                result_graph.add_node((v1, v2))
+        """Returns a lazy view of the tensor product with another graph"""
+        from src.products import TENSOR, ProductGraphView
+        return ProductGraphView(TENSOR, self, second_graph)
 
-            # Get edges of both graphs
-            edges_1 = list(self.graph.edges())
-            edges_2 = list(second_graph.graph.edges())
-
-            # Iterate over all pairs of edges to determine tensor product edges
-            for (v1, u1) in edges_1:
-                for (v2, u2) in edges_2:
-                    # Add an edge in the result graph if conditions are met
-                    result_graph.add_edge((v1, v2), (u1, u2))
-
-            return result_graph
+    def cartesian_product(self, other_graph):
+        """Returns a lazy view of the Cartesian product with another graph"""
+        from src.products import CARTESIAN, ProductGraphView
+        return ProductGraphView(CARTESIAN, self, other_graph)
 
+    def draw(self, level_of_detail=True):
+        """Draws the graph using matplotlib and applies the node colors.
 
-    def cartesian_product(self, other_graph):
-        """Returns the Cartesian product of the current graph with another graph, preserving DiGraph properties."""
-        result_graph = nx.DiGraph()  # Create a DiGraph for the Cartesian product
-
-        # Iterate over all pairs of nodes from both graphs
-        for (v1, v2) in itertools.product(self.graph.nodes(), other_graph.graph.nodes()):
-            result_graph.add_node((v1, v2))
-
-        # Add edges to the result graph for Cartesian product
-        for (v1, u1) in self.graph.edges():
-            for (v2, u2) in other_graph.graph.edges():
-                result_graph.add_edge((v1, v2), (u1, u2))
-
-        return result_graph
-
-    def draw(self):
-        """Draws the graph using matplotlib and applies the node colors"""
-        plt.clf()  # Clear the current figure
-        pos = {node: coordinates for node, coordinates in self.get_nodes().items()}  # Node positions
-        node_color_list = [self.node_colors.get(node, 'lightblue') for node in self.graph.nodes]
-        nx.draw(self.graph, pos, with_labels=True, node_color=node_color_list,
-                node_size=500, font_size=10, font_color='black', font_weight='bold')
-        plt.draw()  # Update the current figure
-        plt.pause(0.1)  # Small pause to ensure the figure updates
+        The figure persists between calls and only its artists are updated. With level_of_detail,
+        large graphs are drawn without labels and with edges aggregated on a grid.
+        """
+        from src.plotting import draw_graph
+        draw_graph(self, level_of_detail)
 
     def set_node_color(self, node, color):
         """Set color for a specific node."""
         if node in self.get_nodes():
+            if self.node_colors.get(node, MISSING) != color:
+                self._record("Color node", [(("node_color", node, color),
+                                                    ("node_color", node, self.node_colors.get(node, MISSING)))])
             self.node_colors[node] = color
         else:
             raise ValueError("Node does not exist")
 
+    def set_node_attributes(self, values, key, coalesce=None, label=None):
+        """Sets attribute key of many nodes from a {node: value} dict as one undoable change.
+
+        Changes recorded with the same coalesce key (e.g. every step of a drag) merge into one
+        undo entry until history.seal() is called. Attributes are not structural, so listeners
+        are not notified.
+        """
+        nodes = self.graph.nodes
+        missing = [node for node in values if node not in nodes]
+        if missing:
+            raise ValueError(f"Nodes {', '.join(map(str, missing[:10]))} do not exist.")
+        steps = []
+        for node, value in values.items():
+            steps += self._attribute_steps(node, {key: value})
+            nodes[node][key] = value
+        self._record(label or f"Set {key}", steps, coalesce)
+
+    def undo(self):
+        """Reverts the latest recorded change; returns its label, or None if there was nothing to undo"""
+        if not self.history.can_undo():
+            return None
+        entry = self.history.pop_undo()
+        self._replay(inverse for _, inverse in reversed(entry.steps))
+        return entry.label
+
+    def redo(self):
+        """Re-applies the latest undone change; returns its label, or None if there was nothing to redo"""
+        if not self.history.can_redo():
+            return None
+        entry = self.history.pop_redo()
+        self._replay(operation for operation, _ in entry.steps)
+        return entry.label
+
+    def _record(self, label, steps, coalesce=None):
+        """Logs the steps of a mutation for undo and, when the graph has a journal, for the next save"""
+        self.history.record(label, steps, coalesce)
+        # Undo, redo and journal replays journal their operations themselves in _replay
+        if self.journal is not None and not self.history.suspended:
+            self.journal.record([operation for operation, _ in steps])
+
+    def _replay(self, operations):
+        """Applies history operations without recording them for undo; listeners are notified once at the end"""
+        operations = list(operations)
+        self.history.suspended += 1
+        try:
+            with self.batch():
+                for operation in operations:
+                    self._apply_operation(operation)
+        finally:
+            self.history.suspended -= 1
+        if self.journal is not None:
+            self.journal.record(operations)
+
+    def _apply_operation(self, operation):
+        kind, graph = operation[0], self.graph
+        if kind == "add_nodes":
+            graph.add_nodes_from(zip(operation[1], operation[2]))
+        elif kind == "remove_nodes":
+            graph.remove_nodes_from(operation[1])
+        elif kind == "add_edges":
+            succ, pred = graph._succ, graph._pred
+            for (source, target), data in zip(operation[1], operation[2]):
+                succ[source][target] = pred[target][source] = dict(data)
+        elif kind == "remove_edges":
+            graph.remove_edges_from(operation[1])
+        elif kind == "rename":
+            mapping = operation[1]
+            if not mapping:  # Recorded by rename_nodes({}) before it became a no-op
+                return
+            self.rename_nodes(mapping) if len(mapping) > 1 else self.rename_node(*next(iter(mapping.items())))
+            return
+        else:
+            if kind == "node_attribute":
+                _, node, key, value = operation
+                attributes = graph.nodes[node]
+            elif kind == "edge_attribute":
+                _, source, target, key, value = operation
+                attributes = graph[source][target]
+                self._colors_version = next(_versions)
+            else:  # node_color
+                _, node, value = operation
+                key, attributes = node, self.node_colors
+            if value is MISSING:
+                attributes.pop(key, None)
+            else:
+                attributes[key] = value
+            return
+        self._connectivity.invalidate()
+        self._structure_changed()
+
     def check_connectivity(self):
         """Check the connectivity of the graph and return the result"""
-        if nx.is_weakly_connected(self.graph):
-            if nx.is_strongly_connected(self.graph):
+        if self.is_connected():
+            if self.is_strongly_connected():
                 return "The graph is strongly connected."
             else:
                 return "The graph is weakly connected."
@@ -294,34 +918,5 @@ class Graph:
 
     def gui_color_node(self):
         """GUI for selecting node and color"""
-        def on_color_change():
-            node_name = node_name_entry.get()
-            color = color_entry.get()
-            try:
-                self.set_node_color(node_name, color)
-            except ValueError as e:
-                error_label.config(text=str(e))
-
-        # Create a simple Tkinter window for color selection
-        gui_window = tk.Tk()
-        gui_window.title("Color Node")
-
-        # Entry for node name
-        tk.Label(gui_window, text="Enter Node Name:").pack()
-        node_name_entry = tk.Entry(gui_window)
-        node_name_entry.pack()
-
-        # Entry for color
-        tk.Label(gui_window, text="Enter Color:").pack()
-        color_entry = tk.Entry(gui_window)
-        color_entry.pack()
-
-        # Button to change color
-        color_button = tk.Button(gui_window, text="Change Color", command=on_color_change)
-        color_button.pack()
-
-        # Label for error messages
-        error_label = tk.Label(gui_window, text="", fg="red")
-        error_label.pack()
-
-        gui_window.mainloop()
+        from src.color_dialog import color_node_dialog
+        color_node_dialog(self)
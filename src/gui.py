@@ -1,7 +1,16 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox, simpledialog, colorchooser
 from src.graph_logic import Graph
-import random
+from src.canvas_renderer import CanvasRenderer, SELECTION_COLOR
+from src.spatial_index import SpatialIndex
+from src.matrix_view import MatrixView
+from src.info_view import InfoView, NodeIndex, RowSource
+from src.jobs import JobScheduler
+from src import instrumentation
+import itertools
+
+HIT_THRESHOLD = 15  # Maximum distance between a click and a node centre
+LAYOUT_FRAME_MS = 50  # Interval between two animation frames of a running layout
 
 class GraphEditorGUI:
     def __init__(self):
@@ -11,6 +20,10 @@ class GraphEditorGUI:
         self.canvas.pack(fill=tk.BOTH, expand=True)
 
         self.graph = Graph()
+        self.graph.add_change_listener(self.schedule_redraw)
+        self.redraw_pending = False
+        self.renderer = CanvasRenderer(self.canvas)
+        self.spatial_index = SpatialIndex(cell_size=2 * HIT_THRESHOLD)
 
         # Menu
         menu = tk.Menu(self.root)
@@ -20,8 +33,17 @@ class GraphEditorGUI:
         file_menu = tk.Menu(menu, tearoff=0)
         file_menu.add_command(label="Load Graph", command=self.load_graph)
         file_menu.add_command(label="Save Graph", command=self.save_graph)
+        file_menu.add_command(label="Save Graph As", command=self.save_graph_as)
         menu.add_cascade(label="File", menu=file_menu)
 
+        # Edit Menu
+        edit_menu = tk.Menu(menu, tearoff=0)
+        edit_menu.add_command(label="Undo", accelerator="Ctrl+Z", command=self.undo)
+        edit_menu.add_command(label="Redo", accelerator="Ctrl+Y", command=self.redo)
+        menu.add_cascade(label="Edit", menu=edit_menu)
+        self.root.bind("<Control-z>", lambda event: self.undo())
+        self.root.bind("<Control-y>", lambda event: self.redo())
+
         # Operations Menu
         operations_menu = tk.Menu(menu, tearoff=0)
         operations_menu.add_command(label="Add Node", command=self.add_node)
@@ -32,6 +54,23 @@ class GraphEditorGUI:
         operations_menu.add_command(label="Rename Node", command=self.rename_node)
         menu.add_cascade(label="Base Operations", menu=operations_menu)
 
+        # Profiling Menu (see src/instrumentation.py)
+        self.timings_enabled = tk.BooleanVar(value=instrumentation.enabled)
+        self.memory_enabled = tk.BooleanVar(value=instrumentation.memory_enabled())
+        self.profile_running = tk.BooleanVar(value=instrumentation.profiling())
+        profiling_menu = tk.Menu(menu, tearoff=0)
+        profiling_menu.add_checkbutton(label="Collect Timings", variable=self.timings_enabled,
+                                       command=self.update_instrumentation)
+        profiling_menu.add_checkbutton(label="Trace Memory of Analyses", variable=self.memory_enabled,
+                                       command=self.update_instrumentation)
+        profiling_menu.add_command(label="Show Timings", command=self.show_timings)
+        profiling_menu.add_command(label="Save Timings", command=self.save_timings)
+        profiling_menu.add_command(label="Reset Timings", command=instrumentation.reset)
+        profiling_menu.add_separator()
+        profiling_menu.add_checkbutton(label="Capture cProfile", variable=self.profile_running,
+                                       command=self.toggle_profile)
+        menu.add_cascade(label="Profiling", menu=profiling_menu)
+
         # Toolbar
         toolbar = tk.Frame(self.root)
         toolbar.pack(side=tk.TOP, fill=tk.X)
@@ -40,10 +79,22 @@ class GraphEditorGUI:
         tk.Button(toolbar, text="Make Connected Graph", command=self.make_graph_connected).pack(side=tk.LEFT)
         tk.Button(toolbar, text="Find Hamiltonian Cycles", command=self.find_hamiltonian_cycles).pack(side=tk.LEFT)
         tk.Button(toolbar, text="Compute Graph Center", command=self.compute_center).pack(side=tk.LEFT)
+        tk.Button(toolbar, text="Shortest Path", command=self.show_shortest_path).pack(side=tk.LEFT)
+        tk.Button(toolbar, text="Export Distance Matrix", command=self.export_distance_matrix).pack(side=tk.LEFT)
         tk.Button(toolbar, text="Tensor Product", command=self.compute_tensor_product).pack(side=tk.LEFT)
         tk.Button(toolbar, text="Cartesian Product", command=self.compute_cartesian_product).pack(side=tk.LEFT)
         tk.Button(toolbar, text="Show Graph Info", command=self.show_graph_info).pack(side=tk.LEFT)
         tk.Button(toolbar, text="Check Connectivity", command=self.check_connectivity).pack(side=tk.LEFT)
+        tk.Button(toolbar, text="Auto Layout", command=self.start_layout).pack(side=tk.LEFT)
+
+        # Status bar for background analyses
+        status_bar = tk.Frame(self.root)
+        status_bar.pack(side=tk.BOTTOM, fill=tk.X)
+        self.status_text = tk.StringVar()
+        tk.Label(status_bar, textvariable=self.status_text, anchor="w").pack(side=tk.LEFT, fill=tk.X, expand=True)
+        tk.Button(status_bar, text="Cancel", command=self.cancel_jobs).pack(side=tk.RIGHT)
+        self.jobs = JobScheduler(self.root, on_status=self.status_text.set)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
         self.canvas.bind("<ButtonPress-1>", self.on_mouse_press)
         self.canvas.bind("<B1-Motion>", self.on_mouse_drag)
@@ -53,119 +104,314 @@ class GraphEditorGUI:
         self.dragging_node = None
         self.initial_coordinates = None
 
+        # State of the rubber-band selection
+        self.selected_nodes = set()
+        self.selection_start = None
+        self.selection_rect = None
+
+        # State of the background layout
+        self.layout_graph = None
+        self.layout_engine = None  # ForceLayout being stepped by the "Layout" job, None once done or cancelled
+        self.queued_layouts = []  # Node lists (None: all nodes) requested while a layout was running
+
     def run(self):
         self.root.mainloop()
 
+    def on_close(self):
+        """Cancel background analyses and close the window"""
+        self.jobs.shutdown()
+        if self.graph.journal is not None:
+            self.graph.journal.close()  # Let a background compaction finish writing the snapshot
+        self.root.destroy()
+
+    @staticmethod
+    def _bfs_progress(job):
+        """Progress callback for the all-pairs BFS behind eccentricity-based analyses"""
+        return lambda done, total: job.report(f"BFS from {done}/{total} sources")
+
+    def run_in_background(self, name, function, on_done):
+        """Run function(job, graph) on a worker thread with a snapshot of the current graph."""
+        submitted = self.jobs.submit(name, function, self.graph.copy(), on_done=on_done,
+                                     on_error=lambda e: messagebox.showerror("Error", f"{name} failed: {e}"))
+        if not submitted:
+            messagebox.showinfo("Busy", f"{name} is already running.")
+
     def load_graph(self):
         """Load a graph from a file."""
         file_path = filedialog.askopenfilename(defaultextension=".bin",
                                                filetypes=[("Graph Files", "*.bin"), ("Text Files", "*.txt")])
         if file_path:
             try:
+                if self.graph.journal is not None:
+                    # Let a compaction of the outgoing graph finish first; it may be rewriting this very file
+                    self.graph.journal.close()
                 # Load the graph using the load method from the Graph class
-                self.graph = Graph.load(file_path)  # Use the static load method and update self.graph
+                # Saves append to the file's journal instead of rewriting it
+                self.graph = Graph.load(file_path, journal=True)
+                self.cancel_layout()
+                self.graph.add_change_listener(self.schedule_redraw)
+                self.selected_nodes.clear()
+                self.spatial_index.rebuild(self.graph.get_nodes())
                 self.draw_graph()  # Redraw the graph after loading
                 print(f"Graph loaded from {file_path}")
             except Exception as e:
                 messagebox.showerror("Error", f"Error loading graph: {str(e)}")
 
     def save_graph(self):
-        """Save the current graph to a file."""
+        """Save the changes to the file the graph came from, or ask for a file the first time."""
+        if self.graph.journal is None:
+            self.save_graph_as()
+            return
+        try:
+            self.graph.save()  # Appends the changes since the last save to the file's journal
+        except Exception as e:
+            messagebox.showerror("Error", f"Error saving graph: {str(e)}")
+
+    def save_graph_as(self):
+        """Save the current graph to a new file."""
         file_path = filedialog.asksaveasfilename(defaultextension=".bin",
                                                  filetypes=[("Graph Files", "*.bin"), ("Text Files", "*.txt")])
         if file_path:
             try:
-                # Save the graph using the save method from the Graph class
-                self.graph.save(file_path)  # Save the graph as a .bin file
-                print(f"Graph successfully saved to {file_path}")
+                # Writes a full snapshot; later saves only append to its journal
+                self.graph.save(file_path, journal=True)
             except Exception as e:
                 messagebox.showerror("Error", f"Error saving graph: {str(e)}")
 
+    def schedule_redraw(self, graph=None):
+        """Change listener: coalesces every structural change until Tk is idle into one redraw"""
+        if not self.redraw_pending:
+            self.redraw_pending = True
+            self.root.after_idle(self.draw_graph)
+
     def draw_graph(self):
-        """Redraw the graph on the canvas."""
-        self.canvas.delete("all")  # Clear the canvas before redrawing
+        """Redraw the graph on the canvas after a structural change."""
+        self.redraw_pending = False
 
-        # Ensure all nodes have 'pos', 'color', and 'shape'
+        # Nodes without a position start next to their neighbours and are settled by the layout engine
         nodes = self.graph.get_nodes()
+        unplaced = [node for node, attributes in nodes.items() if 'pos' not in attributes]
+        if unplaced:
+            self.start_layout(unplaced)
+
+        # Ensure all nodes have 'color' and 'shape'
         for node, attributes in nodes.items():
-            attributes.setdefault('pos', [random.random() * 500, random.random() * 500])
             attributes.setdefault('color', 'blue')  # Default color
             attributes.setdefault('shape', 'circle')  # Default shape
 
-        # Draw edges (directed or undirected) with color if specified
-        for node1, node2 in self.graph.get_edges():
-            pos1, pos2 = self.graph.get_nodes()[node1]['pos'], self.graph.get_nodes()[node2]['pos']
+        # Recreate every canvas item; dragging only moves the affected items
+        self.renderer.rebuild(self.graph)
 
-            # Retrieve edge attributes
-            edge_data = self.graph.get_edge_data(node1, node2)
-            edge_color = edge_data.get('color', 'black')  # Default color
-            directed = edge_data.get('directed', False)  # Default directed as False
+        # Restore the highlight of selected nodes that still exist
+        self.selected_nodes = {node for node in self.selected_nodes if node in nodes}
+        for node in self.selected_nodes:
+            self.renderer.set_selected(node, True)
 
-            if directed:
-                # Draw the arrow from node1 to node2 for directed edges
-                self.canvas.create_line(pos1[0], pos1[1], pos2[0], pos2[1],
-                                        fill=edge_color, arrow=tk.LAST, width=5,
-                                        arrowshape=(10, 20, 10))
-            else:
-                # Draw undirected edge as a line
-                self.canvas.create_line(pos1[0], pos1[1], pos2[0], pos2[1],
-                                        fill=edge_color, width=3)
+    def start_layout(self, nodes=None, amend=False):
+        """Lays the nodes out on a worker thread and animates the intermediate positions.
 
+        Without nodes every node is placed; with nodes only they and their neighbours move.
+        The moving nodes get their starting positions right away, so they can be drawn.
+        With amend the layout is undone together with the latest change (see Graph.layout_engine).
+        """
+        graph, engine = self.graph, self.graph.layout_engine(nodes, amend=amend)
+        self.show_layout_frame(graph, engine)
+        if self.jobs.is_running("Layout"):
+            if self.layout_engine is None:
+                # A cancelled layout is still winding down; its name is free after the next poll
+                self.root.after(LAYOUT_FRAME_MS, lambda: self.start_layout(nodes))
+            else:
+                self.queued_layouts.append(nodes)  # Started from the latest positions once this one is done
+            return
 
-        # Draw nodes with their respective colors, shapes, and labels
-        for node in self.graph.get_nodes():
-            pos = self.graph.get_nodes()[node]['pos']
-            color = self.graph.get_nodes()[node]['color']
-            shape = self.graph.get_nodes()[node]['shape']
-            radius = 10  # Default size for circle and square
+        def run(job):
+            return engine.run(progress=lambda iteration, total: job.report(f"iteration {iteration}/{total}"))
 
-            # Draw node shape (circle or square)
-            if shape == 'circle':
-                self.canvas.create_oval(pos[0] - radius, pos[1] - radius,
-                                        pos[0] + radius, pos[1] + radius, fill=color)
-            elif shape == 'square':
-                self.canvas.create_rectangle(pos[0] - radius, pos[1] - radius,
-                                             pos[0] + radius, pos[1] + radius, fill=color)
+        self.layout_graph, self.layout_engine = graph, engine
+        self.jobs.submit("Layout", run, on_done=lambda positions: self.finish_layout(graph, engine, positions),
+                         on_error=self.layout_failed)
+        self.root.after(LAYOUT_FRAME_MS, self.animate_layout, engine)
 
-            # Draw the node label slightly above the node, with black text
-            self.canvas.create_text(pos[0], pos[1] - radius - 10, text=str(node), fill="black")
+    def animate_layout(self, engine):
+        """Shows the latest frame of the layout until it finishes or is replaced"""
+        if self.layout_engine is not engine:
+            return
+        self.show_layout_frame(self.layout_graph, engine)
+        self.root.after(LAYOUT_FRAME_MS, self.animate_layout, engine)
+
+    def show_layout_frame(self, graph, engine, positions=None):
+        """Writes the engine's positions to the graph and moves the affected canvas items"""
+        if graph is not self.graph:
+            return  # Another graph was loaded in the meantime
+        nodes = graph.get_nodes()
+        for node in graph.apply_layout(engine, positions):
+            self.spatial_index.move(node, nodes[node]['pos'])
+            # A pending redraw rebuilds every item from the new positions anyway
+            if not self.redraw_pending and node in self.renderer.node_items:
+                self.renderer.move_node(graph, node)
+
+    def finish_layout(self, graph, engine, positions):
+        if self.layout_engine is not engine:
+            return  # Cancelled; its last iteration may have completed anyway
+        self.layout_engine = None
+        self.show_layout_frame(graph, engine, positions)
+        if self.queued_layouts:
+            queued, self.queued_layouts = self.queued_layouts, []
+            self.start_layout(None if None in queued else [node for nodes in queued for node in nodes])
+
+    def layout_failed(self, error):
+        if self.layout_engine is not None:
+            self.layout_graph.history.seal()
+        self.layout_engine = None
+        self.queued_layouts = []
+        messagebox.showerror("Error", f"Layout failed: {error}")
+
+    def cancel_jobs(self):
+        """Status bar button: stops every background job, the layout included"""
+        self.cancel_layout()
+        self.jobs.cancel()
+
+    def cancel_layout(self):
+        """Stops the running layout where it is, e.g. when the user grabs a node"""
+        self.jobs.cancel("Layout")
+        if self.layout_engine is not None:
+            self.layout_graph.history.seal()  # The positions so far are the layout's whole undo entry
+        self.layout_engine = None
+        self.queued_layouts = []
+
+    def undo(self):
+        """Reverts the latest change to the graph"""
+        self.cancel_layout()  # A running layout would overwrite the restored positions
+        label = self.graph.undo()
+        self.status_text.set(f"Undo: {label}" if label else "Nothing to undo")
+        self.refresh_after_history()
+
+    def redo(self):
+        """Re-applies the latest undone change"""
+        self.cancel_layout()
+        label = self.graph.redo()
+        self.status_text.set(f"Redo: {label}" if label else "Nothing to redo")
+        self.refresh_after_history()
+
+    def refresh_after_history(self):
+        """Undo and redo may move, recolour, rename or remove any node: re-index and redraw everything"""
+        self.spatial_index.rebuild(self.graph.get_nodes())
+        self.schedule_redraw()
+
+    def update_instrumentation(self):
+        """Applies the Profiling menu's check boxes; tracing memory implies collecting timings"""
+        if self.memory_enabled.get():
+            self.timings_enabled.set(True)
+        if self.timings_enabled.get():
+            instrumentation.enable(memory=self.memory_enabled.get())
+        else:
+            instrumentation.disable()
+
+    def show_timings(self):
+        """Shows the collected timings, frame-time histograms and memory peaks in a window"""
+        window = tk.Toplevel(self.root)
+        window.title("Timings")
+        text = tk.Text(window, width=110, height=40, font="TkFixedFont", wrap="none")
+        text.pack(fill=tk.BOTH, expand=True)
+        text.insert("1.0", instrumentation.report())
+        text.config(state=tk.DISABLED)
+
+    def save_timings(self):
+        file_path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON Files", "*.json")])
+        if file_path:
+            try:
+                instrumentation.write_report(file_path)
+            except OSError as e:
+                messagebox.showerror("Error", f"Error saving timings: {str(e)}")
+
+    def toggle_profile(self):
+        """Starts a cProfile capture, or ends it and asks where to write the .prof file"""
+        if self.profile_running.get():
+            instrumentation.start_profile()
+        else:
+            file_path = filedialog.asksaveasfilename(defaultextension=".prof", filetypes=[("Profiles", "*.prof")])
+            try:
+                instrumentation.stop_profile(file_path or None)
+            except OSError as e:
+                messagebox.showerror("Error", f"Error saving profile: {str(e)}")
+        self.timings_enabled.set(instrumentation.enabled)
 
     def on_mouse_press(self, event):
         """Handle mouse press events."""
-        for node, attributes in self.graph.get_nodes().items():
-            if 'pos' in attributes:
-                node_x, node_y = attributes['pos']  # Extract x and y coordinates from the 'pos' attribute
-
-                # Check if the mouse click is within the node bounds
-                if self.is_within_bounds(event.x, event.y, node_x, node_y):
-                    print(f"Node {node} clicked at ({node_x}, {node_y})")
-                    self.dragging_node = node  # Set the node to be dragged
-                    self.initial_coordinates = (node_x, node_y)  # Store initial coordinates
+        node = self.spatial_index.nearest(event.x, event.y, HIT_THRESHOLD)
+        if node is not None:
+            node_x, node_y = self.graph.get_nodes()[node]['pos']
+            print(f"Node {node} clicked at ({node_x}, {node_y})")
+            self.cancel_layout()  # The layout would otherwise keep moving the node being dragged
+            if node not in self.selected_nodes:
+                self.set_selection(set())
+            self.dragging_node = node  # Set the node to be dragged
+            self.initial_coordinates = (event.x, event.y)  # Store initial coordinates
+        else:
+            # Clicked on empty space: start a rubber-band selection
+            self.set_selection(set())
+            self.selection_start = (event.x, event.y)
 
     def on_mouse_drag(self, event):
-        """Moves the node with the mouse while dragging"""
+        """Moves the node (or the whole selection) with the mouse while dragging"""
         if self.dragging_node:
-            new_x, new_y = event.x, event.y
-            self.graph.get_nodes()[self.dragging_node]['pos'] = [new_x, new_y]  # Update position
-            self.draw_graph()  # Redraw the graph to reflect the new position
+            dx = event.x - self.initial_coordinates[0]
+            dy = event.y - self.initial_coordinates[1]
+            self.initial_coordinates = (event.x, event.y)
+            moved_nodes = self.selected_nodes if self.dragging_node in self.selected_nodes else [self.dragging_node]
+            nodes = self.graph.get_nodes()
+            positions = {node: [nodes[node]['pos'][0] + dx, nodes[node]['pos'][1] + dy] for node in moved_nodes}
+            # The whole drag is one undo entry, closed when the mouse is released
+            self.graph.set_node_attributes(positions, 'pos', coalesce="drag", label="Move nodes")
+            for node in moved_nodes:
+                self.spatial_index.move(node, nodes[node]['pos'])
+                self.renderer.move_node(self.graph, node)  # Move only the affected items
+        elif self.selection_start:
+            x0, y0 = self.selection_start
+            if self.selection_rect is None:
+                self.selection_rect = self.canvas.create_rectangle(x0, y0, event.x, event.y,
+                                                                   outline=SELECTION_COLOR, dash=(4, 2))
+            else:
+                self.canvas.coords(self.selection_rect, x0, y0, event.x, event.y)
 
-    def on_mouse_release(self, _):
-        """Finalize the new position of the node when mouse button is released"""
+    def on_mouse_release(self, event):
+        """Finalize the new position of the node or the rubber-band selection when the mouse button is released"""
         if self.dragging_node:
+            self.graph.history.seal()  # The next drag is a separate undo entry
             self.dragging_node = None  # Reset the dragging state
             self.initial_coordinates = None  # Clear initial coordinates
-
-    def is_within_bounds(self, click_x, click_y, node_x, node_y, threshold=15):
-        """Check if the mouse click is within a given distance (threshold) from the node."""
-        distance = ((click_x - node_x) ** 2 + (click_y - node_y) ** 2) ** 0.5
-        return distance <= threshold
+        elif self.selection_start:
+            x0, y0 = self.selection_start
+            if self.selection_rect is not None:
+                self.canvas.delete(self.selection_rect)
+                self.set_selection(self.spatial_index.in_rect(x0, y0, event.x, event.y))
+            self.selection_start = None
+            self.selection_rect = None
+
+    def set_selection(self, nodes):
+        """Replace the current selection and update the node highlights"""
+        for node in self.selected_nodes - nodes:
+            self.renderer.set_selected(node, False)
+        for node in nodes - self.selected_nodes:
+            self.renderer.set_selected(node, True)
+        self.selected_nodes = nodes
 
     def show_adjacency_matrix(self):
         if not self.graph.get_nodes():
             messagebox.showerror("Error", "Graph is empty. Cannot show adjacency matrix.")
             return
-        matrix = self.graph.adjacency_matrix()
-        messagebox.showinfo("Adjacency Matrix", str(matrix))
+        nodes, matrix = self.graph.sparse_adjacency_matrix()
+        MatrixView(self.root, nodes, matrix, on_export=self.export_adjacency_matrix)
+
+    def export_adjacency_matrix(self):
+        """Stream the sparse adjacency matrix to a Matrix Market or .npz file."""
+        file_path = filedialog.asksaveasfilename(defaultextension=".mtx",
+                                                 filetypes=[("Matrix Market", "*.mtx"), ("NumPy CSR", "*.npz")])
+        if file_path:
+            try:
+                self.graph.export_adjacency(file_path)
+            except Exception as e:
+                messagebox.showerror("Error", f"Error exporting adjacency matrix: {str(e)}")
 
     def rename_node(self):
         """Renames a node by asking the user for the current and new names."""
@@ -183,8 +429,9 @@ class GraphEditorGUI:
 
                 # Show result to the user
                 if success:
+                    self.spatial_index.rename(old_name, new_name)
+                    self.selected_nodes.discard(old_name)
                     messagebox.showinfo("Node Renamed", message)
-                    self.draw_graph()
                 else:
                     messagebox.showwarning("Error", message)
 
@@ -192,8 +439,45 @@ class GraphEditorGUI:
         if not self.graph.get_nodes():
             messagebox.showerror("Error", "Graph is empty. Cannot compute radius and diameter.")
             return
-        radius, diameter = self.graph.radius_and_diameter()
-        messagebox.showinfo("Radius and Diameter", f"Radius: {radius}, Diameter: {diameter}")
+
+        def show(result):
+            radius, diameter = result
+            messagebox.showinfo("Radius and Diameter", f"Radius: {radius}, Diameter: {diameter}")
+
+        self.run_in_background("Radius and Diameter",
+                               lambda job, graph: graph.radius_and_diameter(progress=self._bfs_progress(job)), show)
+
+    def show_shortest_path(self):
+        """Asks for two nodes, selects a shortest path between them and shows its length"""
+        source = simpledialog.askstring("Shortest Path", "Enter the start node:", parent=self.root)
+        if not source:
+            return
+        target = simpledialog.askstring("Shortest Path", "Enter the end node:", parent=self.root)
+        if not target:
+            return
+        try:
+            path = self.graph.shortest_path(source, target)
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
+        if path is None:
+            messagebox.showinfo("Shortest Path", f"There is no path from '{source}' to '{target}'.")
+            return
+        self.set_selection(set(path))
+        messagebox.showinfo("Shortest Path", f"Distance: {len(path) - 1}\n" + " -> ".join(map(str, path)))
+
+    def export_distance_matrix(self):
+        """Writes the all-pairs distance matrix to a .npy file, computed on worker processes"""
+        if not self.graph.get_nodes():
+            messagebox.showerror("Error", "Graph is empty. Cannot compute distances.")
+            return
+        file_path = filedialog.asksaveasfilename(defaultextension=".npy", filetypes=[("NumPy Files", "*.npy")])
+        if file_path:
+            self.run_in_background(
+                "Distance Matrix",
+                lambda job, graph: graph.distance_matrix(file_path, progress=self._bfs_progress(job)),
+                lambda result: messagebox.showinfo("Distance Matrix", f"Distances of {len(result)} nodes written "
+                                                                      f"to {file_path}"))
 
     def add_node(self):
         """Prompts the user for node name and shape, then adds the node."""
@@ -209,7 +493,7 @@ class GraphEditorGUI:
 
             # Add the node with the selected shape
             self.graph.add_node(node_name, shape=shape)
-            self.draw_graph()
+            self.start_layout([node_name], amend=True)  # Moves the node off the canvas centre, undone with it
 
     def remove_node(self):
         if not self.graph.get_nodes():
@@ -219,7 +503,7 @@ class GraphEditorGUI:
         if node_name:
             try:
                 self.graph.remove_node(node_name)
-                self.draw_graph()
+                self.spatial_index.remove(node_name)
             except ValueError as e:
                 messagebox.showerror("Error", str(e))
 
@@ -259,10 +543,8 @@ class GraphEditorGUI:
                 raise ValueError(f"Nodes {node1} and/or {node2} do not exist in the graph.")
 
             # Add the edge with direction information
+            # The change listener redraws the canvas once Tk is idle
             self.graph.add_edge_to_graph(node1, node2, directed)
-
-            # Redraw the graph
-            self.draw_graph()
             print(f"Edge between {node1} and {node2} added successfully")
         except ValueError as e:
             messagebox.showerror("Error", str(e))
@@ -276,72 +558,63 @@ class GraphEditorGUI:
         if node1 and node2:
             try:
                 self.graph.remove_edge(node1, node2)
-                self.draw_graph()
             except ValueError as e:
                 messagebox.showerror("Error", str(e))
 
 
     def show_graph_info(self, graph=None):
-        """Displays full information about the graph: nodes, edges, and their attributes in a scrollable text window.
-        
-        If no graph is provided, it uses self.graph.
-        """
-
-        if graph:
-            nodes = graph.nodes()
-            edges = graph.edges()
-        else: 
-            nodes = self.graph.get_nodes()
-            edges = self.graph.get_edges()
+        """Displays the nodes and edges of the graph with their attributes in a virtualised list window.
 
-        # Use self.graph if no graph is provided
+        If no graph is provided, it uses self.graph. Rows are formatted only when they scroll into
+        view, and nodes can be filtered by name prefix, colour or shape.
+        """
         graph = graph or self.graph
+        nodes = graph.get_nodes()
+        edges = graph.edge_records()  # Each undirected edge once, attributes already resolved
 
-        if graph is None:
-            messagebox.showerror("Error", "No graph is available to display.")
-            return
-
-        # Collecting node information
-        node_info = "Nodes:\n"
-        for node, attributes in nodes.items():
+        def format_node(node):
+            attributes = nodes[node]
             pos = attributes.get('pos', [None, None])  # Get position, default to [None, None]
             color = attributes.get('color', 'undefined')  # Get color, default to 'undefined'
             shape = attributes.get('shape', 'undefined')  # Get shape, default to 'undefined'
-            node_info += f"Node: {node}\n  Position: {pos}\n  Color: {color}\n  Shape: {shape}\n\n"
-        
-        # Collecting edge information
-        edge_info = "Edges:\n"
-        for node1, node2 in edges:
-            edge_data = graph.get_edge_data(node1, node2)  # Get edge data between two nodes
-            edge_color = edge_data.get('color', 'black')  # Get edge color, default to 'black'
-            directed = edge_data.get('directed', False)  # Get edge direction, default to False
-            edge_info += f"Edge: {node1} -> {node2}\n  Color: {edge_color}\n  Directed: {directed}\n\n"
-        
-        # Create a new top-level window for displaying the information
-        info_window = tk.Toplevel(self.root)
-        info_window.title("Graph Information")
-
-        # Create a frame for the text widget and scrollbar
-        frame = tk.Frame(info_window)
-        frame.pack(fill=tk.BOTH, expand=True)
-
-        # Create a Text widget for displaying the information
-        text_widget = tk.Text(frame, wrap=tk.WORD, width=80, height=20)
-        text_widget.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-
-        # Insert the gathered information into the text widget
-        text_widget.insert(tk.END, node_info + edge_info)
-
-        # Create a vertical scrollbar
-        scrollbar = tk.Scrollbar(frame, command=text_widget.yview)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-
-        # Link the scrollbar to the text widget
-        text_widget.config(yscrollcommand=scrollbar.set)
-
-        # Disable editing the text (make it read-only)
-        text_widget.config(state=tk.DISABLED)
-
+            return f"Node: {node}  Position: {pos}  Color: {color}  Shape: {shape}"
+
+        def format_edge(record):
+            return f"Edge: {record.node1} -> {record.node2}  Color: {record.color}  Directed: {record.directed}"
+
+        def filter_sections(matched):
+            # Edges incident to the matching nodes, each listed once
+            return {"Nodes": RowSource.from_sequence(matched, format_node),
+                    "Edges": RowSource.from_sequence(graph.edge_records(matched), format_edge)}
+
+        sections = {"Nodes": RowSource(len(nodes), lambda start: itertools.islice(nodes, start, None), format_node),
+                    "Edges": RowSource.from_sequence(edges, format_edge)}
+        InfoView(self.root, "Graph Information", f"Nodes: {len(nodes)}  Edges: {len(edges)}", sections,
+                 index=NodeIndex(nodes), filter_sections=filter_sections)
+
+    def show_product_info(self, product):
+        """Displays a product graph in a virtualised list window, reading rows straight from the lazy view"""
+        sections = {"Nodes": RowSource(product.number_of_nodes(), product.nodes, lambda node: f"Node: {node}"),
+                    "Edges": RowSource(product.number_of_edges(), product.edges,
+                                       lambda edge: f"Edge: {edge[0]} -> {edge[1]}")}
+        view = InfoView(self.root, f"{product.kind.capitalize()} Product Information",
+                        f"Nodes: {product.number_of_nodes()}  Edges: {product.number_of_edges()}", sections)
+
+        def analyse(job):
+            connected = "strongly" if product.is_strongly_connected() else (
+                "weakly" if product.is_connected() else "not")
+            radius, diameter = product.radius_and_diameter(progress=self._bfs_progress(job))
+            return f"Connected: {connected}\nRadius: {radius}\nDiameter: {diameter}"
+
+        def start_analysis():
+            # The view already works on snapshots of both factors, so no copy of self.graph is needed
+            submitted = self.jobs.submit("Product Analysis", analyse,
+                                         on_done=lambda result: messagebox.showinfo("Product Analysis", result),
+                                         on_error=lambda e: messagebox.showerror("Error", f"Product Analysis failed: {e}"))
+            if not submitted:
+                messagebox.showinfo("Busy", "Product Analysis is already running.")
+
+        view.add_button("Analyse", start_analysis)
 
     def check_connectivity(self):
         result = self.graph.check_connectivity() 
@@ -353,7 +626,6 @@ class GraphEditorGUI:
             messagebox.showerror("Error", "Graph is empty. Cannot make it connected.")
             return
         self.graph.make_connected()
-        self.draw_graph()
         messagebox.showinfo("Info", "The graph has been converted to a connected graph.")
 
     def find_hamiltonian_cycles(self):
@@ -361,19 +633,25 @@ class GraphEditorGUI:
         if not self.graph.get_nodes():
             messagebox.showerror("Error", "Graph is empty. Cannot find Hamiltonian cycles.")
             return
-        cycles = self.graph.find_hamiltonian_cycles()
-        if cycles:
-            messagebox.showinfo("Hamiltonian Cycles", f"Found Hamiltonian cycles:\n{cycles}")
-        else:
-            messagebox.showinfo("Hamiltonian Cycles", "No Hamiltonian cycles found.")
+
+        def search(job, graph):
+            return graph.find_hamiltonian_cycles(progress=lambda expansions: job.report(f"{expansions} expansions"))
+
+        def show(cycles):
+            if cycles:
+                messagebox.showinfo("Hamiltonian Cycles", f"Found Hamiltonian cycles:\n{cycles}")
+            else:
+                messagebox.showinfo("Hamiltonian Cycles", "No Hamiltonian cycles found.")
+
+        self.run_in_background("Hamiltonian Cycles", search, show)
 
     def compute_center(self):
         """Compute the center of the graph"""
         if not self.graph.get_nodes():
             messagebox.showerror("Error", "Graph is empty. Cannot compute the center.")
             return
-        center = self.graph.center()
-        messagebox.showinfo("Graph Center", f"Center: {center}")
+        self.run_in_background("Graph Center", lambda job, graph: graph.center(progress=self._bfs_progress(job)),
+                               lambda center: messagebox.showinfo("Graph Center", f"Center: {center}"))
 
     def compute_tensor_product(self):
         """Compute the tensor product of two graphs and display information about the result"""
@@ -384,8 +662,8 @@ class GraphEditorGUI:
                                                     filetypes=[("Graph Files", "*.bin")])
         if second_graph_file:
             second_graph = Graph.load(second_graph_file)
-            result_graph = self.graph.tensor_product(second_graph)
-            self.show_graph_info(result_graph)
+            self.run_in_background("Tensor Product", lambda job, graph: graph.tensor_product(second_graph),
+                                   self.show_product_info)
 
     def compute_cartesian_product(self):
         """Compute the cartesian product of two graphs and display information about the result"""
@@ -396,8 +674,8 @@ class GraphEditorGUI:
                                                     filetypes=[("Graph Files", "*.bin")])
         if second_graph_file:
             second_graph = Graph.load(second_graph_file)
-            result_graph = self.graph.cartesian_product(second_graph)
-            self.show_graph_info(result_graph)
+            self.run_in_background("Cartesian Product", lambda job, graph: graph.cartesian_product(second_graph),
+                                   self.show_product_info)
 
 
     def color_node(self):
@@ -411,8 +689,8 @@ class GraphEditorGUI:
             color_code = colorchooser.askcolor(title="Choose Node Color")[1]
             if color_code:
                 # Update the node's color in the graph
-                self.graph.get_nodes()[node_name]['color'] = color_code
-                self.draw_graph()  # Redraw graph to apply the color
+                self.graph.set_node_attributes({node_name: color_code}, 'color', label="Color node")
+                self.renderer.update_node_style(self.graph, node_name)  # Recolor only this node
             else:
                 messagebox.showinfo("Info", "No color selected.")
         else:
@@ -420,4 +698,7 @@ class GraphEditorGUI:
 
     def _get_input(self, prompt):
         """Helper function to get user input via dialog."""
-        return simpledialog.askstring("Input", prompt)
\ No newline at end of file
+        return simpledialog.askstring("Input", prompt)
+
+
+instrumentation.trace_handlers(GraphEditorGUI, exclude=("run",))  # Timed only while instrumentation is enabled
@@ -0,0 +1,207 @@
+"""Hamiltonian cycle search on integer node ids with bitset state.
+
+Small graphs are decided with the Held-Karp bitmask dynamic program. Everything else
+(and enumeration of several cycles) uses backtracking over successor bitsets with
+pruning: every unvisited node must keep an available predecessor and successor, a node
+whose only available predecessor is the current one forces the next move, and the
+unvisited remainder must stay reachable from the current node.
+"""
+import time
+
+HELD_KARP_LIMIT = 15  # Largest node count decided with the O(2^n * n) dynamic program
+CLOCK_CHECK_INTERVAL = 1024  # Expansions between two looks at the clock
+
+
+class SearchBudgetExceeded(TimeoutError):
+    """Raised when the time or expansion budget runs out; carries the cycles found so far"""
+
+    def __init__(self, cycles, expansions):
+        super().__init__(f"Hamiltonian cycle search stopped after {expansions} expansions")
+        self.cycles = cycles
+        self.expansions = expansions
+
+
+class _BudgetExhausted(Exception):
+    pass
+
+
+def _bits(mask):
+    """Yields the indices of the set bits of mask"""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class HamiltonianSearch:
+    def __init__(self, nodes, successors, timeout=None, max_expansions=None, progress=None):
+        """nodes: node names; successors: list of successor id lists, one per node.
+
+        progress, if given, is called with the expansion count every CLOCK_CHECK_INTERVAL
+        expansions; an exception raised from it aborts the search.
+        """
+        self.nodes = nodes
+        n = len(nodes)
+        self.self_loops = [i in successors[i] for i in range(n)]
+        self.succ_mask = [0] * n
+        self.pred_mask = [0] * n
+        for i, targets in enumerate(successors):
+            for j in targets:
+                if i != j:
+                    self.succ_mask[i] |= 1 << j
+                    self.pred_mask[j] |= 1 << i
+
+        self.full = (1 << n) - 1
+        self.deadline = time.monotonic() + timeout if timeout is not None else None
+        self.max_expansions = max_expansions
+        self.progress = progress
+        self.expansions = 0
+        self.cycles = []
+
+    @staticmethod
+    def from_digraph(digraph, **budget):
+        nodes = list(digraph.nodes)
+        index = {node: i for i, node in enumerate(nodes)}
+        successors = [[index[target] for target in digraph.succ[node]] for node in nodes]
+        return HamiltonianSearch(nodes, successors, **budget)
+
+    def _tick(self):
+        self.expansions += 1
+        if self.max_expansions is not None and self.expansions > self.max_expansions:
+            raise _BudgetExhausted()
+        if self.expansions % CLOCK_CHECK_INTERVAL == 0:
+            if self.deadline is not None and time.monotonic() > self.deadline:
+                raise _BudgetExhausted()
+            if self.progress is not None:
+                self.progress(self.expansions)
+
+    def find(self, limit=1):
+        """Returns up to `limit` Hamiltonian cycles as closed lists of node names (None for no limit)"""
+        n = len(self.nodes)
+        if n == 0:
+            return []
+        if n == 1:
+            return [[self.nodes[0], self.nodes[0]]] if self.self_loops[0] else []
+
+        # Every node needs a way in and a way out
+        if not all(self.succ_mask) or not all(self.pred_mask):
+            return []
+
+        try:
+            if limit == 1 and n <= HELD_KARP_LIMIT:
+                cycle = self._held_karp()
+                self.cycles = [cycle] if cycle else []
+            else:
+                self._seen = set()
+                self._search(limit)
+        except _BudgetExhausted:
+            raise SearchBudgetExceeded(self._named(self.cycles), self.expansions) from None
+        return self._named(self.cycles)
+
+    def _named(self, cycles):
+        return [[self.nodes[i] for i in cycle] + [self.nodes[cycle[0]]] for cycle in cycles]
+
+    def _held_karp(self):
+        """Held-Karp over subsets containing node 0; returns one cycle of node ids or None"""
+        n = len(self.nodes)
+        pred_mask = self.pred_mask
+        # ends[mask]: bitset of nodes v such that a path from 0 visits exactly `mask` and stops at v
+        ends = [0] * (1 << n)
+        ends[1] = 1
+        for mask in range(3, 1 << n, 2):  # Odd masks are the ones containing node 0
+            result = 0
+            for v in _bits(mask & ~1):
+                if pred_mask[v] & ends[mask ^ (1 << v)]:
+                    result |= 1 << v
+            ends[mask] = result
+            if mask % (2 * CLOCK_CHECK_INTERVAL) == 1:
+                self.expansions += CLOCK_CHECK_INTERVAL - 1  # One tick per CLOCK_CHECK_INTERVAL masks
+                self._tick()
+
+        closing = ends[self.full] & pred_mask[0]
+        if not closing:
+            return None
+        v = next(_bits(closing))
+        # Walk back through the table; node 0 only appears in ends[1], so the walk stops there
+        path, mask = [v], self.full
+        while v != 0:
+            previous_mask = mask ^ (1 << v)
+            v = next(_bits(ends[previous_mask] & pred_mask[v]))
+            path.append(v)
+            mask = previous_mask
+        path.reverse()
+        return path
+
+    def _search(self, limit):
+        """Depth-first search from node 0 with an explicit stack, so paths as long as the graph need no recursion.
+
+        stack[i] iterates over the successors still to try after path[i].
+        """
+        path, visited = [0], 1
+        candidates = self._candidates(path, 0, visited, limit)
+        if candidates is None:
+            return
+        stack = [iter(candidates)]
+        while stack:
+            w = next(stack[-1], None)
+            if w is None:
+                stack.pop()  # Every extension of path tried: backtrack
+                visited ^= 1 << path.pop()
+                continue
+            path.append(w)
+            visited |= 1 << w
+            candidates = self._candidates(path, w, visited, limit)
+            if candidates is None:
+                return
+            stack.append(iter(candidates))
+
+    def _candidates(self, path, current, visited, limit):
+        """Visits the end of path: records a completed cycle, prunes, and returns the successors to try.
+
+        Returns None once enough cycles are found, and an empty list for a dead end.
+        """
+        self._tick()
+        if visited == self.full:
+            if self.succ_mask[current] & 1:
+                reverse = (path[0],) + tuple(reversed(path[1:]))
+                if reverse not in self._seen:  # A cycle and its reversal are the same cycle
+                    self._seen.add(tuple(path))
+                    self.cycles.append(list(path))
+            return None if limit is not None and len(self.cycles) >= limit else []
+
+        unvisited = self.full & ~visited
+        current_bit = 1 << current
+        if not self.pred_mask[0] & (unvisited | current_bit):
+            return []  # Nothing left to close the cycle with
+
+        # Degree pruning and forced moves
+        forced = None
+        for w in _bits(unvisited):
+            predecessors = self.pred_mask[w] & (unvisited | current_bit)
+            if not predecessors or not self.succ_mask[w] & (unvisited | 1):
+                return []
+            if predecessors == current_bit:
+                if forced is not None:
+                    return []  # Two nodes can only be entered from here
+                forced = w
+
+        if not self._reaches_all(current, unvisited):
+            return []
+
+        if forced is not None:
+            return [forced]
+        # Try the most constrained successors first
+        return sorted(_bits(self.succ_mask[current] & unvisited),
+                      key=lambda w: (self.succ_mask[w] & unvisited).bit_count())
+
+    def _reaches_all(self, current, unvisited):
+        """Checks that every unvisited node is reachable from current through unvisited nodes"""
+        reached = 0
+        frontier = self.succ_mask[current] & unvisited
+        while frontier:
+            reached |= frontier
+            following = 0
+            for v in _bits(frontier):
+                following |= self.succ_mask[v]
+            frontier = following & unvisited & ~reached
+        return reached == unvisited
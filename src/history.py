@@ -0,0 +1,161 @@
+"""Undo/redo log for Graph: every mutation is stored as a few primitive operations with their inverses.
+
+An entry is a list of (operation, inverse) steps. Redo replays the operations in order and
+undo replays the inverses in reverse, so undoing a node removal costs O(degree) and moving
+a node costs O(1), whatever the size of the graph. Bulk operations carry lists of nodes or
+edges, so adding a million edges is one step rather than a million. Entries recorded with
+the same coalesce key (e.g. the events of one drag) are merged into one entry until the log
+is sealed. The log is a bounded ring buffer: the oldest entries are dropped once there are
+more than `limit` of them or more than `max_operations` nodes and edges in total.
+
+Operations are tuples whose first item names the primitive; Graph._apply_operation runs them.
+"""
+import collections
+
+DEFAULT_LIMIT = 500  # Undo entries kept
+DEFAULT_MAX_OPERATIONS = 5_000_000  # Nodes and edges referenced across all entries, bounds the memory
+
+MISSING = None  # Value of an attribute that was not set; undoing its first assignment deletes it again
+
+# Operations that only change a value; a later one on the same target supersedes an earlier one
+ATTRIBUTE_OPERATIONS = frozenset(("node_attribute", "edge_attribute", "node_color"))
+
+
+class HistoryEntry:
+    __slots__ = ("label", "steps", "coalesce", "index", "size")
+
+    def __init__(self, label, steps, coalesce=None):
+        self.label = label
+        self.steps = list(steps)  # [(operation, inverse), ...]
+        self.coalesce = coalesce
+        self.size = sum(_size(operation) for operation, _ in self.steps)
+        self.index = None  # Target of each step -> position in steps, built when a first merge happens
+
+    def merge(self, steps):
+        """Folds later steps on the same targets into this entry, keeping the first inverse of each target"""
+        if self.index is None:
+            self.index = {_target(operation): i for i, (operation, _) in enumerate(self.steps)
+                          if operation[0] in ATTRIBUTE_OPERATIONS}
+        added = 0
+        for operation, inverse in steps:
+            target = _target(operation)
+            position = self.index.get(target)
+            if position is None:
+                self.index[target] = len(self.steps)
+                self.steps.append((operation, inverse))
+                added += 1
+            else:
+                self.steps[position] = (operation, self.steps[position][1])
+        self.size += added
+        return added
+
+
+def _size(operation):
+    """Number of nodes or edges an operation refers to; bulk operations carry a list or a mapping"""
+    return len(operation[1]) if isinstance(operation[1], (list, dict)) else 1
+
+
+def _target(operation):
+    """What an attribute operation changes, e.g. ('node_attribute', node, 'pos'); merges are keyed on it"""
+    return operation[:-1]
+
+
+class History:
+    def __init__(self, limit=DEFAULT_LIMIT, max_operations=DEFAULT_MAX_OPERATIONS):
+        self.limit = limit
+        self.max_operations = max_operations
+        self.undo_entries = collections.deque()
+        self.redo_entries = []
+        self.operations = 0  # Total size of undo_entries
+        self.sealed = True  # When True, the next coalescing record starts a new entry
+        self.suspended = 0  # Nesting depth of undo/redo replays, which must not be recorded
+        self._group = None  # Entry collecting the records of an open batch
+        self._group_depth = 0
+
+    def can_undo(self):
+        return bool(self.undo_entries)
+
+    def can_redo(self):
+        return bool(self.redo_entries)
+
+    def undo_label(self):
+        return self.undo_entries[-1].label if self.undo_entries else None
+
+    def redo_label(self):
+        return self.redo_entries[-1].label if self.redo_entries else None
+
+    def clear(self):
+        self.undo_entries.clear()
+        self.redo_entries.clear()
+        self.operations = 0
+        self.sealed = True
+
+    def seal(self):
+        """Ends coalescing: the next record opens a new entry even if its coalesce key matches"""
+        self.sealed = True
+
+    def adopt(self, coalesce):
+        """Lets the next records with this coalesce key merge into the latest entry (until the log is sealed).
+
+        Used for follow-up changes that belong to the edit before them, e.g. the automatic
+        layout of a node the user just added, so that one undo reverts both.
+        """
+        if self.undo_entries and self._group is None:
+            self.undo_entries[-1].coalesce = coalesce
+            self.sealed = False
+
+    def record(self, label, steps, coalesce=None):
+        """Adds the steps of one mutation; a new change makes the redo entries unreachable"""
+        if self.suspended or not steps:
+            return
+        self.redo_entries.clear()
+        if self._group is not None:
+            if not self._group.label:
+                self._group.label = label
+            self._group.steps.extend(steps)
+            self._group.size += sum(_size(operation) for operation, _ in steps)
+            return
+        last = self.undo_entries[-1] if self.undo_entries else None
+        if coalesce is not None and not self.sealed and last is not None and last.coalesce == coalesce:
+            self.operations += last.merge(steps)
+        else:
+            entry = HistoryEntry(label, steps, coalesce)
+            self.undo_entries.append(entry)
+            self.operations += entry.size
+            self.sealed = coalesce is None
+        self._trim()
+
+    def begin_group(self, label=None):
+        """Collects everything recorded until the matching end_group into one entry (used by Graph.batch)"""
+        self._group_depth += 1
+        if self._group_depth == 1:
+            self._group = HistoryEntry(label, [])
+
+    def end_group(self):
+        self._group_depth -= 1
+        if self._group_depth == 0:
+            group, self._group = self._group, None
+            if group.steps:
+                self.undo_entries.append(group)
+                self.operations += group.size
+                self.sealed = True
+                self._trim()
+
+    def pop_undo(self):
+        entry = self.undo_entries.pop()
+        self.operations -= entry.size
+        self.redo_entries.append(entry)
+        self.sealed = True
+        return entry
+
+    def pop_redo(self):
+        entry = self.redo_entries.pop()
+        self.undo_entries.append(entry)
+        self.operations += entry.size
+        self.sealed = True
+        return entry
+
+    def _trim(self):
+        while len(self.undo_entries) > 1 and (len(self.undo_entries) > self.limit
+                                              or self.operations > self.max_operations):
+            self.operations -= self.undo_entries.popleft().size
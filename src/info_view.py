@@ -0,0 +1,169 @@
+import bisect
+import itertools
+import tkinter as tk
+
+ROW_HEIGHT = 18
+READ_AHEAD = 200  # Items fetched past the visible rows, so that small scrolls do not touch the iterator
+FILTER_FIELDS = ("name", "color", "shape")
+
+
+class RowSource:
+    """Items read from an iterator only as far as the view has scrolled; formatted only when shown"""
+
+    def __init__(self, total, iterate, format_row):
+        self.total = total
+        self.iterate = iterate  # iterate(start) -> iterator over the items from position start on
+        self.format_row = format_row
+        self._iterator = None
+        self._position = 0  # Position of the next item the iterator will yield
+        self._block_start = 0
+        self._block = []
+
+    @staticmethod
+    def from_sequence(items, format_row):
+        return RowSource(len(items), lambda start: (items[i] for i in range(start, len(items))), format_row)
+
+    def rows(self, start, count):
+        """Returns the formatted rows start .. start + count - 1"""
+        end = min(start + count, self.total)
+        if not (self._block_start <= start and end <= self._block_start + len(self._block)):
+            if self._iterator is None or start < self._position:
+                self._iterator, self._position = self.iterate(start), start
+            skip = start - self._position
+            self._block = list(itertools.islice(self._iterator, skip, skip + count + READ_AHEAD))
+            self._block_start = start
+            self._position = start + len(self._block)
+        offset = start - self._block_start
+        return [self.format_row(item) for item in self._block[offset:offset + end - start]]
+
+
+class NodeIndex:
+    """Sorted node names plus colour and shape buckets, so filters never scan every node"""
+
+    def __init__(self, nodes):
+        ordered = sorted(nodes, key=str)
+        self.nodes = ordered
+        self.keys = [str(node) for node in ordered]
+        self.buckets = {"color": {}, "shape": {}}
+        for node in ordered:
+            attributes = nodes[node]
+            for field, bucket in self.buckets.items():
+                bucket.setdefault(attributes.get(field, "undefined"), []).append(node)
+
+    def match(self, field, text):
+        """Returns the nodes whose name starts with text, or whose colour or shape equals it"""
+        if field == "name":
+            low = bisect.bisect_left(self.keys, text)
+            high = bisect.bisect_left(self.keys, text + "\uffff")
+            return self.nodes[low:high]
+        return self.buckets[field].get(text, [])
+
+
+class InfoView:
+    """Window listing graph sections (nodes, edges); only the rows that fit on screen are formatted and drawn.
+
+    sections maps a section title to a RowSource. With an index, a filter bar is shown and
+    filter_sections(nodes) must return the sections restricted to the matching nodes.
+    """
+
+    def __init__(self, parent, title, summary, sections, index=None, filter_sections=None):
+        self.all_sections = sections
+        self.sections = sections
+        self.section = next(iter(sections))
+        self.first_row = 0
+        self.index = index
+        self.filter_sections = filter_sections
+
+        self.window = tk.Toplevel(parent)
+        self.window.title(title)
+        self.summary = tk.Label(self.window, anchor="w", text=summary)
+        self.summary.grid(row=0, column=0, columnspan=2, sticky="ew")
+
+        self.canvas = tk.Canvas(self.window, width=640, height=420, bg="white")
+        self.scrollbar = tk.Scrollbar(self.window, orient=tk.VERTICAL, command=self.on_scroll)
+        self.canvas.grid(row=1, column=0, sticky="nsew")
+        self.scrollbar.grid(row=1, column=1, sticky="ns")
+        self.window.grid_rowconfigure(1, weight=1)
+        self.window.grid_columnconfigure(0, weight=1)
+
+        self.controls = tk.Frame(self.window)
+        self.controls.grid(row=2, column=0, columnspan=2, sticky="ew")
+        for name in sections:
+            tk.Button(self.controls, text=name, command=lambda name=name: self.show_section(name)).pack(side=tk.LEFT)
+        if index is not None:
+            self.filter_field = tk.StringVar(value=FILTER_FIELDS[0])
+            self.filter_text = tk.StringVar()
+            tk.OptionMenu(self.controls, self.filter_field, *FILTER_FIELDS).pack(side=tk.LEFT, padx=(10, 0))
+            entry = tk.Entry(self.controls, textvariable=self.filter_text, width=16)
+            entry.pack(side=tk.LEFT)
+            entry.bind("<Return>", lambda _: self.apply_filter())
+            tk.Button(self.controls, text="Filter", command=self.apply_filter).pack(side=tk.LEFT)
+            tk.Button(self.controls, text="Clear", command=self.clear_filter).pack(side=tk.LEFT)
+        self.position_label = tk.Label(self.controls)
+        self.position_label.pack(side=tk.LEFT, padx=10)
+
+        self.canvas.bind("<Configure>", lambda _: self.render())
+        self.canvas.bind("<MouseWheel>", self.on_mouse_wheel)
+        self.canvas.bind("<Button-4>", lambda _: self.scroll_rows(-3))  # Mouse wheel on X11
+        self.canvas.bind("<Button-5>", lambda _: self.scroll_rows(3))
+
+    def add_button(self, text, command):
+        tk.Button(self.controls, text=text, command=command).pack(side=tk.RIGHT)
+
+    def source(self):
+        return self.sections[self.section]
+
+    def show_section(self, name):
+        self.section = name
+        self.first_row = 0
+        self.render()
+
+    def apply_filter(self):
+        text = self.filter_text.get().strip()
+        if not text:
+            self.clear_filter()
+            return
+        self.sections = self.filter_sections(self.index.match(self.filter_field.get(), text))
+        self.show_section(self.section)
+
+    def clear_filter(self):
+        self.sections = self.all_sections
+        self.show_section(self.section)
+
+    def visible_rows(self):
+        return max(1, self.canvas.winfo_height() // ROW_HEIGHT)
+
+    def on_scroll(self, *args):
+        """Translates Scrollbar commands ('moveto' / 'scroll') into a new first row"""
+        total, visible = self.source().total, self.visible_rows()
+        first = self.first_row
+        if args[0] == "moveto":
+            first = int(float(args[1]) * total)
+        elif args[0] == "scroll":
+            step = visible - 1 if args[2] == "pages" else 1
+            first += int(args[1]) * max(1, step)
+        self.first_row = max(0, min(first, total - visible))
+        self.render()
+
+    def on_mouse_wheel(self, event):
+        self.scroll_rows(-1 if event.delta > 0 else 1)
+
+    def scroll_rows(self, rows):
+        self.on_scroll("scroll", rows, "units")
+
+    def render(self):
+        """Redraws the visible rows of the current section"""
+        self.canvas.delete("all")
+        source = self.source()
+        rows = source.rows(self.first_row, self.visible_rows())
+        for offset, text in enumerate(rows):
+            self.canvas.create_text(4, offset * ROW_HEIGHT + ROW_HEIGHT / 2, anchor="w", text=text,
+                                    font=("TkFixedFont", 9))
+
+        last_row = self.first_row + len(rows)
+        self.position_label.config(text=f"{self.section} {self.first_row + 1 if rows else 0}-{last_row} "
+                                        f"of {source.total}")
+        if source.total:
+            self.scrollbar.set(self.first_row / source.total, last_row / source.total)
+        else:
+            self.scrollbar.set(0, 1)
@@ -0,0 +1,271 @@
+"""Opt-in instrumentation: call timings and counters, redraw frame-time histograms, peak memory and cProfile captures.
+
+Everything is off by default, and then Graph costs nothing extra: enable() puts timing
+wrappers on the Graph class and disable() puts the plain methods back. GUI handlers
+(trace_handlers) and background jobs (JobScheduler) are wrapped for good, because Tk keeps
+the bound methods it was given; while disabled their wrapper is one flag test per event.
+
+Switch it on from the GUI's Profiling menu or with environment variables::
+
+    GRAPH_EDITOR_INSTRUMENT=1         timings and counters, printed at exit
+    GRAPH_EDITOR_INSTRUMENT=memory    the same plus the peak memory of analyses (tracemalloc, slower)
+    GRAPH_EDITOR_PROFILE=run.prof     cProfile capture of the whole session, written at exit
+
+Captures are pstats files, readable with ``python -m pstats``, snakeviz or gprof2dot.
+cProfile only sees the thread it runs in, so a capture covers the Tk thread plus every
+background job that finishes while it is running.
+"""
+import atexit
+import bisect
+import cProfile
+import functools
+import inspect
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+
+FRAME_BUCKETS_MS = (1, 2, 4, 8, 16, 33, 66, 125, 250, 500, 1000)  # Histogram upper bounds, plus one bucket above
+FRAME_HANDLERS = frozenset(("draw_graph", "on_mouse_drag", "show_layout_frame", "refresh_after_history"))
+# Graph methods whose peak memory is measured while memory tracing is on; background jobs always are
+ANALYSES = frozenset(("radius_and_diameter", "center", "eccentricities", "find_hamiltonian_cycles", "tensor_product",
+                      "cartesian_product", "make_connected", "check_connectivity", "layout", "adjacency_matrix",
+                      "sparse_adjacency_matrix"))
+
+
+class CallStats:
+    __slots__ = ("calls", "total", "max", "histogram", "peak_memory")
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.histogram = [0] * (len(FRAME_BUCKETS_MS) + 1)
+        self.peak_memory = None  # Bytes allocated at the peak of the largest measured call
+
+    def add(self, seconds, peak_memory=None):
+        self.calls += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.histogram[bisect.bisect_left(FRAME_BUCKETS_MS, seconds * 1000)] += 1
+        if peak_memory is not None:
+            self.peak_memory = max(self.peak_memory or 0, peak_memory)
+
+    def as_dict(self):
+        labels = [f"<={bound}ms" for bound in FRAME_BUCKETS_MS] + [f">{FRAME_BUCKETS_MS[-1]}ms"]
+        return {"calls": self.calls, "total": self.total, "mean": self.total / self.calls, "max": self.max,
+                "peak_memory": self.peak_memory, "histogram": dict(zip(labels, self.histogram))}
+
+
+enabled = False
+stats = {}  # "Graph.add_node", "GraphEditorGUI.draw_graph", "job:Layout", ... -> CallStats
+_lock = threading.Lock()  # Jobs record from worker threads
+_memory = False  # Whether enable() started tracemalloc
+_measuring_memory = False  # tracemalloc peaks are process-wide, so one measurement runs at a time
+_originals = {}  # Graph attribute -> plain method, while enable() has wrapped it
+_profile = None  # cProfile.Profile of the Tk thread during a capture
+_worker_profiles = []  # Profiles of the background jobs that finished during the capture
+_enabled_by_profile = False  # Whether start_profile switched the timings on, so stop_profile switches them off
+
+
+def _start_memory():
+    """Returns the traced size at the start of a measurement, or None if another one is running"""
+    global _measuring_memory
+    with _lock:
+        if _measuring_memory or not tracemalloc.is_tracing():
+            return None
+        _measuring_memory = True
+    tracemalloc.reset_peak()
+    return tracemalloc.get_traced_memory()[0]
+
+
+def _stop_memory(baseline):
+    global _measuring_memory
+    peak = tracemalloc.get_traced_memory()[1] - baseline
+    _measuring_memory = False
+    return peak
+
+
+def _measure(name, function, args, kwargs, memory=False):
+    baseline = _start_memory() if memory and _memory else None
+    start = time.perf_counter()
+    try:
+        return function(*args, **kwargs)
+    finally:
+        seconds = time.perf_counter() - start
+        peak = _stop_memory(baseline) if baseline is not None else None
+        with _lock:
+            record = stats.get(name)
+            if record is None:
+                record = stats[name] = CallStats()
+            record.add(seconds, peak)
+
+
+def _timed(name, function, memory):
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        return _measure(name, function, args, kwargs, memory)
+    return wrapper
+
+
+def trace_handlers(cls, exclude=()):
+    """Wraps the public methods of a GUI class so they are timed while instrumentation is enabled"""
+    def handler(name, function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return function(*args, **kwargs)
+            return _measure(name, function, args, kwargs)
+        return wrapper
+
+    for name, member in list(vars(cls).items()):
+        if inspect.isfunction(member) and not name.startswith("_") and name not in exclude:
+            setattr(cls, name, handler(f"{cls.__name__}.{name}", member))
+
+
+def job(name, function):
+    """Wraps a background job so it is timed, memory-measured and profiled while instrumentation is enabled"""
+    @functools.wraps(function)
+    def wrapper(*args):
+        if not enabled:
+            return function(*args)
+        profile = None
+        if _profile is not None:
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:  # Python 3.12+ allows one profiler per process; the job is then only timed
+                profile = None
+        try:
+            return _measure(f"job:{name}", function, args, {}, memory=True)
+        finally:
+            if profile is not None:
+                profile.disable()
+                with _lock:
+                    if _profile is not None:
+                        _worker_profiles.append(profile)
+    return wrapper
+
+
+def enable(memory=False):
+    """Starts collecting timings of every public Graph method, and the peak memory of analyses with memory"""
+    global enabled, _memory
+    from src.graph_logic import Graph
+    if not _originals:
+        for name, member in list(vars(Graph).items()):
+            if name.startswith("_"):
+                continue
+            if isinstance(member, staticmethod):
+                wrapped = staticmethod(_timed(f"Graph.{name}", member.__func__, name in ANALYSES))
+            elif inspect.isfunction(member):
+                wrapped = _timed(f"Graph.{name}", member, name in ANALYSES)
+            else:
+                continue  # Properties
+            _originals[name] = member
+            setattr(Graph, name, wrapped)
+    if memory and not _memory:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _memory = True
+    elif not memory and _memory:
+        tracemalloc.stop()
+        _memory = False
+    enabled = True
+
+
+def disable():
+    """Stops collecting and restores the plain Graph methods; the collected stats are kept"""
+    global enabled, _memory
+    from src.graph_logic import Graph
+    for name, member in _originals.items():
+        setattr(Graph, name, member)
+    _originals.clear()
+    if _memory:
+        tracemalloc.stop()
+        _memory = False
+    enabled = False
+
+
+def memory_enabled():
+    return _memory
+
+
+def reset():
+    with _lock:
+        stats.clear()
+
+
+def profiling():
+    return _profile is not None
+
+
+def start_profile():
+    """Starts a cProfile capture of the Tk thread and of the background jobs; timings are collected meanwhile"""
+    global _profile, _enabled_by_profile
+    if _profile is not None:
+        return
+    _enabled_by_profile = not enabled
+    if not enabled:
+        enable()
+    _worker_profiles.clear()
+    _profile = cProfile.Profile()
+    _profile.enable()
+
+
+def stop_profile(filename=None):
+    """Ends the capture and writes it as a pstats file (discarded without a filename)"""
+    global _profile
+    if _profile is None:
+        return
+    _profile.disable()
+    with _lock:
+        profiles, _profile = [_profile] + _worker_profiles, None
+        _worker_profiles.clear()
+    if _enabled_by_profile:
+        disable()
+    if filename:
+        combined = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            combined.add(profile)
+        combined.dump_stats(filename)
+        print(f"Profile written to {filename}")
+
+
+def report():
+    """Returns a text table of the collected timings, slowest first, with the frame-time histograms"""
+    with _lock:
+        records = sorted(stats.items(), key=lambda item: item[1].total, reverse=True)
+    if not records:
+        return "No calls recorded."
+    lines = [f"{'call':<45} {'calls':>8} {'total ms':>10} {'mean ms':>9} {'max ms':>9} {'peak MiB':>9}"]
+    for name, record in records:
+        peak = f"{record.peak_memory / 2 ** 20:.1f}" if record.peak_memory is not None else ""
+        lines.append(f"{name:<45} {record.calls:>8} {record.total * 1000:>10.1f} "
+                     f"{record.total / record.calls * 1000:>9.2f} {record.max * 1000:>9.2f} {peak:>9}")
+    for name, record in records:
+        if name.rsplit(".", 1)[-1] in FRAME_HANDLERS:
+            buckets = ", ".join(f"{label} {count}" for label, count in record.as_dict()["histogram"].items() if count)
+            lines.append(f"Frame times of {name}: {buckets}")
+    return "\n".join(lines)
+
+
+def write_report(filename):
+    """Writes the collected timings as JSON"""
+    with _lock:
+        data = {name: record.as_dict() for name, record in stats.items()}
+    with open(filename, "w", encoding="utf-8") as file:
+        json.dump(data, file, indent=1)
+
+
+def configure_from_environment():
+    """Applies GRAPH_EDITOR_INSTRUMENT and GRAPH_EDITOR_PROFILE (see the module docstring)"""
+    mode = os.environ.get("GRAPH_EDITOR_INSTRUMENT")
+    if mode:
+        enable(memory=mode == "memory")
+        atexit.register(lambda: print(report()))
+    profile_file = os.environ.get("GRAPH_EDITOR_PROFILE")
+    if profile_file:
+        start_profile()
+        atexit.register(stop_profile, profile_file)
@@ -0,0 +1,101 @@
+"""Background execution of long graph analyses for the Tk GUI.
+
+Analyses run on a worker thread against a snapshot of the graph. Tk is not thread-safe,
+so results, errors and progress are picked up on the main thread by polling with
+`root.after`; the worker never touches a widget.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src import instrumentation
+
+POLL_INTERVAL_MS = 100
+
+
+class JobCancelled(Exception):
+    """Raised inside a job once cancellation has been requested"""
+
+
+class Job:
+    """Handle given to a running analysis for progress reports and cancellation checks"""
+
+    def __init__(self, name):
+        self.name = name
+        self.message = "running"
+        self._cancel_event = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    def check(self):
+        """Raises JobCancelled if the job has been cancelled"""
+        if self._cancel_event.is_set():
+            raise JobCancelled(f"{self.name} was cancelled")
+
+    def report(self, message):
+        """Publishes a progress message and doubles as a cancellation point"""
+        self.message = message
+        self.check()
+
+
+class JobScheduler:
+    def __init__(self, root, max_workers=2, on_status=None):
+        self.root = root
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="graph-job")
+        self.on_status = on_status  # Called with a text describing the running jobs
+        self.running = {}  # name -> (job, future, on_done, on_error)
+        self._polling = False
+
+    def is_running(self, name):
+        return name in self.running
+
+    def submit(self, name, function, *args, on_done, on_error=None):
+        """Runs function(job, *args) in the background; returns False if a job with this name is already running"""
+        if name in self.running:
+            return False
+        job = Job(name)
+        future = self.executor.submit(instrumentation.job(name, function), job, *args)
+        self.running[name] = (job, future, on_done, on_error)
+        if not self._polling:
+            self._polling = True
+            self.root.after(POLL_INTERVAL_MS, self._poll)
+        self._update_status()
+        return True
+
+    def cancel(self, name=None):
+        """Requests cancellation of one job, or of every running job"""
+        for job_name, (job, _, _, _) in self.running.items():
+            if name is None or job_name == name:
+                job.cancel()
+
+    def shutdown(self):
+        self.cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _poll(self):
+        for name, (job, future, on_done, on_error) in list(self.running.items()):
+            if not future.done():
+                continue
+            del self.running[name]
+            error = future.exception()
+            if isinstance(error, JobCancelled):
+                continue
+            if error is not None:
+                if on_error is not None:
+                    on_error(error)
+            else:
+                on_done(future.result())
+
+        self._update_status()
+        if self.running:
+            self.root.after(POLL_INTERVAL_MS, self._poll)
+        else:
+            self._polling = False
+
+    def _update_status(self):
+        if self.on_status is not None:
+            self.on_status(", ".join(f"{name}: {job.message}" for name, (job, _, _, _) in self.running.items()))
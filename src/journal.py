@@ -0,0 +1,213 @@
+"""Crash-safe incremental saves: a snapshot file plus an append-only journal of the changes made since.
+
+Graph mutations reach the journal as the operations the undo log records (src/history.py).
+Journal.save appends the operations made since the previous save as one checksummed,
+fsynced line, so a save costs as much as the edits since the last one. Once the journal
+passes compact_bytes, a background thread folds it into a new snapshot: it loads the old
+snapshot, replays the journal onto it and writes the result over the old snapshot.
+
+For a graph saved as graph.bin the files are::
+
+    graph.bin                columnar snapshot (src/graph_format.py) tagged with a generation
+    graph.bin.journal        header line naming the generation it applies to, then one line per save
+    graph.bin.journal.next   journal for the next generation, written to while a compaction runs
+
+Every file is replaced by an atomic rename and a journal only applies to the snapshot of
+its generation, so after a crash at any point loading gives the state of the last
+completed save. A torn or corrupt last line is ignored.
+"""
+import contextlib
+import json
+import os
+import threading
+import zlib
+
+from src.graph_format import atomic_open, write_graph
+from src.history import ATTRIBUTE_OPERATIONS
+
+JOURNAL_FORMAT = 1
+DEFAULT_COMPACT_BYTES = 8 * 1024 * 1024  # Journal size that triggers a background compaction
+MAX_GENERATION = 0xFFFF  # Generations are stored in a 16-bit header field; 0 marks a plain save
+
+
+def journal_path(path):
+    return f"{path}.journal"
+
+
+def next_journal_path(path):
+    return f"{path}.journal.next"
+
+
+def next_generation(generation):
+    return generation % MAX_GENERATION + 1
+
+
+def _encode(record):
+    data = json.dumps(record, separators=(",", ":")).encode("utf-8")
+    return b"%08x %s\n" % (zlib.crc32(data), data)
+
+
+def read_journal(filename, header_only=False):
+    """Returns (generation, records, valid_bytes) for a journal file; generation is None if there is none.
+
+    Every record is the list of operations of one save. Reading stops at the first torn or
+    corrupt line (or after the header with header_only); valid_bytes is the length read.
+    """
+    try:
+        file = open(filename, "rb")
+    except FileNotFoundError:
+        return None, [], 0
+    generation, records, valid_bytes = None, [], 0
+    with file:
+        for line in file:
+            checksum, _, data = line.rstrip(b"\n").partition(b" ")
+            try:
+                if not line.endswith(b"\n") or int(checksum, 16) != zlib.crc32(data):
+                    break
+                record = json.loads(data)
+            except ValueError:
+                break
+            if generation is None:
+                if not isinstance(record, dict) or record.get("journal") != JOURNAL_FORMAT:
+                    break
+                generation = record["generation"]
+                if header_only:
+                    break
+            else:
+                records.append(record)
+            valid_bytes += len(line)
+    return generation, records, valid_bytes
+
+
+def replay_journals(graph, path, generation):
+    """Applies the journals of the snapshot at path, loaded into graph with its generation.
+
+    Returns the length of the journal a Journal can keep appending to, or None when the
+    files need a fresh snapshot first (a plain save, or a compaction that did not finish).
+    """
+    if not generation:
+        return None
+    journal_generation, records, valid_bytes = read_journal(journal_path(path))
+    next_generation_found, next_records, _ = read_journal(next_journal_path(path))
+    if journal_generation == generation:
+        if next_generation_found == next_generation(generation):
+            records = records + next_records  # Crashed during a compaction: the old snapshot is still current
+            valid_bytes = None
+    elif next_generation_found == generation:
+        records, valid_bytes = next_records, None  # Crashed between the renames that end a compaction
+    else:
+        return None
+    graph._replay(operation for record in records for operation in record)
+    return valid_bytes
+
+
+class Journal:
+    """Records the operations made on a Graph and appends them to the journal of its file on save"""
+
+    def __init__(self, graph, path, generation=None, journal_bytes=None, compact_bytes=DEFAULT_COMPACT_BYTES):
+        self.graph = graph
+        self.path = path
+        # Generation of the snapshot on disk the journal applies to; None makes the next save write one
+        self.generation = generation if journal_bytes is not None else None
+        self.journal_bytes = journal_bytes or 0  # Size of the journal file saves append to
+        self.compact_bytes = compact_bytes
+        self.pending = []  # Operations made since the last save
+        self._attributes = {}  # Target -> position in pending, for attribute operations since the last structural one
+        self._lock = threading.Lock()  # Serialises appends with the renames that end a compaction
+        self._writing = journal_path(path)  # The journal saves append to
+        self._compaction = None  # Thread folding the journal into a new snapshot
+        self._error = None  # Exception of a failed compaction
+        if self.generation is not None and os.path.getsize(self._writing) > self.journal_bytes:
+            os.truncate(self._writing, self.journal_bytes)  # Drop a torn line left by a crash
+
+    def record(self, operations):
+        """Queues operations for the next save; a repeated attribute change replaces the queued one"""
+        for operation in operations:
+            if operation[0] in ATTRIBUTE_OPERATIONS:
+                target = operation[:-1]
+                position = self._attributes.get(target)
+                if position is not None:
+                    self.pending[position] = operation
+                    continue
+                self._attributes[target] = len(self.pending)
+            else:
+                self._attributes.clear()  # Structural operations may rename or remove the targets
+            self.pending.append(operation)
+
+    def save(self):
+        """Appends the pending operations to the journal, or writes a full snapshot if there is none yet"""
+        if self._error is not None:
+            error, self._error = self._error, None
+            print(f"Journal compaction failed ({error}); writing a full snapshot instead")
+            self.generation = None
+        if self.generation is None:
+            self.checkpoint()
+            return
+        if self.pending:
+            line = _encode(self.pending)
+            with self._lock, open(self._writing, "ab") as file:
+                file.write(line)
+                file.flush()
+                os.fsync(file.fileno())
+                self.journal_bytes += len(line)
+            self.pending, self._attributes = [], {}
+        if self.journal_bytes > self.compact_bytes and self._compaction is None:
+            self._start_compaction()
+
+    def checkpoint(self):
+        """Writes the whole graph as a new snapshot with an empty journal"""
+        self.wait()
+        # The new generation must not match a journal left on disk, or a crash between the renames could apply it
+        stale = (read_journal(journal_path(self.path), header_only=True)[0],
+                 read_journal(next_journal_path(self.path), header_only=True)[0])
+        generation = next_generation(self.generation or 0)
+        while generation in stale or next_generation(generation) == stale[1]:
+            generation = next_generation(generation)
+        write_graph(self.graph, self.path, generation)
+        header = _encode({"journal": JOURNAL_FORMAT, "generation": generation})
+        with atomic_open(journal_path(self.path)) as file:
+            file.write(header)
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(next_journal_path(self.path))
+        self.generation, self.journal_bytes, self._writing = generation, len(header), journal_path(self.path)
+        self.pending, self._attributes = [], {}
+
+    def wait(self):
+        """Blocks until a running compaction has finished"""
+        compaction = self._compaction
+        if compaction is not None:
+            compaction.join()
+
+    def close(self):
+        self.wait()
+
+    def _start_compaction(self):
+        generation = next_generation(self.generation)
+        header = _encode({"journal": JOURNAL_FORMAT, "generation": generation})
+        with atomic_open(next_journal_path(self.path)) as file:
+            file.write(header)
+        # Later saves go to the next journal; the current one is frozen for the compaction to read
+        with self._lock:
+            self._writing, self.journal_bytes = next_journal_path(self.path), len(header)
+        self._compaction = threading.Thread(target=self._compact, args=(generation,), name="journal-compaction",
+                                            daemon=True)
+        self._compaction.start()
+
+    def _compact(self, generation):
+        """Worker thread: old snapshot + frozen journal -> snapshot of the next generation"""
+        try:
+            from src.graph_format import read_graph
+            from src.graph_logic import Graph
+            arrays = read_graph(self.path)
+            graph = arrays.fill(Graph(arrays.canvas_width, arrays.canvas_height))
+            _, records, _ = read_journal(journal_path(self.path))
+            graph._replay(operation for record in records for operation in record)
+            write_graph(graph, self.path, generation)
+            with self._lock:
+                os.replace(next_journal_path(self.path), journal_path(self.path))
+                self._writing = journal_path(self.path)
+                self.generation = generation
+        except Exception as error:
+            self._error = error  # Reported by the next save, which then writes a full snapshot
+        finally:
+            self._compaction = None
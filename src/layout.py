@@ -0,0 +1,230 @@
+"""Force-directed node placement (Fruchterman-Reingold) on NumPy arrays.
+
+Repulsion is split on a grid of square cells as wide as the ideal edge length. Nodes in
+the same or a neighbouring cell repel each other exactly; those pairs are found for all
+nodes at once by sorting the nodes by cell and reading the ranges of the neighbouring
+cells from a prefix sum of the cell counts. Everything further away is approximated by
+the node counts per cell, convolved with the force kernel through an FFT. An iteration
+costs O(nodes + edges + cells log cells) instead of O(nodes^2).
+"""
+import itertools
+
+import numpy as np
+from scipy import fft
+
+FULL_ITERATIONS = 100
+INCREMENTAL_ITERATIONS = 40
+IDEAL_DISTANCE_SCALE = 0.8  # Ideal edge length as a fraction of sqrt(canvas area / nodes)
+FULL_TEMPERATURE = 0.1  # Largest step of the first iteration, as a fraction of the canvas width
+INCREMENTAL_TEMPERATURE = 2.0  # Largest first step of an incremental layout, in ideal edge lengths
+MIN_TEMPERATURE = 0.05  # Largest step of the last iterations, in ideal edge lengths
+MARGIN = 20  # Distance kept between the nodes and the canvas border
+MIN_DISTANCE = 0.01  # Coincident nodes are pushed apart as if they were this far away
+GRAVITY = np.pi  # Pull to the centre per unit of distance; balances the far-field repulsion of one node per k^2
+MAX_GRID = 1024  # Cells per axis; beyond this (nodes dragged far off the canvas) the cells grow instead
+
+_runs = itertools.count()  # Source of ForceLayout.run_id
+
+_CELL_OFFSETS = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)]
+
+
+def _cells(positions, cell_size):
+    """Returns the cell of every node and the grid shape, with an empty border row and column on each side"""
+    low = positions.min(axis=0)
+    cell_size = max(cell_size, float((positions.max(axis=0) - low).max()) / MAX_GRID)
+    cells = ((positions - low) // cell_size).astype(np.int64) + 1
+    return cells, tuple(cells.max(axis=0) + 2), cell_size
+
+
+def _neighbour_pairs(cells, shape, rows=None):
+    """Returns (i, j) index arrays of all ordered pairs i != j whose cells touch, i restricted to rows if given"""
+    stride = shape[1]
+    keys = cells[:, 0] * stride + cells[:, 1]
+    order = np.argsort(keys, kind="stable")
+    # Nodes of cell c are order[cell_start[c]:cell_start[c + 1]]; the border cells keep every lookup in range
+    cell_start = np.zeros(shape[0] * stride + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys, minlength=shape[0] * stride), out=cell_start[1:])
+
+    rows = np.arange(len(keys)) if rows is None else rows
+    firsts, seconds = [], []
+    for dx, dy in _CELL_OFFSETS:
+        wanted = keys[rows] + dx * stride + dy
+        start = cell_start[wanted]
+        counts = cell_start[wanted + 1] - start
+        total = int(counts.sum())
+        if not total:
+            continue
+        # For node i, enumerate order[start[i]:start[i] + counts[i]] without a Python loop
+        within = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        firsts.append(np.repeat(rows, counts))
+        seconds.append(order[np.repeat(start, counts) + within])
+    if not firsts:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    first, second = np.concatenate(firsts), np.concatenate(seconds)
+    distinct = first != second
+    return first[distinct], second[distinct]
+
+
+def _far_repulsion(cells, shape, cell_size, k):
+    """Repulsion on every node from the nodes more than one cell away, treated as sitting at their cell centre"""
+    rows, columns = shape
+    counts = np.bincount(cells[:, 0] * columns + cells[:, 1], minlength=rows * columns).reshape(shape)
+    dx = np.arange(-(rows - 1), rows, dtype=float)[:, None]
+    dy = np.arange(-(columns - 1), columns, dtype=float)[None, :]
+    squared = dx ** 2 + dy ** 2
+    squared[(np.abs(dx) <= 1) & (np.abs(dy) <= 1)] = np.inf  # Neighbouring cells are handled exactly
+    scale = k * k / (cell_size * squared)  # (offset * cell_size) * k^2 / distance^2
+    kernels = np.stack([dx * scale, dy * scale])
+    # Kernel index m stands for offset m - (size - 1), so the field of cell c lands at c + size - 1;
+    # transforms of at least 2 * size - 1 keep that window free of wrap-around
+    shape_fft = (fft.next_fast_len(2 * rows - 1, real=True), fft.next_fast_len(2 * columns - 1, real=True))
+    spectrum = fft.rfft2(counts.astype(float), shape_fft)[None] * fft.rfft2(kernels, shape_fft)
+    fields = fft.irfft2(spectrum, shape_fft)[:, rows - 1:2 * rows - 1, columns - 1:2 * columns - 1]
+    return fields[:, cells[:, 0], cells[:, 1]].T
+
+
+class ForceLayout:
+    """One force-directed layout run over fixed node and edge arrays.
+
+    positions is an (n, 2) array with NaN rows for nodes that have no position yet; those
+    start next to the mean of their placed neighbours, or at a random spot. Only the rows
+    in movable (a boolean mask, all nodes by default) are changed; the other nodes still
+    attract and repel. A full layout runs in free space and is scaled to the canvas; an
+    incremental one keeps the fixed nodes where they are and only uses the forces from the
+    neighbouring cells. `frame` always holds a copy of the latest canvas positions, so
+    another thread can show the layout while it runs. nodes optionally names the rows for the caller.
+    """
+
+    def __init__(self, positions, sources, targets, width, height, movable=None, iterations=None, seed=0,
+                 nodes=None):
+        n = len(positions)
+        self.run_id = next(_runs)  # Unique per run, never reused; e.g. the undo coalesce key of its frames
+        self.nodes = nodes
+        self.width = width
+        self.height = height
+        self.rng = np.random.default_rng(seed)
+        self.movable = np.ones(n, dtype=bool) if movable is None else np.asarray(movable, dtype=bool)
+        self.incremental = incremental = movable is not None
+        self.centre = np.array([width / 2, height / 2], dtype=float)
+        self.iterations = iterations or (INCREMENTAL_ITERATIONS if incremental else FULL_ITERATIONS)
+        self.iteration = 0
+
+        # One attraction per connected pair, whatever the direction or mirroring of the edges
+        sources, targets = np.asarray(sources, dtype=np.int64), np.asarray(targets, dtype=np.int64)
+        low, high = np.minimum(sources, targets), np.maximum(sources, targets)
+        pairs = np.unique(low[low != high] * n + high[low != high])
+        self.sources, self.targets = np.divmod(pairs, max(n, 1))
+
+        area = max(width - 2 * MARGIN, 1) * max(height - 2 * MARGIN, 1)
+        self.k = IDEAL_DISTANCE_SCALE * np.sqrt(area / max(n, 1))
+        self.positions = self._seed(np.array(positions, dtype=float).reshape(-1, 2))
+        self.moving_rows = None
+        if incremental:
+            # Forces on the fixed nodes are never used, so skip them
+            self.moving_rows = np.flatnonzero(self.movable)
+            touching = self.movable[self.sources] | self.movable[self.targets]
+            self.sources, self.targets = self.sources[touching], self.targets[touching]
+        start = INCREMENTAL_TEMPERATURE * self.k if incremental else FULL_TEMPERATURE * width
+        self.temperature = start
+        self.cooling = max(start - MIN_TEMPERATURE * self.k, 0) / self.iterations
+        self.frame = self.positions.copy()
+
+    @property
+    def done(self):
+        return self.iteration >= self.iterations
+
+    def _random_points(self, count):
+        low = np.array([MARGIN, MARGIN], dtype=float)
+        high = np.maximum(np.array([self.width - MARGIN, self.height - MARGIN], dtype=float), low)
+        return low + self.rng.random((count, 2)) * (high - low)
+
+    def _seed(self, positions):
+        """Fills the NaN rows: next to the placed neighbours if there are any, else anywhere"""
+        missing = np.isnan(positions).any(axis=1)
+        if not missing.any():
+            return positions
+        placed = ~missing
+        # Sum the placed neighbour positions of every missing node, both edge directions at once
+        ends = np.concatenate([self.sources, self.targets])
+        others = np.concatenate([self.targets, self.sources])
+        useful = missing[ends] & placed[others]
+        ends, others = ends[useful], others[useful]
+        n = len(positions)
+        counts = np.bincount(ends, minlength=n)
+        sums = np.stack([np.bincount(ends, weights=positions[others, axis], minlength=n) for axis in (0, 1)], axis=1)
+
+        attached = missing & (counts > 0)
+        jitter = (self.rng.random((int(attached.sum()), 2)) - 0.5) * self.k
+        positions[attached] = sums[attached] / counts[attached, None] + jitter
+        loose = missing & ~attached
+        positions[loose] = self._random_points(int(loose.sum()))
+        return positions
+
+    def step(self):
+        """Runs one iteration; returns False once the layout has finished"""
+        if self.done:
+            return False
+        positions, k = self.positions, self.k
+        n = len(positions)
+        if n == 0:
+            self.iteration = self.iterations
+            return False
+
+        # Repulsion k^2 / d: exact from the neighbouring cells, through the cell counts beyond
+        cells, shape, cell_size = _cells(positions, k)
+        if self.incremental:
+            displacement = np.zeros((n, 2))  # Only the neighbourhood of the moving nodes matters
+        else:
+            # The far field pushes outwards; a linear pull to the centre balances it at one node per k^2
+            displacement = _far_repulsion(cells, shape, cell_size, k)
+            displacement -= GRAVITY * (positions - self.centre)
+        first, second = _neighbour_pairs(cells, shape, self.moving_rows)
+        delta = positions[first] - positions[second]
+        squared = (delta ** 2).sum(axis=1)
+        coincident = squared < MIN_DISTANCE ** 2
+        if coincident.any():
+            delta[coincident] = (self.rng.random((int(coincident.sum()), 2)) - 0.5) * MIN_DISTANCE
+            squared[coincident] = MIN_DISTANCE ** 2
+        push = delta * (k * k / squared)[:, None]
+        for axis in (0, 1):
+            displacement[:, axis] += np.bincount(first, weights=push[:, axis], minlength=n)
+
+        # Attraction d^2 / k along every edge
+        delta = positions[self.sources] - positions[self.targets]
+        pull = delta * (np.sqrt((delta ** 2).sum(axis=1)) / k)[:, None]
+        for axis in (0, 1):
+            displacement[:, axis] -= np.bincount(self.sources, weights=pull[:, axis], minlength=n)
+            displacement[:, axis] += np.bincount(self.targets, weights=pull[:, axis], minlength=n)
+
+        # Move at most `temperature` per iteration
+        length = np.maximum(np.sqrt((displacement ** 2).sum(axis=1)), 1e-12)
+        step = displacement * (np.minimum(length, self.temperature) / length)[:, None]
+        if self.incremental:
+            moved = positions[self.movable] + step[self.movable]
+            positions[self.movable] = self._clamp(moved)
+        else:
+            positions += step
+
+        self.temperature = max(self.temperature - self.cooling, MIN_TEMPERATURE * k)
+        self.iteration += 1
+        self.frame = self._clamp(positions.copy()) if self.incremental else self._fit(positions)
+        return not self.done
+
+    def _clamp(self, positions):
+        positions[:, 0] = np.clip(positions[:, 0], MARGIN, max(self.width - MARGIN, MARGIN))
+        positions[:, 1] = np.clip(positions[:, 1], MARGIN, max(self.height - MARGIN, MARGIN))
+        return positions
+
+    def _fit(self, positions):
+        """Returns the positions scaled, per axis, to fill the canvas inside the margin"""
+        low, high = positions.min(axis=0), positions.max(axis=0)
+        size = np.array([self.width - 2 * MARGIN, self.height - 2 * MARGIN], dtype=float)
+        return MARGIN + (positions - low) * (size / np.maximum(high - low, 1e-9)) + np.where(high > low, 0, size / 2)
+
+    def run(self, progress=None):
+        """Runs the remaining iterations and returns the canvas positions; progress(iteration, iterations) after each"""
+        while not self.done:
+            self.step()
+            if progress is not None:
+                progress(self.iteration, self.iterations)
+        return self.frame
@@ -0,0 +1,151 @@
+"""Read-only views that answer Graph queries straight from the arrays of a mapped graph file"""
+from collections.abc import Mapping
+
+import numpy as np
+from scipy import sparse
+
+from src.graph_format import NO_CODE
+
+
+class MappedAdjacency:
+    """Adjacency queries on the CSR arrays of a GraphArrays without building a networkx graph"""
+
+    def __init__(self, arrays):
+        self.arrays = arrays
+        self._index = None
+        self._directed = None
+        self._matrix = None
+
+    @property
+    def index(self):
+        """Node name -> row index, built on the first name lookup"""
+        if self._index is None:
+            self._index = {name: i for i, name in enumerate(self.arrays.node_names())}
+        return self._index
+
+    @property
+    def directed(self):
+        if self._directed is None:
+            self._directed = self.arrays.directed_mask()
+        return self._directed
+
+    def find_record(self, row, column):
+        """Returns the position of the stored edge record row -> column, or -1"""
+        indptr, indices = self.arrays.edge_indptr, self.arrays.edge_indices
+        start, end = indptr[row], indptr[row + 1]
+        position = start + np.searchsorted(indices[start:end], column)
+        if position < end and indices[position] == column:
+            return position
+        return -1
+
+    def edge_record(self, node1, node2):
+        """Returns the record storing the DiGraph edge node1 -> node2, or -1 if there is none"""
+        i, j = self.index.get(node1), self.index.get(node2)
+        if i is None or j is None:
+            return -1
+        record = self.find_record(i, j)
+        if record >= 0:
+            return record
+        # Undirected edges are stored once, from either endpoint
+        record = self.find_record(j, i)
+        if record >= 0 and not self.directed[record]:
+            return record
+        return -1
+
+    def has_edge(self, node1, node2, directed=False):
+        if directed:
+            return self.edge_record(node1, node2) >= 0
+        return self.edge_record(node1, node2) >= 0 or self.edge_record(node2, node1) >= 0
+
+    def edge_data(self, record):
+        data = {'directed': bool(self.directed[record])}
+        color = self.arrays.edge_color[record]
+        if color != NO_CODE:
+            data['color'] = self.arrays.string(color)
+        return data
+
+    def edge_records(self, default_color):
+        """Yields an EdgeRecord per drawable edge, straight from the stored records.
+
+        Undirected edges are already stored once. Records stored in both directions (two
+        opposite directed edges, or a directed edge next to an undirected one) count as one
+        undirected edge, as in Graph.edge_records, and are yielded from the lower row.
+        """
+        from src.graph_logic import EdgeRecord
+        arrays = self.arrays
+        n = arrays.n_nodes
+        rows = np.repeat(np.arange(n, dtype=np.int64), np.diff(arrays.edge_indptr))
+        columns = np.asarray(arrays.edge_indices, dtype=np.int64)
+        keys = rows * n + columns  # Sorted, as CSR rows and the columns within them are
+        reverse_keys = columns * n + rows
+        positions = np.minimum(np.searchsorted(keys, reverse_keys), max(len(keys) - 1, 0))
+        mutual = keys[positions] == reverse_keys if len(keys) else np.zeros(0, dtype=bool)
+        keep = ~mutual | (rows <= columns)
+        names = arrays.node_names()
+        directed = (self.directed & ~mutual)[keep].tolist()
+        for row, column, is_directed, code in zip(rows[keep].tolist(), columns[keep].tolist(), directed,
+                                                  np.asarray(arrays.edge_color)[keep].tolist()):
+            yield EdgeRecord(names[row], names[column], is_directed,
+                             arrays.string(code) if code != NO_CODE else default_color)
+
+    def matrix(self):
+        """Directed scipy CSR adjacency where undirected records count in both directions"""
+        if self._matrix is None:
+            arrays = self.arrays
+            n = arrays.n_nodes
+            stored = sparse.csr_array((np.ones(arrays.n_edges, dtype=np.int8), arrays.edge_indices,
+                                       arrays.edge_indptr), shape=(n, n))
+            undirected = sparse.csr_array((np.where(self.directed, 0, 1).astype(np.int8), arrays.edge_indices,
+                                           arrays.edge_indptr), shape=(n, n))
+            matrix = (stored + undirected.T).tocsr()
+            matrix.data[:] = 1  # An undirected self-loop is still a single edge
+            self._matrix = matrix
+        return self._matrix
+
+
+class MappedNodeView(Mapping):
+    """Read-only node -> attributes mapping; attribute dicts are decoded on access"""
+
+    def __init__(self, adjacency):
+        self.adjacency = adjacency
+
+    def __getitem__(self, node):
+        i = self.adjacency.index[node]
+        arrays = self.adjacency.arrays
+        attributes = {}
+        x, y = arrays.node_pos[i].tolist()
+        if x == x:  # NaN marks a missing position
+            attributes['pos'] = [x, y]
+        for key, codes in (('shape', arrays.node_shape), ('color', arrays.node_color)):
+            if codes[i] != NO_CODE:
+                attributes[key] = arrays.string(codes[i])
+        return attributes
+
+    def __iter__(self):
+        return iter(self.adjacency.arrays.node_names())
+
+    def __len__(self):
+        return self.adjacency.arrays.n_nodes
+
+    def __contains__(self, node):
+        return node in self.adjacency.index
+
+
+class MappedEdgeView:
+    """Iterable of (node1, node2) pairs with the same edges a materialised DiGraph would have"""
+
+    def __init__(self, adjacency):
+        self.adjacency = adjacency
+
+    def __iter__(self):
+        matrix = self.adjacency.matrix().tocoo()
+        names = self.adjacency.arrays.node_names()
+        for row, column in zip(matrix.row.tolist(), matrix.col.tolist()):
+            yield names[row], names[column]
+
+    def __len__(self):
+        return self.adjacency.matrix().nnz
+
+    def __contains__(self, edge):
+        node1, node2 = edge
+        return self.adjacency.has_edge(node1, node2, directed=True)
@@ -0,0 +1,101 @@
+import tkinter as tk
+
+CELL_WIDTH = 28
+CELL_HEIGHT = 20
+HEADER_WIDTH = 90  # Width of the column holding row labels
+HEADER_HEIGHT = 20  # Height of the row holding column labels
+LABEL_LENGTH = 10  # Node names longer than this are truncated in the headers
+
+
+class MatrixView:
+    """Window showing a sparse adjacency matrix; only the cells that fit on screen are drawn"""
+
+    def __init__(self, parent, nodes, matrix, on_export=None):
+        self.nodes = nodes
+        self.matrix = matrix.tocsr()
+        self.matrix.sort_indices()
+        self.first_row = 0
+        self.first_column = 0
+
+        self.window = tk.Toplevel(parent)
+        self.window.title(f"Adjacency Matrix ({len(nodes)} x {len(nodes)}, {self.matrix.nnz} edges)")
+
+        self.canvas = tk.Canvas(self.window, width=640, height=420, bg="white")
+        self.vertical_scrollbar = tk.Scrollbar(self.window, orient=tk.VERTICAL, command=self.on_vertical_scroll)
+        self.horizontal_scrollbar = tk.Scrollbar(self.window, orient=tk.HORIZONTAL,
+                                                 command=self.on_horizontal_scroll)
+        self.canvas.grid(row=0, column=0, sticky="nsew")
+        self.vertical_scrollbar.grid(row=0, column=1, sticky="ns")
+        self.horizontal_scrollbar.grid(row=1, column=0, sticky="ew")
+        if on_export is not None:
+            tk.Button(self.window, text="Export...", command=on_export).grid(row=2, column=0, sticky="w")
+        self.window.grid_rowconfigure(0, weight=1)
+        self.window.grid_columnconfigure(0, weight=1)
+
+        self.canvas.bind("<Configure>", lambda _: self.render())
+        self.canvas.bind("<MouseWheel>", self.on_mouse_wheel)
+        self.canvas.bind("<Button-4>", lambda _: self.scroll_rows(-3))  # Mouse wheel on X11
+        self.canvas.bind("<Button-5>", lambda _: self.scroll_rows(3))
+
+    def visible_rows(self):
+        return max(1, (self.canvas.winfo_height() - HEADER_HEIGHT) // CELL_HEIGHT + 1)
+
+    def visible_columns(self):
+        return max(1, (self.canvas.winfo_width() - HEADER_WIDTH) // CELL_WIDTH + 1)
+
+    def _scroll(self, first, visible, args):
+        """Translates Scrollbar commands ('moveto' / 'scroll') into a new first index"""
+        total = len(self.nodes)
+        if args[0] == "moveto":
+            first = int(float(args[1]) * total)
+        elif args[0] == "scroll":
+            step = visible - 1 if args[2] == "pages" else 1
+            first += int(args[1]) * max(1, step)
+        return max(0, min(first, total - visible + 1))
+
+    def on_vertical_scroll(self, *args):
+        self.first_row = self._scroll(self.first_row, self.visible_rows(), args)
+        self.render()
+
+    def on_horizontal_scroll(self, *args):
+        self.first_column = self._scroll(self.first_column, self.visible_columns(), args)
+        self.render()
+
+    def on_mouse_wheel(self, event):
+        self.scroll_rows(-1 if event.delta > 0 else 1)
+
+    def scroll_rows(self, rows):
+        self.on_vertical_scroll("scroll", rows, "units")
+
+    def render(self):
+        """Redraws the headers and cells of the visible window of the matrix"""
+        self.canvas.delete("all")
+        total = len(self.nodes)
+        last_row = min(total, self.first_row + self.visible_rows())
+        last_column = min(total, self.first_column + self.visible_columns())
+
+        for column in range(self.first_column, last_column):
+            x = HEADER_WIDTH + (column - self.first_column) * CELL_WIDTH + CELL_WIDTH / 2
+            self.canvas.create_text(x, HEADER_HEIGHT / 2, text=str(self.nodes[column])[:LABEL_LENGTH // 2],
+                                    font=("TkDefaultFont", 8, "bold"))
+
+        indptr, indices = self.matrix.indptr, self.matrix.indices
+        for row in range(self.first_row, last_row):
+            y = HEADER_HEIGHT + (row - self.first_row) * CELL_HEIGHT + CELL_HEIGHT / 2
+            self.canvas.create_text(HEADER_WIDTH - 4, y, anchor="e", text=str(self.nodes[row])[:LABEL_LENGTH],
+                                    font=("TkDefaultFont", 8, "bold"))
+
+            # Only the non-zero entries of this row that fall into the visible columns
+            row_indices = indices[indptr[row]:indptr[row + 1]]
+            ones = set(row_indices[(row_indices >= self.first_column) & (row_indices < last_column)].tolist())
+            for column in range(self.first_column, last_column):
+                x = HEADER_WIDTH + (column - self.first_column) * CELL_WIDTH + CELL_WIDTH / 2
+                if column in ones:
+                    self.canvas.create_text(x, y, text="1", fill="black")
+                else:
+                    self.canvas.create_text(x, y, text="0", fill="lightgray")
+
+        # Scrollbars show the visible fraction of the whole matrix
+        if total:
+            self.vertical_scrollbar.set(self.first_row / total, last_row / total)
+            self.horizontal_scrollbar.set(self.first_column / total, last_column / total)
@@ -0,0 +1,223 @@
+"""Matplotlib drawing of a Graph; imported on the first Graph.draw() call, never by headless code.
+
+Each graph keeps one persistent figure. Nodes are a single PathCollection and edges a single
+LineCollection; a redraw only updates their offsets, segments and colours and blits them over
+a cached background. The edges are packed into NaN-separated polylines, one per line width,
+so matplotlib builds a handful of paths instead of one per edge. Directed edges get their
+arrowheads from one more PathCollection, placed at the target node's rim. Above
+LOD_NODE_THRESHOLD nodes, labels and arrowheads are skipped and edges are merged into one
+segment per pair of grid cells.
+"""
+import weakref
+
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.collections import LineCollection, PathCollection
+from matplotlib.path import Path
+from matplotlib.transforms import Affine2D, IdentityTransform
+
+NODE_SIZE = 500
+LOD_NODE_SIZE = 20
+LOD_NODE_THRESHOLD = 300  # Above this many nodes: no labels, aggregated edges
+LOD_GRID = 32  # Cells per axis when aggregating edges
+LOD_WIDTH_LEVELS = 4  # Distinct line widths for aggregated edges, one polyline each
+LOD_MAX_SEGMENTS = 4000  # Only the heaviest cell pairs are drawn; rasterising long lines dominates the cost
+LIMIT_MARGIN = 0.1  # Extra room around the nodes, so small moves do not change the axis limits
+ARROW_SIZE = 150  # Area of an arrowhead in points^2, as for scatter markers
+ARROW_ANGLES = 72  # Arrowhead orientations; every arrow reuses one of these paths
+_ARROW = Path([(0, 0), (-1, 0.4), (-1, -0.4), (0, 0)], closed=True)  # Tip at the origin, pointing along +x
+ARROW_PATHS = [_ARROW.transformed(Affine2D().rotate(2 * np.pi * i / ARROW_ANGLES)) for i in range(ARROW_ANGLES)]
+
+_figures = weakref.WeakKeyDictionary()  # Graph -> GraphFigure
+
+
+def polyline(starts, ends):
+    """Packs segments into one polyline with NaN breaks, which matplotlib draws as a single path"""
+    vertices = np.full((len(starts) * 3, 2), np.nan)
+    vertices[0::3] = starts
+    vertices[1::3] = ends
+    return vertices
+
+
+def aggregate_edges(positions, sources, targets, limits, grid=LOD_GRID):
+    """Merges edges into one segment per unordered pair of cells of a grid x grid raster of the axes.
+
+    Returns one polyline per line width and the widths; pairs standing for more edges get a
+    wider line. Edges inside a single cell are dropped, and of the remaining pairs only the
+    LOD_MAX_SEGMENTS heaviest are kept.
+    """
+    (x0, x1), (y0, y1) = limits
+    origin = np.array([x0, y0])
+    cell_size = np.array([x1 - x0, y1 - y0]) / grid
+    cells = np.clip(((positions - origin) // cell_size).astype(np.int64), 0, grid - 1)
+    cell_ids = cells[:, 0] * grid + cells[:, 1]
+    low = np.minimum(cell_ids[sources], cell_ids[targets])
+    high = np.maximum(cell_ids[sources], cell_ids[targets])
+    keys, counts = np.unique(low * grid * grid + high, return_counts=True)
+    first, second = np.divmod(keys, grid * grid)
+    crossing = first != second
+    first, second, counts = first[crossing], second[crossing], counts[crossing]
+    if len(counts) > LOD_MAX_SEGMENTS:
+        heaviest = np.argpartition(counts, -LOD_MAX_SEGMENTS)[-LOD_MAX_SEGMENTS:]
+        first, second, counts = first[heaviest], second[heaviest], counts[heaviest]
+
+    def centres(ids):
+        return (np.stack(np.divmod(ids, grid), axis=1) + 0.5) * cell_size + origin
+
+    starts, ends = centres(first), centres(second)
+    weights = np.log1p(counts)
+    levels = np.minimum((weights / max(weights.max(initial=0), 1e-9) * LOD_WIDTH_LEVELS).astype(np.int64),
+                        LOD_WIDTH_LEVELS - 1)
+    polylines, widths = [], []
+    for level in range(LOD_WIDTH_LEVELS):
+        chosen = levels == level
+        if chosen.any():
+            polylines.append(polyline(starts[chosen], ends[chosen]))
+            widths.append(0.5 + level)
+    return polylines, widths
+
+
+class GraphFigure:
+    """Persistent figure for one graph; redraws update the artists in place and blit them"""
+
+    def __init__(self, level_of_detail=True):
+        plt.ion()  # Enable interactive mode
+        self.figure, self.axes = plt.subplots()
+        self.axes.set_axis_off()
+        self.level_of_detail = level_of_detail
+        self.edges_artist = LineCollection([], colors="black", linewidths=1, animated=True, zorder=1)
+        self.axes.add_collection(self.edges_artist)
+        self.arrows_artist = PathCollection(ARROW_PATHS[:1], sizes=[ARROW_SIZE], offsets=np.empty((0, 2)),
+                                            offset_transform=self.axes.transData, facecolors="black",
+                                            edgecolors="none", animated=True, zorder=1)
+        self.arrows_artist.set_transform(IdentityTransform())  # Paths are in points, as scatter markers
+        self.axes.add_collection(self.arrows_artist, autolim=False)
+        self.nodes_artist = self.axes.scatter([], [], s=NODE_SIZE, animated=True, zorder=2)
+        self.labels = []
+        self.version = None  # Structural version of the graph the node and edge index arrays belong to
+        self.node_list = []
+        self.sources = self.targets = np.empty(0, dtype=np.int64)
+        self.directed = np.empty(0, dtype=bool)  # Per edge: draw an arrowhead at its target
+        self.positions = np.empty((0, 2))
+        self.limits = None
+        self.background = None
+        # Any full draw (first show, resize, limit change) re-captures the background
+        self.figure.canvas.mpl_connect("draw_event", self._on_draw)
+        plt.show(block=False)
+
+    def is_open(self):
+        return plt.fignum_exists(self.figure.number)
+
+    def detailed(self):
+        return not (self.level_of_detail and len(self.node_list) > LOD_NODE_THRESHOLD)
+
+    def _on_draw(self, event):
+        self.background = self.figure.canvas.copy_from_bbox(self.axes.bbox)
+        self._update_arrows()  # Arrowheads are oriented in screen space, which a resize changes
+        self._draw_artists()
+
+    def _draw_artists(self):
+        self.axes.draw_artist(self.edges_artist)
+        self.axes.draw_artist(self.arrows_artist)
+        self.axes.draw_artist(self.nodes_artist)
+        for label in self.labels:
+            self.axes.draw_artist(label)
+
+    def _rebuild_structure(self, graph):
+        """Re-reads the node order and the edges (undirected ones once) as index arrays after a structural change"""
+        self.node_list = list(graph.get_nodes())
+        index = {node: i for i, node in enumerate(self.node_list)}
+        records = graph.edge_records()
+        edges = [(index[record.node1], index[record.node2]) for record in records]
+        pairs = np.array(edges, dtype=np.int64).reshape(-1, 2)
+        self.sources, self.targets = pairs[:, 0], pairs[:, 1]
+        self.directed = np.array([record.directed for record in records], dtype=bool)
+
+        for label in self.labels:
+            label.remove()
+        self.labels = []
+        if self.detailed():
+            self.labels = [self.axes.text(0, 0, str(node), ha="center", va="center", fontsize=10,
+                                          color="black", fontweight="bold", animated=True, zorder=3)
+                           for node in self.node_list]
+        self.version = graph._version
+
+    def _fit_limits(self, positions):
+        """Widens the axis limits when a node leaves them; returns True if they changed"""
+        if not len(positions):
+            return False
+        low, high = positions.min(axis=0), positions.max(axis=0)
+        if self.limits is not None:
+            (x0, x1), (y0, y1) = self.limits
+            if x0 <= low[0] and high[0] <= x1 and y0 <= low[1] and high[1] <= y1:
+                return False
+        margin = np.maximum((high - low) * LIMIT_MARGIN, 1.0)
+        low, high = low - margin, high + margin
+        self.limits = ((low[0], high[0]), (low[1], high[1]))
+        self.axes.set_xlim(*self.limits[0])
+        self.axes.set_ylim(*self.limits[1])
+        return True
+
+    def _update_arrows(self):
+        """Places an arrowhead at the rim of the target node of every directed edge (detailed mode only)"""
+        directed = self.directed if self.detailed() and len(self.positions) else np.zeros(0, dtype=bool)
+        if not directed.any():
+            self.arrows_artist.set_offsets(np.empty((0, 2)))
+            return
+        to_display = self.axes.transData
+        starts = to_display.transform(self.positions[self.sources[directed]])
+        ends = to_display.transform(self.positions[self.targets[directed]])
+        vectors = ends - starts
+        lengths = np.hypot(vectors[:, 0], vectors[:, 1])
+        drawn = lengths > 0  # Self-loops and coinciding nodes have no direction to show
+        unit = vectors[drawn] / lengths[drawn, None]
+        radius = np.sqrt(NODE_SIZE) / 2 * self.figure.dpi / 72  # Node marker radius in pixels
+        tips = ends[drawn] - unit * radius
+        turns = np.round(np.arctan2(unit[:, 1], unit[:, 0]) / (2 * np.pi) * ARROW_ANGLES).astype(np.int64)
+        self.arrows_artist.set_paths([ARROW_PATHS[turn] for turn in (turns % ARROW_ANGLES).tolist()])
+        self.arrows_artist.set_offsets(to_display.inverted().transform(tips))
+
+    def update(self, graph):
+        """Brings the artists up to date with the graph and shows them"""
+        if graph._version != self.version:
+            self._rebuild_structure(graph)
+        nodes = graph.get_nodes()
+        positions = np.array([nodes[node]['pos'] for node in self.node_list], dtype=float).reshape(-1, 2)
+        limits_changed = self._fit_limits(positions)
+
+        detailed = self.detailed()
+        self.nodes_artist.set_offsets(positions)
+        self.nodes_artist.set_facecolors([graph.node_colors.get(node, 'lightblue') for node in self.node_list])
+        self.nodes_artist.set_sizes([NODE_SIZE if detailed else LOD_NODE_SIZE])
+        if detailed or self.limits is None:
+            self.edges_artist.set_segments([polyline(positions[self.sources], positions[self.targets])])
+            self.edges_artist.set_linewidths([1])
+        else:
+            polylines, widths = aggregate_edges(positions, self.sources, self.targets, self.limits)
+            self.edges_artist.set_segments(polylines)
+            self.edges_artist.set_linewidths(widths)
+        for label, (x, y) in zip(self.labels, positions.tolist()):
+            label.set_position((x, y))
+        self.positions = positions
+        self._update_arrows()
+
+        canvas = self.figure.canvas
+        if limits_changed or self.background is None:
+            canvas.draw()  # The draw_event handler captures the background and draws the artists
+        else:
+            canvas.restore_region(self.background)
+            self._draw_artists()
+        canvas.blit(self.axes.bbox)
+        canvas.flush_events()  # Replaces the fixed plt.pause(0.1)
+
+
+def draw_graph(graph, level_of_detail=True):
+    """Draws the graph in its persistent figure, creating the figure on the first call"""
+    figure = _figures.get(graph)
+    if figure is None or not figure.is_open():
+        figure = _figures[graph] = GraphFigure(level_of_detail)
+    if figure.level_of_detail != level_of_detail:
+        figure.level_of_detail = level_of_detail
+        figure.version = None  # Labels are created or dropped with the structure
+    figure.update(graph)
+    return figure
@@ -0,0 +1,396 @@
+"""Graph products computed as sparse Kronecker operations on adjacency matrices.
+
+With A (n x n) and B (m x m) the factor adjacency matrices, node (v1, v2) of the
+product gets index i * m + j, where i and j are the positions of v1 and v2, and
+
+    tensor product:     A (x) B
+    cartesian product:  A (x) I_m + I_n (x) B
+
+ProductGraph holds a computed product; ProductGraphView answers queries from the factors alone.
+"""
+import bisect
+
+import networkx as nx
+import numpy as np
+from scipy import sparse
+
+from src import csr_analysis
+from src.hamiltonian import HamiltonianSearch, SearchBudgetExceeded
+
+TENSOR = "tensor"
+CARTESIAN = "cartesian"
+
+
+def product_adjacency(kind, first, second):
+    """Returns the CSR adjacency of the product of two sparse adjacency matrices"""
+    if kind == TENSOR:
+        matrix = sparse.kron(first, second, format="csr")
+    elif kind == CARTESIAN:
+        n, m = first.shape[0], second.shape[0]
+        matrix = (sparse.kron(first, sparse.identity(m, dtype=np.int8), format="csr")
+                  + sparse.kron(sparse.identity(n, dtype=np.int8), second, format="csr"))
+    else:
+        raise ValueError(f"Unknown product kind: {kind}")
+    matrix = sparse.csr_array(matrix)
+    matrix.data[:] = 1  # Self-loops in both factors would otherwise count twice
+    matrix.sort_indices()
+    return matrix
+
+
+def _row(matrix, row):
+    """Returns the column indices stored in one row of a CSR matrix"""
+    return matrix.indices[matrix.indptr[row]:matrix.indptr[row + 1]]
+
+
+def _has_entry(matrix, row, column):
+    end = int(matrix.indptr[row + 1])
+    position = bisect.bisect_left(matrix.indices, column, int(matrix.indptr[row]), end)
+    return position < end and matrix.indices[position] == column
+
+
+class ProductGraph:
+    """Product of two graphs stored as one CSR adjacency over (node1, node2) pairs"""
+
+    def __init__(self, kind, first_nodes, second_nodes, matrix):
+        self.kind = kind
+        self.first_nodes = first_nodes
+        self.second_nodes = second_nodes
+        self.matrix = matrix
+        self._first_index = {node: i for i, node in enumerate(first_nodes)}
+        self._second_index = {node: j for j, node in enumerate(second_nodes)}
+
+    def number_of_nodes(self):
+        return self.matrix.shape[0]
+
+    def number_of_edges(self):
+        return self.matrix.nnz
+
+    def node(self, index):
+        """Returns the (node1, node2) pair at a matrix index"""
+        i, j = divmod(index, len(self.second_nodes))
+        return self.first_nodes[i], self.second_nodes[j]
+
+    def index(self, node):
+        """Returns the matrix index of a (node1, node2) pair, or None if it is not a product node"""
+        node1, node2 = node
+        i, j = self._first_index.get(node1), self._second_index.get(node2)
+        if i is None or j is None:
+            return None
+        return i * len(self.second_nodes) + j
+
+    def __contains__(self, node):
+        return self.index(node) is not None
+
+    def nodes(self):
+        for node1 in self.first_nodes:
+            for node2 in self.second_nodes:
+                yield node1, node2
+
+    def edges(self):
+        """Yields every (source pair, target pair) edge, row by row"""
+        indptr, indices = self.matrix.indptr, self.matrix.indices
+        for row in range(self.number_of_nodes()):
+            start, end = indptr[row], indptr[row + 1]
+            if start == end:
+                continue
+            source = self.node(row)
+            for column in indices[start:end].tolist():
+                yield source, self.node(column)
+
+    def successors(self, node):
+        return [self.node(column) for column in _row(self.matrix, self.index(node)).tolist()]
+
+    def has_edge(self, node1, node2):
+        row, column = self.index(node1), self.index(node2)
+        if row is None or column is None:
+            return False
+        return _has_entry(self.matrix, row, column)
+
+    def to_networkx(self):
+        """Materialises the product as a networkx DiGraph"""
+        result_graph = nx.DiGraph()
+        result_graph.add_nodes_from(self.nodes())
+        result_graph.add_edges_from(self.edges())
+        return result_graph
+
+
+def _grid_cycle(rows, columns, pair):
+    """Hamiltonian cycle of the grid rows x columns, for an even number of rows and at least two columns.
+
+    The rows are walked as a snake over columns[1:], and the cycle closes back up through columns[0].
+    """
+    cycle = []
+    for r, row in enumerate(rows):
+        span = columns[1:] if r % 2 == 0 else columns[:0:-1]
+        cycle.extend(pair(row, column) for column in span)
+    cycle.extend(pair(row, columns[0]) for row in reversed(rows))
+    cycle.append(cycle[0])
+    return cycle
+
+
+class ProductGraphView:
+    """Lazy tensor or Cartesian product of two Graphs.
+
+    Only the factors' adjacency matrices are kept. Nodes, edges, degrees and neighbourhoods
+    are derived from them on demand, and analyses use product identities where they exist.
+    Anything of size n1 * n2 is built only by materialise() or by analyses without an identity.
+    """
+
+    def __init__(self, kind, first_graph, second_graph):
+        if kind not in (TENSOR, CARTESIAN):
+            raise ValueError(f"Unknown product kind: {kind}")
+        self.kind = kind
+        self.first_graph = first_graph
+        self.second_graph = second_graph
+        self.first_nodes, self.first = first_graph.sparse_adjacency_matrix()
+        self.second_nodes, self.second = second_graph.sparse_adjacency_matrix()
+        self.first, self.second = self.first.sorted_indices(), self.second.sorted_indices()  # For _has_entry
+        self._first_in = sparse.csr_array(self.first.T)
+        self._second_in = sparse.csr_array(self.second.T)
+        self._first_index = {node: i for i, node in enumerate(self.first_nodes)}
+        self._second_index = {node: j for j, node in enumerate(self.second_nodes)}
+        self._first_loops = self.first.diagonal() != 0
+        self._second_loops = self.second.diagonal() != 0
+        self._materialised = None
+        self._eccentricities = None
+
+    def number_of_nodes(self):
+        return len(self.first_nodes) * len(self.second_nodes)
+
+    def number_of_edges(self):
+        if self.kind == TENSOR:
+            return self.first.nnz * self.second.nnz
+        # A self-loop in both factors gives the same product self-loop twice
+        overlap = int(self._first_loops.sum()) * int(self._second_loops.sum())
+        return self.first.nnz * len(self.second_nodes) + len(self.first_nodes) * self.second.nnz - overlap
+
+    def node(self, index):
+        """Returns the (node1, node2) pair at a product index"""
+        i, j = divmod(index, len(self.second_nodes))
+        return self.first_nodes[i], self.second_nodes[j]
+
+    def index(self, node):
+        """Returns the product index of a (node1, node2) pair, or None if it is not a product node"""
+        node1, node2 = node
+        i, j = self._first_index.get(node1), self._second_index.get(node2)
+        if i is None or j is None:
+            return None
+        return i * len(self.second_nodes) + j
+
+    def __contains__(self, node):
+        return self.index(node) is not None
+
+    def nodes(self, start=0):
+        """Yields the product nodes in index order, beginning at index `start`"""
+        for index in range(start, self.number_of_nodes()):
+            yield self.node(index)
+
+    def _neighbours(self, first, second, i, j):
+        """Neighbour pairs of (i, j) given the factor matrices for one direction (successors or predecessors)"""
+        first_nodes, second_nodes = self.first_nodes, self.second_nodes
+        if self.kind == TENSOR:
+            targets = _row(second, j).tolist()
+            return [(first_nodes[a], second_nodes[b]) for a in _row(first, i).tolist() for b in targets]
+        node1, node2 = first_nodes[i], second_nodes[j]
+        result = [(first_nodes[a], node2) for a in _row(first, i).tolist()]
+        loop_listed = bool(self._first_loops[i])
+        result.extend((node1, second_nodes[b]) for b in _row(second, j).tolist() if not (b == j and loop_listed))
+        return result
+
+    def _split(self, node):
+        index = self.index(node)
+        if index is None:
+            raise KeyError(f"{node} is not a node of the product")
+        return divmod(index, len(self.second_nodes))
+
+    def successors(self, node):
+        return self._neighbours(self.first, self.second, *self._split(node))
+
+    def predecessors(self, node):
+        return self._neighbours(self._first_in, self._second_in, *self._split(node))
+
+    def _degree(self, first, second, node):
+        i, j = self._split(node)
+        first_degree = int(first.indptr[i + 1] - first.indptr[i])
+        second_degree = int(second.indptr[j + 1] - second.indptr[j])
+        if self.kind == TENSOR:
+            return first_degree * second_degree
+        return first_degree + second_degree - int(self._first_loops[i] and self._second_loops[j])
+
+    def out_degree(self, node):
+        return self._degree(self.first, self.second, node)
+
+    def in_degree(self, node):
+        return self._degree(self._first_in, self._second_in, node)
+
+    def has_edge(self, node1, node2):
+        if node1 not in self or node2 not in self:
+            return False
+        (i, j), (k, l) = self._split(node1), self._split(node2)
+        if self.kind == TENSOR:
+            return _has_entry(self.first, i, k) and _has_entry(self.second, j, l)
+        return (i == k and _has_entry(self.second, j, l)) or (j == l and _has_entry(self.first, i, k))
+
+    def _block_degrees(self, i):
+        """Out-degrees of the product nodes (i, 0) .. (i, m - 1)"""
+        first_degree = int(self.first.indptr[i + 1] - self.first.indptr[i])
+        second_degrees = np.diff(self.second.indptr)
+        if self.kind == TENSOR:
+            return first_degree * second_degrees
+        return first_degree + second_degrees - (self._first_loops[i] & self._second_loops)
+
+    def edges(self, start=0):
+        """Yields the product edges in source index order, beginning at edge number `start`.
+
+        Seeking to `start` costs O(n1 + n2), so a page of edges can be read without
+        enumerating the ones before it.
+        """
+        n, m = len(self.first_nodes), len(self.second_nodes)
+        if start >= self.number_of_edges():
+            return
+        first_degrees = np.diff(self.first.indptr)
+        if self.kind == TENSOR:
+            block_sizes = first_degrees * self.second.nnz
+        else:
+            block_sizes = first_degrees * m + self.second.nnz - self._first_loops * int(self._second_loops.sum())
+        block_ends = np.cumsum(block_sizes)
+        i = int(np.searchsorted(block_ends, start, side="right"))
+        offset = start - (int(block_ends[i - 1]) if i else 0)
+        row_ends = np.cumsum(self._block_degrees(i))
+        j = int(np.searchsorted(row_ends, offset, side="right"))
+        skip = offset - (int(row_ends[j - 1]) if j else 0)
+
+        for index in range(i * m + j, n * m):
+            row, column = divmod(index, m)
+            source = self.first_nodes[row], self.second_nodes[column]
+            for target in self._neighbours(self.first, self.second, row, column)[skip:]:
+                yield source, target
+            skip = 0
+
+    def materialise(self):
+        """Returns the product as an array-backed ProductGraph, computed once"""
+        if self._materialised is None:
+            matrix = product_adjacency(self.kind, self.first, self.second)
+            self._materialised = ProductGraph(self.kind, self.first_nodes, self.second_nodes, matrix)
+        return self._materialised
+
+    def to_networkx(self):
+        return self.materialise().to_networkx()
+
+    def is_connected(self):
+        """Checks weak connectivity; a Cartesian product is connected exactly when both factors are"""
+        if self.number_of_nodes() == 0:
+            return False
+        if self.kind == CARTESIAN:
+            return self.first_graph.is_connected() and self.second_graph.is_connected()
+        return csr_analysis.is_weakly_connected(self.materialise().matrix)
+
+    def is_strongly_connected(self):
+        """Checks strong connectivity; for a Cartesian product it follows from the factors"""
+        if self.number_of_nodes() == 0:
+            return False
+        if self.kind == CARTESIAN:
+            return self.first_graph.is_strongly_connected() and self.second_graph.is_strongly_connected()
+        return csr_analysis.is_strongly_connected(self.materialise().matrix)
+
+    def eccentricity(self, node, progress=None):
+        """Returns the out-eccentricity of a product node, or None unless the product is strongly connected.
+
+        Distances in a Cartesian product add up over the factors, so there the result is
+        ecc1(node1) + ecc2(node2). A tensor product runs the chunked BFS over the whole product once.
+        """
+        i, j = self._split(node)
+        if self.kind == CARTESIAN:
+            factors = self._factor_eccentricities(progress)
+            if factors is None:
+                return None
+            return factors[0][self.first_nodes[i]] + factors[1][self.second_nodes[j]]
+        values = self._tensor_eccentricities(progress)
+        return None if values is None else int(values[i * len(self.second_nodes) + j])
+
+    def _factor_eccentricities(self, progress=None):
+        first = self.first_graph.eccentricities(progress)
+        second = self.second_graph.eccentricities(progress)
+        if first is None or second is None:
+            return None
+        return first, second
+
+    def _tensor_eccentricities(self, progress=None):
+        if self._eccentricities is None:
+            self._eccentricities = csr_analysis.eccentricities(self.materialise().matrix, progress=progress)
+        return self._eccentricities
+
+    def radius_and_diameter(self, progress=None):
+        """Returns the radius and diameter; for a Cartesian product these are the sums over the factors"""
+        if not self.is_connected():
+            return None, None
+        if self.kind == CARTESIAN:
+            factors = self._factor_eccentricities(progress)
+            if factors is None:
+                return None, None
+            first, second = (list(values.values()) for values in factors)
+            return min(first) + min(second), max(first) + max(second)
+        values = self._tensor_eccentricities(progress)
+        if values is None:
+            return None, None
+        return int(values.min()), int(values.max())
+
+    def center(self, progress=None):
+        """Returns the center; for a Cartesian product it is center(first) x center(second)"""
+        if not self.is_strongly_connected():
+            return None
+        if self.kind == CARTESIAN:
+            first, second = self.first_graph.center(progress), self.second_graph.center(progress)
+            if first is None or second is None:
+                return None
+            return [(node1, node2) for node1 in first for node2 in second]
+        values = self._tensor_eccentricities(progress)
+        if values is None:
+            return None
+        return [self.node(int(index)) for index in np.flatnonzero(values == values.min())]
+
+    def find_hamiltonian_cycles(self, limit=1, timeout=None, max_expansions=None, progress=None):
+        """Returns up to `limit` Hamiltonian cycles of the product.
+
+        A Cartesian product is first checked through its factors: without strong connectivity
+        there is no cycle, and two undirected factors with Hamiltonian cycles, one of them
+        of even length, give a product cycle directly as a snake over the grid of the two
+        cycles. Everything else runs the search engine on the materialised product.
+        """
+        if self.number_of_nodes() == 0:
+            return []
+        if self.kind == CARTESIAN and self.number_of_nodes() > 1:
+            if not self.is_strongly_connected():
+                return []
+            if limit == 1:
+                cycle = self._cartesian_grid_cycle(timeout, max_expansions, progress)
+                if cycle is not None:
+                    return [cycle]
+
+        product = self.materialise()
+        indptr, indices = product.matrix.indptr, product.matrix.indices
+        successors = [indices[indptr[row]:indptr[row + 1]].tolist() for row in range(product.number_of_nodes())]
+        search = HamiltonianSearch(list(self.nodes()), successors, timeout=timeout,
+                                   max_expansions=max_expansions, progress=progress)
+        return search.find(limit)
+
+    def _cartesian_grid_cycle(self, timeout, max_expansions, progress):
+        """Builds a product cycle from the factors' cycles, or returns None when the identity does not apply"""
+        n, m = len(self.first_nodes), len(self.second_nodes)
+        if n < 2 or m < 2 or (n % 2 and m % 2):
+            return None
+        if (self.first != self._first_in).nnz or (self.second != self._second_in).nnz:
+            return None  # The snake walks factor edges in both directions
+        try:
+            first_cycles = self.first_graph.find_hamiltonian_cycles(timeout=timeout, max_expansions=max_expansions,
+                                                                    progress=progress)
+            second_cycles = self.second_graph.find_hamiltonian_cycles(timeout=timeout, max_expansions=max_expansions,
+                                                                      progress=progress)
+        except SearchBudgetExceeded as e:
+            raise SearchBudgetExceeded([], e.expansions) from None
+        if not first_cycles or not second_cycles:
+            return None
+        first_path, second_path = first_cycles[0][:-1], second_cycles[0][:-1]
+        if n % 2 == 0:
+            return _grid_cycle(first_path, second_path, lambda row, column: (row, column))
+        return _grid_cycle(second_path, first_path, lambda row, column: (column, row))
@@ -0,0 +1,236 @@
+"""Hop distances on a scipy CSR adjacency matrix: single-pair bidirectional BFS and parallel all-pairs BFS.
+
+Like csr_analysis, everything works on the matrix (and its transpose for the backward
+search), so graphs opened with Graph.open_mapped are handled without building networkx
+objects. Distances follow edge direction; undirected edges are stored both ways.
+
+All-pairs distances are an n x n int32 matrix, UNREACHABLE where there is no path. The
+sources are split into row blocks that worker processes compute with scipy's C BFS and
+write straight into a shared mapping of a .npy file: a file on /dev/shm (shared memory)
+when the matrix fits in RAM, and otherwise a file on disk, so that a matrix larger than
+memory streams out block by block and is read back as a memory map.
+"""
+import contextlib
+import json
+import math
+import multiprocessing
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse import csgraph
+
+UNREACHABLE = -1
+BLOCK_BYTES = 64 * 1024 * 1024  # Bound on the float64 block one BFS call returns
+TASKS_PER_WORKER = 4  # Row blocks per worker process, so that uneven blocks still balance
+PARALLEL_MIN_NODES = 2_000  # Smaller graphs are faster in-process than with worker start-up
+SHARED_MEMORY_DIRECTORY = "/dev/shm"
+
+
+def bidirectional_bfs(matrix, reverse, source, target):
+    """Returns the row indices of a shortest path from source to target, or None if there is none.
+
+    matrix is the CSR adjacency matrix and reverse its transpose in CSR form. The search
+    grows whole BFS levels from both ends, always expanding the smaller frontier, and
+    stops at the first level where the two searches meet.
+    """
+    if source == target:
+        return [source]
+    n = matrix.shape[0]
+    sides = []
+    for adjacency, start in ((matrix, source), (reverse, target)):
+        distance = np.full(n, -1, dtype=np.int32)
+        parent = np.full(n, -1, dtype=np.int64)
+        distance[start] = 0
+        sides.append([adjacency, distance, parent, np.array([start])])
+
+    while sides[0][3].size and sides[1][3].size:
+        side = 0 if sides[0][3].size <= sides[1][3].size else 1
+        adjacency, distance, parent, frontier = sides[side]
+        other_distance = sides[1 - side][1]
+        heads, neighbours = _expand(adjacency, frontier)
+        new = distance[neighbours] < 0
+        neighbours, first = np.unique(neighbours[new], return_index=True)  # One parent per newly reached node
+        distance[neighbours] = distance[frontier[0]] + 1
+        parent[neighbours] = heads[new][first]
+        sides[side][3] = neighbours
+        met = neighbours[other_distance[neighbours] >= 0]
+        if met.size:
+            meeting = met[np.argmin(other_distance[met])]
+            return _walk(sides[0][2], meeting)[::-1] + _walk(sides[1][2], meeting)[1:]
+    return None
+
+
+def _expand(adjacency, frontier):
+    """Returns (heads, neighbours): every edge leaving the frontier as head -> neighbour arrays"""
+    starts = adjacency.indptr[frontier]
+    counts = adjacency.indptr[frontier + 1] - starts
+    total = int(counts.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    # Positions of the edges in indices: each frontier node's range, concatenated
+    offsets = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(total)
+    return np.repeat(frontier, counts), adjacency.indices[offsets].astype(np.int64)
+
+
+def _walk(parent, node):
+    path = [int(node)]
+    while parent[path[-1]] >= 0:
+        path.append(int(parent[path[-1]]))
+    return path
+
+
+class DistanceMatrix:
+    """All-pairs hop distances: distances[i, j] from nodes[i] to nodes[j], UNREACHABLE if there is no path"""
+
+    def __init__(self, nodes, distances, filename=None):
+        self.nodes = nodes
+        self.distances = distances  # int32 array, a read-only memory map for parallel or on-disk results
+        self.filename = filename  # The .npy file kept on disk, None for a temporary one
+        self._index = None
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def index(self, node):
+        if self._index is None:
+            self._index = {name: i for i, name in enumerate(self.nodes)}
+        return self._index[node]
+
+    def distance(self, source, target):
+        """Returns the number of edges on a shortest path, or None if target cannot be reached"""
+        value = int(self.distances[self.index(source), self.index(target)])
+        return None if value == UNREACHABLE else value
+
+    def row(self, node):
+        return self.distances[self.index(node)]
+
+
+def block_size(n, workers=1):
+    """Sources per BFS call: bounded by BLOCK_BYTES, and small enough to give every worker a few blocks"""
+    size = max(1, BLOCK_BYTES // (8 * max(n, 1)))
+    if workers > 1:
+        size = min(size, math.ceil(n / (workers * TASKS_PER_WORKER)))
+    return max(1, size)
+
+
+def distance_rows(matrix, start, stop):
+    """Returns the int32 distances from the sources start..stop-1 to every node"""
+    distances = csgraph.shortest_path(matrix, directed=True, unweighted=True, indices=np.arange(start, stop))
+    distances[np.isinf(distances)] = UNREACHABLE
+    return distances.astype(np.int32)
+
+
+def all_pairs(matrix, nodes, filename=None, workers=None, progress=None):
+    """Returns the DistanceMatrix of a CSR adjacency matrix whose rows are nodes.
+
+    With a filename the matrix is written there as .npy (and the node names next to it as
+    <filename>.nodes.json) and returned as a memory map. `workers` is the number of worker
+    processes (default: one per CPU, and none for small graphs). `progress(done, total)` is
+    called after every finished row block; an exception it raises (e.g. JobCancelled)
+    stops the computation.
+    """
+    n = matrix.shape[0]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if n < PARALLEL_MIN_NODES:
+        workers = 1
+    nbytes = 4 * n * n
+    if filename is None and workers == 1 and _fits_in_memory(nbytes):
+        distances = np.empty((n, n), dtype=np.int32)
+        _fill_in_process(matrix, distances, progress)
+        return DistanceMatrix(nodes, distances)
+
+    path = filename
+    if path is None:
+        directory = _scratch_directory(nbytes)
+        if directory != SHARED_MEMORY_DIRECTORY:
+            print(f"The {nbytes / 2 ** 30:.1f} GiB distance matrix does not fit in memory; "
+                  f"streaming it to {directory}")
+        file, path = tempfile.mkstemp(suffix=".npy", dir=directory)
+        os.close(file)
+    try:
+        output = np.lib.format.open_memmap(path, mode="w+", dtype=np.int32, shape=(n, n))
+        if workers == 1:
+            _fill_in_process(matrix, output, progress)
+            output.flush()
+            del output
+        else:
+            del output  # The workers open the file themselves
+            _fill_in_workers(matrix, path, workers, progress)
+        distances = np.load(path, mmap_mode="r")
+    finally:
+        if filename is None:
+            # The mapping outlives the name on POSIX; Windows cannot remove a mapped file and leaves it behind
+            with contextlib.suppress(OSError):
+                os.remove(path)
+    if filename is not None:
+        with open(f"{filename}.nodes.json", "w", encoding="utf-8") as file:
+            json.dump([str(node) for node in nodes], file)
+    return DistanceMatrix(nodes, distances, filename)
+
+
+def _fill_in_process(matrix, output, progress):
+    n = matrix.shape[0]
+    step = block_size(n)
+    for start in range(0, n, step):
+        stop = min(start + step, n)
+        output[start:stop] = distance_rows(matrix, start, stop)
+        if progress is not None:
+            progress(stop, n)
+
+
+def _fill_in_workers(matrix, path, workers, progress):
+    n = matrix.shape[0]
+    step = block_size(n, workers)
+    # spawn, not fork: the GUI calls this from a worker thread of a process running Tk
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                               initializer=_init_worker, initargs=(matrix.indptr, matrix.indices, n))
+    try:
+        futures = [pool.submit(_fill_rows, path, start, min(start + step, n)) for start in range(0, n, step)]
+        done = 0
+        for future in as_completed(futures):
+            done += future.result()
+            if progress is not None:
+                progress(done, n)
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+_worker_matrix = None  # The adjacency matrix in a worker process, set once by _init_worker
+
+
+def _init_worker(indptr, indices, n):
+    global _worker_matrix
+    _worker_matrix = sparse.csr_matrix((np.ones(len(indices), dtype=np.int8), indices, indptr), shape=(n, n))
+
+
+def _fill_rows(path, start, stop):
+    """Worker task: writes the distance rows start..stop-1 into the shared .npy file"""
+    output = np.load(path, mmap_mode="r+")
+    output[start:stop] = distance_rows(_worker_matrix, start, stop)
+    output.flush()
+    return stop - start
+
+
+def _available_memory():
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return None  # Unknown on this platform
+
+
+def _fits_in_memory(nbytes):
+    available = _available_memory()
+    return available is None or nbytes <= available // 2
+
+
+def _scratch_directory(nbytes):
+    """Returns /dev/shm when the matrix fits in it and in RAM, else the temporary directory on disk"""
+    if (_fits_in_memory(nbytes) and os.path.isdir(SHARED_MEMORY_DIRECTORY)
+            and shutil.disk_usage(SHARED_MEMORY_DIRECTORY).free > nbytes):
+        return SHARED_MEMORY_DIRECTORY
+    return tempfile.gettempdir()
@@ -0,0 +1,110 @@
+class SpatialIndex:
+    """Uniform grid over node positions used for hit-testing and rubber-band selection.
+
+    Every node lives in exactly one square cell, so a click only has to look at the
+    handful of cells around the cursor instead of at every node in the graph.
+    """
+
+    def __init__(self, cell_size=30):
+        self.cell_size = cell_size
+        self.cells = {}  # (column, row) -> set of nodes in that cell
+        self.positions = {}  # node -> (x, y)
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __contains__(self, node):
+        return node in self.positions
+
+    def _cell(self, x, y):
+        return int(x // self.cell_size), int(y // self.cell_size)
+
+    def clear(self):
+        self.cells.clear()
+        self.positions.clear()
+
+    def rebuild(self, nodes):
+        """Index every node that has a 'pos' attribute (used after loading a graph)"""
+        self.clear()
+        for node, attributes in nodes.items():
+            if 'pos' in attributes:
+                self.insert(node, attributes['pos'])
+
+    def insert(self, node, pos):
+        """Add a node, or move it if it is already indexed"""
+        if node in self.positions:
+            self.move(node, pos)
+            return
+        x, y = pos
+        self.positions[node] = (x, y)
+        self.cells.setdefault(self._cell(x, y), set()).add(node)
+
+    def remove(self, node):
+        """Remove a node from the index (unknown nodes are ignored)"""
+        pos = self.positions.pop(node, None)
+        if pos is None:
+            return
+        cell = self._cell(*pos)
+        members = self.cells[cell]
+        members.discard(node)
+        if not members:
+            del self.cells[cell]
+
+    def move(self, node, pos):
+        """Update a node's position, touching the grid only when it changes cell"""
+        old_pos = self.positions.get(node)
+        if old_pos is None:
+            self.insert(node, pos)
+            return
+        x, y = pos
+        self.positions[node] = (x, y)
+        old_cell, new_cell = self._cell(*old_pos), self._cell(x, y)
+        if old_cell != new_cell:
+            members = self.cells[old_cell]
+            members.discard(node)
+            if not members:
+                del self.cells[old_cell]
+            self.cells.setdefault(new_cell, set()).add(node)
+
+    def rename(self, old_name, new_name):
+        pos = self.positions.get(old_name)
+        if pos is not None:
+            self.remove(old_name)
+            self.insert(new_name, pos)
+
+    def nearest(self, x, y, threshold):
+        """Returns the node closest to (x, y) within threshold, or None"""
+        best_node, best_distance = None, threshold * threshold
+        min_col, min_row = self._cell(x - threshold, y - threshold)
+        max_col, max_row = self._cell(x + threshold, y + threshold)
+        for col in range(min_col, max_col + 1):
+            for row in range(min_row, max_row + 1):
+                for node in self.cells.get((col, row), ()):
+                    node_x, node_y = self.positions[node]
+                    # Compare squared distances, no square root needed
+                    distance = (node_x - x) ** 2 + (node_y - y) ** 2
+                    if distance <= best_distance:
+                        best_node, best_distance = node, distance
+        return best_node
+
+    def in_rect(self, x1, y1, x2, y2):
+        """Returns the set of nodes inside the rectangle spanned by two corners"""
+        left, right = min(x1, x2), max(x1, x2)
+        top, bottom = min(y1, y2), max(y1, y2)
+        min_col, min_row = self._cell(left, top)
+        max_col, max_row = self._cell(right, bottom)
+
+        # A huge rectangle spans more cells than there are nodes, so scan the nodes instead
+        if (max_col - min_col + 1) * (max_row - min_row + 1) > len(self.positions):
+            candidates = self.positions
+        else:
+            candidates = [node for col in range(min_col, max_col + 1)
+                          for row in range(min_row, max_row + 1)
+                          for node in self.cells.get((col, row), ())]
+
+        result = set()
+        for node in candidates:
+            node_x, node_y = self.positions[node]
+            if left <= node_x <= right and top <= node_y <= bottom:
+                result.add(node)
+        return result
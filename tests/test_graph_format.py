@@ -0,0 +1,48 @@
+import os
+
+from src.graph_logic import Graph
+
+
+def round_trip(graph, tmp_path):
+    filename = os.path.join(tmp_path, "graph.bin")
+    graph.save(filename)
+    return Graph.load(filename)
+
+
+def path_graph():
+    graph = Graph()
+    for name in "abc":
+        graph.add_node(name, "circle")
+    graph.add_edge_to_graph("a", "b")
+    graph.add_edge_to_graph("b", "c")
+    return graph
+
+
+def test_loaded_graph_connectivity(tmp_path):
+    loaded = round_trip(path_graph(), tmp_path)
+    assert loaded.is_connected()
+    assert loaded.radius_and_diameter() == (1, 2)
+
+
+def edges(graph):
+    return {(node1, node2): data.get('directed', False) for node1, node2, data in graph.graph.edges(data=True)}
+
+
+def test_one_way_undirected_edge_round_trip(tmp_path):
+    graph = path_graph()
+    graph.add_edge_to_graph("a", "c", directed=True)
+    graph.add_edge_to_graph("a", "c")
+    graph.remove_edge("a", "c")  # Leaves the single edge a -> c with directed=False
+    assert graph.graph.has_edge("a", "c") != graph.graph.has_edge("c", "a")
+    loaded = round_trip(graph, tmp_path)
+    assert set(edges(loaded)) == set(edges(graph))
+
+
+def test_mixed_pair_round_trip(tmp_path):
+    graph = path_graph()
+    graph.graph.add_edge("c", "a", directed=True)
+    graph.graph.add_edge("a", "c", directed=False)
+    loaded = round_trip(graph, tmp_path)
+    assert set(edges(loaded)) == set(edges(graph))
+    assert edges(loaded)[("c", "a")]
+    assert loaded.is_strongly_connected() == graph.is_strongly_connected()
@@ -0,0 +1,77 @@
+import pytest
+
+from src.graph_logic import Graph
+
+
+def path_graph():
+    graph = Graph()
+    for name in "abc":
+        graph.add_node(name, "circle")
+    graph.add_edge_to_graph("a", "b")
+    graph.add_edge_to_graph("b", "c")
+    return graph
+
+
+def test_rename_nodes_empty_mapping():
+    graph = path_graph()
+    assert graph.rename_nodes({})[0]
+    assert graph.undo() == "Add edge"
+    assert set(graph.get_nodes()) == {"a", "b", "c"}
+
+
+def test_replay_empty_rename():
+    graph = path_graph()
+    graph._apply_operation(("rename", {}))
+    assert set(graph.get_nodes()) == {"a", "b", "c"}
+
+
+def test_distance_unknown_node():
+    graph = path_graph()
+    with pytest.raises(ValueError):
+        graph.distance("a", "x")
+    assert graph.distance("a", "c") == 2
+
+
+def test_distance_unknown_node_with_cached_matrix():
+    graph = path_graph()
+    graph.distance_matrix()
+    with pytest.raises(ValueError):
+        graph.distance("x", "a")
+    assert graph.distance("a", "c") == 2
+
+
+def positions(graph):
+    return {node: tuple(attributes['pos']) for node, attributes in graph.get_nodes().items()}
+
+
+def test_undo_add_node_with_layout():
+    graph = path_graph()
+    graph.layout()
+    before = positions(graph)
+    graph.add_node("d", "circle")
+    graph.add_edge_to_graph("c", "d")
+    graph.add_node("e", "circle")
+    engine = graph.layout_engine(["e"], amend=True)
+    graph.apply_layout(engine)
+    while engine.step():
+        graph.apply_layout(engine)
+    graph.apply_layout(engine)
+    assert graph.undo() == "Add node"
+    assert "e" not in graph.get_nodes()
+    assert graph.undo() == "Add edge"
+    assert graph.redo() == "Add edge"
+    assert graph.redo() == "Add node"
+    assert positions(graph)["e"] == tuple(engine.frame[engine.nodes.index("e")])
+    graph.undo()
+    graph.undo()
+    graph.undo()
+    assert positions(graph) == before
+
+
+def test_layout_runs_are_separate_entries():
+    graph = path_graph()
+    graph.layout()
+    graph.layout(iterations=5)
+    assert graph.undo() == "Layout"
+    assert graph.undo() == "Layout"
+    assert graph.undo() == "Add edge"